@@ -0,0 +1,147 @@
+"""Per-call Python overhead microbenchmark.
+
+Measures the client-side cost of a task call with the network removed:
+building the request parameters, building the prompt messages (full template
+render vs. the pre-rendered ``CompiledPrompt``), decoding the response, and a
+full ``task(text)`` round trip against a stub engine.
+
+Usage
+-----
+    python -m benchmarks.overhead_bench --output overhead_report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from promptify._version import __version__
+from promptify.engine.llm import LLMEngine
+from promptify.prompts.builder import PromptBuilder
+from promptify.schemas.artifacts import render_schema_hint
+from promptify.schemas.ner import NERResult
+from promptify.tasks.ner import NER
+
+_TEXT = (
+    "The patient is a 93-year-old female with a medical history of chronic right hip "
+    "pain, osteoporosis, hypertension, depression, and chronic atrial fibrillation."
+)
+_RESPONSE = json.dumps(
+    {
+        "entities": [
+            {"text": "93-year-old", "label": "AGE"},
+            {"text": "chronic right hip pain", "label": "CONDITION"},
+            {"text": "osteoporosis", "label": "CONDITION"},
+            {"text": "hypertension", "label": "CONDITION"},
+            {"text": "depression", "label": "CONDITION"},
+            {"text": "chronic atrial fibrillation", "label": "CONDITION"},
+        ]
+    }
+)
+
+
+class _Choice:
+    def __init__(self, content: str) -> None:
+        self.message = type("Message", (), {"content": content})()
+        self.finish_reason = "stop"
+
+
+class _StubResponse:
+    """Minimal stand-in for a LiteLLM ``ModelResponse``."""
+
+    def __init__(self, content: str, model: str) -> None:
+        self.choices = [_Choice(content)]
+        self.usage = None
+        self.model = model
+
+
+class StubEngine(LLMEngine):
+    """Engine that runs the real request/response code paths minus the network."""
+
+    def complete(  # type: ignore[no-untyped-def]
+        self, messages, output_schema=None, key_aliases=None, **kwargs
+    ):
+        params = self._build_params(messages, output_schema, key_aliases, **kwargs)
+        return self._parse_response(
+            _StubResponse(_RESPONSE, params["model"]), output_schema, key_aliases
+        )
+
+
+def _uncached_schema_work() -> Any:
+    """What every call paid before schema artifacts were memoized."""
+    schema = NERResult.model_json_schema()
+    return render_schema_hint(schema), NERResult.model_validate(json.loads(_RESPONSE))
+
+
+def _measure(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    for _ in range(min(100, iterations)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "us_per_call": round(elapsed / iterations * 1e6, 3),
+        "calls_per_sec": round(iterations / elapsed, 1),
+    }
+
+
+def run(iterations: int = 10_000) -> Dict[str, Any]:
+    """Run all cases and return a JSON-serializable report."""
+    task = NER(model="gpt-4o-mini", domain="medical")
+    engine = StubEngine(task.engine.config)
+    task.engine = engine
+    messages = task._build_messages(_TEXT)
+    builder = PromptBuilder()
+    ner_builder = task.prompt_builder
+    build_kwargs: Dict[str, Any] = {
+        "instruction": task.instruction,
+        "domain": task.domain,
+        "output_schema": NERResult,
+    }
+    compiled = ner_builder.compile(**build_kwargs)
+    assert compiled is not None
+    stub = _StubResponse(_RESPONSE, "gpt-4o-mini")
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "schema_work_uncached": _uncached_schema_work,
+        "build_params": lambda: engine._build_params(messages, NERResult),
+        "schema_instruction": lambda: builder._build_schema_instruction(NERResult),
+        "parse_response": lambda: engine._parse_response(stub, NERResult),
+        "prompt_build_full": lambda: ner_builder.build(text_input=_TEXT, **build_kwargs),
+        "prompt_build_compiled": lambda: compiled.build(text_input=_TEXT),
+        "build_messages": lambda: task._build_messages(_TEXT),
+        "task_call": lambda: task(_TEXT),
+    }
+    return {
+        "benchmark": "overhead",
+        "promptify_version": __version__,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": {name: _measure(fn, iterations) for name, fn in cases.items()},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    cli = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cli.add_argument("--output", "-o", help="Write the JSON report to this path")
+    cli.add_argument("--iterations", "-n", type=int, default=10_000)
+    args = cli.parse_args(argv)
+
+    report = run(args.iterations)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    for name, row in report["results"].items():
+        print(f"{name:<22} {row['us_per_call']:>10.2f} us/call {row['calls_per_sec']:>12,.0f}/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""Parser benchmark corpus and fuzz harness.
+
+Generates realistic LLM outputs for every schema exported from
+``promptify.schemas`` — valid, fenced, prose-wrapped and truncated at every
+offset — then measures ``Parser.parse``, ``Parser.fit`` and
+``Parser.extract_complete_objects`` throughput and latency and checks that
+repaired output is consistent with the original object.
+
+Usage
+-----
+    python -m benchmarks.parser_bench --output parser_report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+import promptify.schemas as schemas_module
+from promptify._version import __version__
+from promptify.parser.parser import Parser
+
+_WORDS = (
+    "patient aspirin hypertension Einstein Ulm physics contract payment clause "
+    "revenue quarter Berlin diabetes metformin court ruling tenant landlord "
+    "it's \"quoted\" naïve café 東京 {brace} [bracket] back\\slash"
+).split()
+
+_PREFIXES = (
+    "Here is the result:\n",
+    "Sure! Based on the passage, the output is ",
+    "Output:\n",
+)
+_SUFFIXES = ("", "\n\nLet me know if you need anything else.", "\nHope this helps!")
+
+
+# --- Corpus ---------------------------------------------------------------
+
+
+def _sample_value(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random) -> Any:
+    if "$ref" in schema:
+        return _sample_value(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, rng)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return _sample_value(rng.choice(options), defs, rng)
+
+    kind = schema.get("type")
+    if kind == "object":
+        if "properties" in schema:
+            return {
+                name: _sample_value(prop, defs, rng)
+                for name, prop in schema["properties"].items()
+            }
+        value_schema = schema.get("additionalProperties") or {"type": "string"}
+        return {
+            rng.choice(_WORDS): _sample_value(value_schema, defs, rng)
+            for _ in range(rng.randint(1, 4))
+        }
+    if kind == "array":
+        return [_sample_value(schema.get("items", {}), defs, rng) for _ in range(rng.randint(1, 6))]
+    if kind == "number":
+        return round(rng.random(), 2)
+    if kind == "integer":
+        return rng.randint(0, 500)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+
+
+def sample_instance(schema: Type[BaseModel], rng: random.Random) -> Dict[str, Any]:
+    """Return a random, schema-valid payload for ``schema``."""
+    json_schema = schema.model_json_schema()
+    data = _sample_value(json_schema, json_schema.get("$defs", {}), rng)
+    schema.model_validate(data)
+    return data
+
+
+@dataclass
+class Case:
+    """A single benchmark input and the object it should decode to."""
+
+    schema: str
+    variant: str
+    text: str
+    expected: Any
+
+
+def build_corpus(
+    samples_per_schema: int = 3,
+    truncation_stride: int = 4,
+    seed: int = 0,
+) -> List[Case]:
+    """Build valid, fenced, prose-wrapped and truncated cases for each schema."""
+    rng = random.Random(seed)
+    cases: List[Case] = []
+    for name in schemas_module.__all__:
+        schema = getattr(schemas_module, name)
+        for _ in range(samples_per_schema):
+            data = sample_instance(schema, rng)
+            compact = json.dumps(data, ensure_ascii=False)
+            pretty = json.dumps(data, ensure_ascii=False, indent=2)
+
+            cases.append(Case(name, "valid", compact, data))
+            cases.append(Case(name, "valid_pretty", pretty, data))
+            cases.append(Case(name, "fenced", f"```json\n{pretty}\n```", data))
+            cases.append(
+                Case(
+                    name,
+                    "prose",
+                    rng.choice(_PREFIXES) + compact + rng.choice(_SUFFIXES),
+                    data,
+                )
+            )
+            for offset in range(1, len(compact), truncation_stride):
+                cases.append(Case(name, "truncated", compact[:offset], data))
+    return cases
+
+
+# --- Correctness ----------------------------------------------------------
+
+
+def is_consistent_prefix(repaired: Any, original: Any) -> bool:
+    """Return True if ``repaired`` could be a truncation of ``original``.
+
+    Dicts may lose keys, lists may lose trailing items and the last string
+    may be cut short, but nothing may be invented.
+    """
+    if isinstance(repaired, dict) and isinstance(original, dict):
+        return all(
+            k in original and is_consistent_prefix(v, original[k])
+            for k, v in repaired.items()
+        )
+    if isinstance(repaired, list) and isinstance(original, list):
+        return len(repaired) <= len(original) and all(
+            is_consistent_prefix(r, o) for r, o in zip(repaired, original)
+        )
+    if isinstance(repaired, str) and isinstance(original, str):
+        return original.startswith(repaired)
+    if isinstance(repaired, (int, float)) and isinstance(original, (int, float)):
+        return str(original).startswith(str(repaired))
+    return repaired == original
+
+
+# --- Measurement ----------------------------------------------------------
+
+
+@dataclass
+class Measurement:
+    """Aggregated timing and correctness for one (function, schema, variant)."""
+
+    function: str
+    schema: str
+    variant: str
+    calls: int = 0
+    ok: int = 0
+    consistent: int = 0
+    latencies_us: List[float] = field(default_factory=list, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_us)
+        total_s = sum(lat) / 1e6
+        return {
+            "function": self.function,
+            "schema": self.schema,
+            "variant": self.variant,
+            "calls": self.calls,
+            "success_rate": round(self.ok / self.calls, 4) if self.calls else 0.0,
+            "consistent_rate": round(self.consistent / self.calls, 4) if self.calls else 0.0,
+            "ops_per_sec": round(self.calls / total_s, 1) if total_s else 0.0,
+            "p50_us": round(_percentile(lat, 0.50), 2),
+            "p99_us": round(_percentile(lat, 0.99), 2),
+            "max_us": round(lat[-1], 2) if lat else 0.0,
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _run_parse(parser: Parser, case: Case) -> Tuple[bool, Any]:
+    schema = getattr(schemas_module, case.schema)
+    try:
+        result = parser.parse(case.text, schema)
+    except Exception:
+        return False, None
+    return True, result.model_dump(exclude_unset=True)
+
+
+def _run_fit(parser: Parser, case: Case) -> Tuple[bool, Any]:
+    result = parser.fit(case.text)
+    if result["status"] != "completed":
+        return False, None
+    return True, result["data"]["completion"]
+
+
+def _subtrees(value: Any) -> Iterator[Any]:
+    yield value
+    children = value.values() if isinstance(value, dict) else value
+    if isinstance(value, (dict, list)):
+        for child in children:
+            yield from _subtrees(child)
+
+
+def _run_extract(parser: Parser, case: Case) -> Tuple[bool, Any]:
+    objects = parser.extract_complete_objects(case.text)
+    if not objects:
+        return False, None
+    return True, objects
+
+
+def _are_subtrees(objects: List[Any], original: Any) -> bool:
+    """Return True if every extracted object is an exact subtree of ``original``."""
+    subtrees = list(_subtrees(original))
+    return all(obj in subtrees for obj in objects)
+
+
+FUNCTIONS: Dict[str, Callable[[Parser, Case], Tuple[bool, Any]]] = {
+    "parse": _run_parse,
+    "fit": _run_fit,
+    "extract_complete_objects": _run_extract,
+}
+
+# How each function's result is checked against the original object;
+# ``extract_complete_objects`` returns whole subtrees, not a repaired prefix.
+CONSISTENCY_CHECKS: Dict[str, Callable[[Any, Any], bool]] = {
+    "parse": is_consistent_prefix,
+    "fit": is_consistent_prefix,
+    "extract_complete_objects": _are_subtrees,
+}
+
+
+def _iter_measurements(
+    cases: List[Case], functions: List[str], repeat: int
+) -> Iterator[Measurement]:
+    for fn_name in functions:
+        fn, is_consistent = FUNCTIONS[fn_name], CONSISTENCY_CHECKS[fn_name]
+        parser = Parser()
+        buckets: Dict[Tuple[str, str], Measurement] = {}
+        for case in cases:
+            m = buckets.setdefault(
+                (case.schema, case.variant), Measurement(fn_name, case.schema, case.variant)
+            )
+            for _ in range(repeat):
+                start = time.perf_counter()
+                ok, result = fn(parser, case)
+                m.latencies_us.append((time.perf_counter() - start) * 1e6)
+                m.calls += 1
+                if ok:
+                    m.ok += 1
+                    if is_consistent(result, case.expected):
+                        m.consistent += 1
+        yield from buckets.values()
+
+
+def run(
+    functions: Optional[List[str]] = None,
+    samples_per_schema: int = 3,
+    truncation_stride: int = 4,
+    repeat: int = 1,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run the benchmark and return a JSON-serializable report."""
+    functions = functions or list(FUNCTIONS)
+    cases = build_corpus(samples_per_schema, truncation_stride, seed)
+    results = [m.summary() for m in _iter_measurements(cases, functions, repeat)]
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    for fn_name in functions:
+        rows = [r for r in results if r["function"] == fn_name]
+        calls = sum(r["calls"] for r in rows)
+        totals[fn_name] = {
+            "calls": calls,
+            "success_rate": round(sum(r["success_rate"] * r["calls"] for r in rows) / calls, 4),
+            "consistent_rate": round(
+                sum(r["consistent_rate"] * r["calls"] for r in rows) / calls, 4
+            ),
+            "p99_us_median_bucket": statistics.median(r["p99_us"] for r in rows),
+        }
+
+    return {
+        "benchmark": "parser",
+        "promptify_version": __version__,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "functions": functions,
+            "samples_per_schema": samples_per_schema,
+            "truncation_stride": truncation_stride,
+            "repeat": repeat,
+            "seed": seed,
+            "cases": len(cases),
+        },
+        "totals": totals,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    cli = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cli.add_argument("--output", "-o", help="Write the JSON report to this path")
+    cli.add_argument("--functions", nargs="+", choices=list(FUNCTIONS), default=None)
+    cli.add_argument("--samples", type=int, default=3, help="Samples per schema")
+    cli.add_argument(
+        "--stride", type=int, default=4, help="Truncation offset stride (1 = every offset)"
+    )
+    cli.add_argument("--repeat", type=int, default=1, help="Timed repetitions per case")
+    cli.add_argument("--seed", type=int, default=0)
+    args = cli.parse_args(argv)
+
+    report = run(args.functions, args.samples, args.stride, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    for fn_name, total in report["totals"].items():
+        print(
+            f"{fn_name:<26} calls={total['calls']:<7} "
+            f"success={total['success_rate']:.2%} consistent={total['consistent_rate']:.2%}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,16 +7,20 @@ from promptify.engine.cost import get_cost_summary
 from promptify.tasks import (
     NER,
     QA,
+    Cascade,
     Classify,
+    Composite,
     ExtractRelations,
     ExtractTable,
     ExtractTopics,
     GenerateQuestions,
     GenerateSQL,
     NormalizeText,
+    Pipeline,
     Summarize,
     Task,
 )
+from promptify.utils.gazetteer import Gazetteer
 
 __all__ = [
     "__version__",
@@ -25,12 +29,16 @@ __all__ = [
     "QA",
     "Summarize",
     "Task",
+    "Cascade",
+    "Composite",
+    "Pipeline",
     "ExtractRelations",
     "ExtractTable",
     "GenerateQuestions",
     "GenerateSQL",
     "NormalizeText",
     "ExtractTopics",
+    "Gazetteer",
     "ModelConfig",
     "setup_logging",
     "get_cost_summary",
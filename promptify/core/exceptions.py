@@ -29,6 +29,10 @@ class ModelResponseError(ModelError):
     """Invalid or unexpected model response."""
 
 
+class ContextLengthError(PromptifyError):
+    """Prompt does not fit in the token budget or context window."""
+
+
 class TemplateError(PromptifyError):
     """Base for template-related errors."""
 
@@ -1,3 +1,4 @@
+from promptify.engine.adaptive import AdaptiveMaxTokens
 from promptify.engine.llm import LLMEngine, LLMResponse
 
-__all__ = ["LLMEngine", "LLMResponse"]
+__all__ = ["AdaptiveMaxTokens", "LLMEngine", "LLMResponse"]
@@ -0,0 +1,205 @@
+"""Adaptive ``max_tokens`` from observed completion lengths.
+
+Without a cap, a runaway generation (repeated entities, looping JSON) runs to
+the model limit. ``AdaptiveMaxTokens`` keeps a streaming quantile sketch of
+``completion_tokens`` per (task, model, schema) and caps later requests at a high
+percentile plus headroom. Responses cut off at the cap are counted, and the
+cap is raised when truncation becomes frequent.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+Key = Tuple[str, ...]
+
+
+class P2Quantile:
+    """Streaming quantile estimate in O(1) memory (the P² algorithm).
+
+    Jain & Chlamtac, "The P² algorithm for dynamic calculation of quantiles
+    and histograms without storing observations", CACM 1985.
+
+    Example
+    -------
+    >>> sketch = P2Quantile(0.9)
+    >>> for x in range(1, 101):
+    ...     sketch.add(x)
+    >>> round(sketch.value())
+    90
+    """
+
+    def __init__(self, p: float) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        self.count = 0
+        self._initial: List[float] = []
+        self._heights: List[float] = []
+        self._positions: List[float] = []
+        self._desired: List[float] = []
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        if not self._heights:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                p = self.p
+                self._heights = sorted(self._initial)
+                self._positions = [0.0, 1.0, 2.0, 3.0, 4.0]
+                self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+            return
+
+        q, n = self._heights, self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        """Current estimate, or None before the first observation."""
+        if self._heights:
+            return self._heights[2]
+        if not self._initial:
+            return None
+        ordered = sorted(self._initial)
+        return ordered[min(len(ordered) - 1, int(self.p * len(ordered)))]
+
+
+class _KeyState:
+    def __init__(self, percentile: float, window: int) -> None:
+        self.sketch = P2Quantile(percentile)
+        self.recent: Deque[bool] = deque(maxlen=window)
+        self.boost = 1.0
+        self.truncations = 0
+
+
+class AdaptiveMaxTokens:
+    """Per-(task, schema) ``max_tokens`` derived from observed completions.
+
+    Parameters
+    ----------
+    percentile : float
+        Quantile of observed completion lengths to cap at.
+    headroom : float
+        Multiplier applied on top of the quantile.
+    min_tokens : int
+        Lower bound for the cap.
+    warmup : int
+        Observations needed before a cap is set; until then requests are
+        uncapped.
+    window : int
+        Number of recent responses used to measure the truncation rate.
+    max_truncation_rate : float
+        When more than this fraction of the recent responses hit the cap,
+        the cap is multiplied by ``growth``.
+    growth : float
+        Factor by which the cap is raised.
+
+    Example
+    -------
+    >>> tracker = AdaptiveMaxTokens(percentile=0.99, headroom=1.25)
+    >>> ner = NER(model="gpt-4o-mini", adaptive_max_tokens=tracker)
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.99,
+        headroom: float = 1.25,
+        min_tokens: int = 64,
+        warmup: int = 20,
+        window: int = 50,
+        max_truncation_rate: float = 0.05,
+        growth: float = 2.0,
+    ) -> None:
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_tokens = min_tokens
+        self.warmup = warmup
+        self.window = window
+        self.max_truncation_rate = max_truncation_rate
+        self.growth = growth
+        self._lock = threading.Lock()
+        self._states: Dict[Key, _KeyState] = {}
+
+    def _state(self, key: Key) -> _KeyState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState(self.percentile, self.window)
+        return state
+
+    def limit(self, key: Key) -> Optional[int]:
+        """``max_tokens`` to request for ``key``; None while warming up."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.sketch.count < self.warmup:
+                return None
+            estimate = state.sketch.value() or 0.0
+            return max(self.min_tokens, math.ceil(estimate * self.headroom * state.boost))
+
+    def observe(self, key: Key, completion_tokens: int, truncated: bool = False) -> None:
+        """Record one completion; ``truncated`` when it stopped at the cap."""
+        with self._lock:
+            state = self._state(key)
+            state.sketch.add(completion_tokens)
+            state.recent.append(truncated)
+            if truncated:
+                state.truncations += 1
+            if (
+                len(state.recent) >= min(self.window, self.warmup)
+                and sum(state.recent) > self.max_truncation_rate * len(state.recent)
+            ):
+                state.boost *= self.growth
+                state.recent.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Observations, current estimate, boost and truncations per key."""
+        with self._lock:
+            return {
+                "/".join(key): {
+                    "observations": state.sketch.count,
+                    "quantile": state.sketch.value() or 0.0,
+                    "boost": state.boost,
+                    "truncations": state.truncations,
+                }
+                for key, state in self._states.items()
+            }
+
+    def reset(self) -> None:
+        """Forget all observations."""
+        with self._lock:
+            self._states.clear()
+
+
+#: Process-wide tracker used by tasks created with ``adaptive_max_tokens=True``.
+default_tracker = AdaptiveMaxTokens()
@@ -8,11 +8,14 @@ from typing import Any, Dict
 
 
 @dataclass
-class _CostAccumulator:
+class CostAccumulator:
+    """Thread-safe running totals of cost and token usage."""
+
     total_cost: float = 0.0
     total_tokens: int = 0
     prompt_tokens: int = 0
     completion_tokens: int = 0
+    cached_tokens: int = 0
     call_count: int = 0
     _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
@@ -21,6 +24,7 @@ class _CostAccumulator:
             self.total_cost += cost
             self.prompt_tokens += usage.get("prompt_tokens", 0)
             self.completion_tokens += usage.get("completion_tokens", 0)
+            self.cached_tokens += usage.get("cached_tokens", 0)
             self.total_tokens += usage.get("total_tokens", 0)
             self.call_count += 1
 
@@ -31,6 +35,7 @@ class _CostAccumulator:
                 "total_tokens": self.total_tokens,
                 "prompt_tokens": self.prompt_tokens,
                 "completion_tokens": self.completion_tokens,
+                "cached_tokens": self.cached_tokens,
                 "call_count": self.call_count,
             }
 
@@ -40,10 +45,11 @@ class _CostAccumulator:
             self.total_tokens = 0
             self.prompt_tokens = 0
             self.completion_tokens = 0
+            self.cached_tokens = 0
             self.call_count = 0
 
 
-_accumulator = _CostAccumulator()
+_accumulator = CostAccumulator()
 
 
 def track_cost(cost: float, usage: Dict[str, int]) -> None:
@@ -23,9 +23,35 @@ from promptify.core.exceptions import (
     ModelRateLimitError,
     ModelResponseError,
 )
+from promptify.schemas.aliasing import KeyAliases
+from promptify.schemas.artifacts import get_schema_artifacts
 
 logger = logging.getLogger("promptify")
 
+# Providers whose prompt caching needs explicit cache_control markers; others
+# (e.g. OpenAI) cache stable prefixes automatically.
+_EXPLICIT_CACHE_PROVIDERS = frozenset({"anthropic", "bedrock", "vertex_ai", "vertex_ai_beta"})
+
+
+def _usage_int(obj: Any, name: str) -> int:
+    value = getattr(obj, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _top_logprobs(choice: Any) -> Optional[Dict[str, float]]:
+    """Alternatives for the first generated token as ``{token: logprob}``."""
+    content = _field(_field(choice, "logprobs"), "content")
+    if not isinstance(content, list) or not content:
+        return None
+    alternatives = _field(content[0], "top_logprobs")
+    if not isinstance(alternatives, list):
+        return None
+    return {_field(alt, "token"): _field(alt, "logprob") for alt in alternatives}
+
 
 @dataclass
 class LLMResponse:
@@ -37,6 +63,13 @@ class LLMResponse:
     usage: Dict[str, int] = field(default_factory=dict)
     model: str = ""
     cost: float = 0.0
+    finish_reason: str = ""
+    top_logprobs: Optional[Dict[str, float]] = None
+
+    @property
+    def truncated(self) -> bool:
+        """Whether generation stopped at ``max_tokens``."""
+        return self.finish_reason == "length"
 
 
 class LLMEngine:
@@ -46,10 +79,31 @@ class LLMEngine:
         self.config = config
         litellm.drop_params = True
 
+    @property
+    def uses_cache_markers(self) -> bool:
+        """Whether the provider needs explicit prompt-cache markers."""
+        model = self.config.model
+        try:
+            _, provider, _, _ = litellm.get_llm_provider(model)
+        except Exception:
+            # Model not in LiteLLM's registry: fall back to the "provider/" prefix.
+            provider = model.split("/", 1)[0] if "/" in model else ""
+        return provider in _EXPLICIT_CACHE_PROVIDERS
+
+    @property
+    def supports_logprobs(self) -> bool:
+        """Whether the provider can return token logprobs (True if unknown)."""
+        try:
+            params = litellm.get_supported_openai_params(model=self.config.model)
+        except Exception:
+            return True
+        return params is None or "logprobs" in params
+
     def _build_params(
         self,
         messages: List[Dict[str, str]],
         output_schema: Optional[Type[BaseModel]] = None,
+        key_aliases: Optional[KeyAliases] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
         params: Dict[str, Any] = {
@@ -70,14 +124,11 @@ class LLMEngine:
             params["timeout"] = self.config.timeout
 
         if output_schema is not None:
-            params["response_format"] = {
-                "type": "json_schema",
-                "json_schema": {
-                    "name": output_schema.__name__,
-                    "schema": output_schema.model_json_schema(),
-                    "strict": False,
-                },
-            }
+            params["response_format"] = (
+                key_aliases.response_format
+                if key_aliases is not None
+                else get_schema_artifacts(output_schema).response_format
+            )
 
         params.update(self.config.extra_params)
         params.update(kwargs)
@@ -98,16 +149,21 @@ class LLMEngine:
         self,
         response: Any,
         output_schema: Optional[Type[BaseModel]] = None,
+        key_aliases: Optional[KeyAliases] = None,
     ) -> LLMResponse:
         choice = response.choices[0]
         text = choice.message.content or ""
+        finish_reason = getattr(choice, "finish_reason", None)
 
         usage = {}
         if hasattr(response, "usage") and response.usage:
+            details = getattr(response.usage, "prompt_tokens_details", None)
             usage = {
                 "prompt_tokens": response.usage.prompt_tokens or 0,
                 "completion_tokens": response.usage.completion_tokens or 0,
                 "total_tokens": response.usage.total_tokens or 0,
+                "cached_tokens": _usage_int(details, "cached_tokens")
+                or _usage_int(response.usage, "cache_read_input_tokens"),
             }
 
         cost = 0.0
@@ -119,8 +175,10 @@ class LLMEngine:
         parsed = None
         if output_schema and text:
             try:
-                data = json.loads(text)
-                parsed = output_schema.model_validate(data)
+                if key_aliases is not None:
+                    parsed = key_aliases.validate(json.loads(text))
+                else:
+                    parsed = get_schema_artifacts(output_schema).adapter.validate_json(text)
             except Exception:
                 logger.debug("Structured parse failed, raw text available in response")
 
@@ -131,16 +189,19 @@ class LLMEngine:
             usage=usage,
             model=response.model or self.config.model,
             cost=cost,
+            finish_reason=finish_reason if isinstance(finish_reason, str) else "",
+            top_logprobs=_top_logprobs(choice),
         )
 
     def complete(
         self,
         messages: List[Dict[str, str]],
         output_schema: Optional[Type[BaseModel]] = None,
+        key_aliases: Optional[KeyAliases] = None,
         **kwargs: Any,
     ) -> LLMResponse:
         """Synchronous completion."""
-        params = self._build_params(messages, output_schema, **kwargs)
+        params = self._build_params(messages, output_schema, key_aliases, **kwargs)
 
         @retry(
             retry=retry_if_exception_type(
@@ -153,7 +214,7 @@ class LLMEngine:
         def _call() -> LLMResponse:
             try:
                 response = litellm.completion(**params)
-                return self._parse_response(response, output_schema)
+                return self._parse_response(response, output_schema, key_aliases)
             except Exception as exc:
                 mapped = self._map_exception(exc)
                 if isinstance(mapped, (ModelConnectionError, ModelRateLimitError)):
@@ -166,12 +227,13 @@ class LLMEngine:
         self,
         messages: List[Dict[str, str]],
         output_schema: Optional[Type[BaseModel]] = None,
+        key_aliases: Optional[KeyAliases] = None,
         **kwargs: Any,
     ) -> LLMResponse:
         """Async completion."""
-        params = self._build_params(messages, output_schema, **kwargs)
+        params = self._build_params(messages, output_schema, key_aliases, **kwargs)
         try:
             response = await litellm.acompletion(**params)
-            return self._parse_response(response, output_schema)
+            return self._parse_response(response, output_schema, key_aliases)
         except Exception as exc:
             raise self._map_exception(exc) from exc
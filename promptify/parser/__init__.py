@@ -1,3 +1,4 @@
+from promptify.parser.compact import EntityLineParser, RelationLineParser, TableLineParser
 from promptify.parser.parser import Parser
 
-__all__ = ["Parser"]
+__all__ = ["Parser", "EntityLineParser", "RelationLineParser", "TableLineParser"]
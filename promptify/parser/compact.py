@@ -0,0 +1,158 @@
+"""Streaming parsers for compact line-oriented output (TSV / pipe-separated).
+
+Instead of repeating JSON keys for every object, the model emits one record
+per line with fields separated by a delimiter. These parsers rebuild the same
+Pydantic result objects as the JSON path, and can be fed incrementally as
+chunks arrive from a streaming response.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from promptify.core.exceptions import ConfigurationError, ParserError
+from promptify.schemas.extract import ExtractionResult, Relation, TableRow
+from promptify.schemas.ner import Entity, NERResult
+
+COMPACT_DELIMITERS: Dict[str, str] = {"tsv": "\t", "pipe": "|"}
+DELIMITER_NAMES: Dict[str, str] = {"\t": "a tab character", "|": "a pipe character (|)"}
+
+
+def resolve_output_format(output_format: str) -> Optional[str]:
+    """Return the field delimiter for a compact format, or None for JSON."""
+    if output_format == "json":
+        return None
+    if output_format not in COMPACT_DELIMITERS:
+        raise ConfigurationError(
+            f"Unknown output_format {output_format!r}; "
+            f"expected 'json' or one of {sorted(COMPACT_DELIMITERS)}"
+        )
+    return COMPACT_DELIMITERS[output_format]
+
+
+class LineParser(ABC):
+    """Incrementally split delimited lines into records.
+
+    Subclasses implement ``_record`` (one line's fields to an item or None)
+    and ``_build`` (items to the final Pydantic result). Output that yields
+    no records but has lines without the delimiter (a JSON or prose reply)
+    raises ``ParserError`` instead of parsing as an empty result.
+    """
+
+    def __init__(self, delimiter: str = "\t") -> None:
+        self.delimiter = delimiter
+        self._buffer = ""
+        self._items: List[Any] = []
+        self._undelimited = 0
+
+    def _split(self, line: str) -> Optional[List[str]]:
+        line = line.strip()
+        if not line or line.startswith("```"):
+            return None
+        if self.delimiter == "|":
+            # Tolerate markdown-table style rows and separator lines.
+            line = line.strip("|")
+            if set(line) <= set("-:| "):
+                return None
+        return [field.strip() for field in line.split(self.delimiter)]
+
+    @abstractmethod
+    def _record(self, fields: List[str]) -> Any:
+        """One line's fields to an item, or None to skip the line."""
+
+    @abstractmethod
+    def _build(self, items: List[Any]) -> BaseModel:
+        """The final result from the collected items."""
+
+    def _consume(self, line: str) -> List[Any]:
+        fields = self._split(line)
+        if fields is None:
+            return []
+        if len(fields) == 1:
+            self._undelimited += 1
+        item = self._record(fields)
+        if item is None:
+            return []
+        self._items.append(item)
+        return [item]
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of output and return the records it completed."""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        completed: List[Any] = []
+        for line in lines:
+            completed.extend(self._consume(line))
+        return completed
+
+    def close(self) -> BaseModel:
+        """Flush the trailing line and return the assembled result."""
+        if self._buffer:
+            self._consume(self._buffer)
+            self._buffer = ""
+        items, undelimited = self._items, self._undelimited
+        self._items, self._undelimited = [], 0
+        result = self._build(items)
+        if not items and undelimited:
+            raise ParserError("No delimited records in output; expected one record per line")
+        return result
+
+    def parse(self, text: str) -> BaseModel:
+        """Parse a complete response in one go (does not touch stream state)."""
+        parser = self.__class__(self.delimiter)
+        parser.feed(text)
+        return parser.close()
+
+
+class EntityLineParser(LineParser):
+    """``text<delim>label[<delim>start<delim>end]`` lines to ``NERResult``."""
+
+    def _record(self, fields: List[str]) -> Optional[Entity]:
+        if len(fields) < 2 or not fields[0] or not fields[1]:
+            return None
+        if fields[0].lower() == "text" and fields[1].lower() == "label":
+            return None
+        start = end = None
+        if len(fields) >= 4 and fields[2].isdigit() and fields[3].isdigit():
+            start, end = int(fields[2]), int(fields[3])
+        return Entity(text=fields[0], label=fields[1], start=start, end=end)
+
+    def _build(self, items: List[Any]) -> NERResult:
+        return NERResult(entities=items)
+
+
+class RelationLineParser(LineParser):
+    """``subject<delim>predicate<delim>object`` lines to ``ExtractionResult``."""
+
+    def _record(self, fields: List[str]) -> Optional[Relation]:
+        if len(fields) != 3 or not all(fields):
+            return None
+        if [f.lower() for f in fields] == ["subject", "predicate", "object"]:
+            return None
+        return Relation(subject=fields[0], predicate=fields[1], object=fields[2])
+
+    def _build(self, items: List[Any]) -> ExtractionResult:
+        return ExtractionResult(relations=items)
+
+
+class TableLineParser(LineParser):
+    """A header line followed by value lines to ``ExtractionResult`` rows."""
+
+    def __init__(self, delimiter: str = "\t") -> None:
+        super().__init__(delimiter)
+        self._header: Optional[List[str]] = None
+
+    def _record(self, fields: List[str]) -> Optional[TableRow]:
+        if self._header is None:
+            self._header = fields
+            return None
+        if len(fields) != len(self._header):
+            return None
+        return TableRow(data=dict(zip(self._header, fields)))
+
+    def _build(self, items: List[Any]) -> ExtractionResult:
+        self._header = None
+        return ExtractionResult(rows=items)
@@ -6,12 +6,19 @@ import ast
 import itertools
 import json
 import re
+from collections import Counter
 from operator import itemgetter
 from typing import Any, Dict, List, Optional, Type, Union
 
 from pydantic import BaseModel
 
 from promptify.core.exceptions import ParserError
+from promptify.schemas.artifacts import get_schema_artifacts
+
+_FENCE_RE = re.compile(r"```[\w+-]*[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+PARSE_STAGES = ("direct", "extracted", "literal", "repaired", "failed")
 
 
 class Parser:
@@ -19,8 +26,22 @@ class Parser:
 
     Unlike v2, this parser NEVER uses eval(). It uses json.loads() with
     ast.literal_eval() as a safe fallback.
+
+    ``parse`` tries its stages cheapest-first and counts which one succeeded
+    in ``stats``, so callers can see where parse time goes.
     """
 
+    def __init__(self) -> None:
+        self._stats: Counter[str] = Counter()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Number of ``parse`` calls resolved by each stage."""
+        return {stage: self._stats[stage] for stage in PARSE_STAGES}
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
     def _safe_parse(self, text: str) -> Any:
         """Parse a string as JSON/Python literal safely — no eval()."""
         try:
@@ -171,6 +192,33 @@ class Parser:
                     pass
         return objects
 
+    def extract_payload(self, text: str) -> Optional[str]:
+        """Locate the JSON payload inside chatty or markdown-fenced output.
+
+        Returns the text from the first ``{`` or ``[`` onwards (inside the
+        first fence that contains one, if any), or None when the text contains
+        no object or array at all. Trailing prose is left in place: strict
+        decoding stops at the end of the first value and repair trims it.
+        """
+        if "```" in text:
+            for match in _FENCE_RE.finditer(text):
+                body = match.group(1)
+                if "{" in body or "[" in body:
+                    text = body
+                    break
+
+        starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+        if not starts:
+            return None
+        return text[min(starts) :].rstrip()
+
+    def _validate(
+        self, data: Any, output_schema: Optional[Type[BaseModel]]
+    ) -> Union[BaseModel, Dict[str, Any], List[Any]]:
+        if output_schema:
+            return output_schema.model_validate(data)
+        return data
+
     def parse(
         self,
         text: str,
@@ -184,28 +232,45 @@ class Parser:
 
         # Try direct JSON parse
         try:
-            data = json.loads(text)
             if output_schema:
-                return output_schema.model_validate(data)
-            return data
+                result = get_schema_artifacts(output_schema).adapter.validate_json(text)
+            else:
+                result = json.loads(text)
+            self._stats["direct"] += 1
+            return result
         except (json.JSONDecodeError, ValueError):
             pass
 
+        # Strip fences / chatty prefixes and strictly decode the first value
+        payload = self.extract_payload(text)
+        if payload is not None:
+            try:
+                data, _ = _DECODER.raw_decode(payload)
+                result = self._validate(data, output_schema)
+                self._stats["extracted"] += 1
+                return result
+            except (json.JSONDecodeError, ValueError):
+                pass
+        candidate = payload if payload is not None else text
+
         # Try ast.literal_eval
         try:
-            data = ast.literal_eval(text)
-            if output_schema:
-                return output_schema.model_validate(data)
-            return data
+            result = self._validate(ast.literal_eval(candidate), output_schema)
+            self._stats["literal"] += 1
+            return result
         except (ValueError, SyntaxError):
             pass
 
         # Try JSON completion
-        result = self.fit(text)
-        if result["status"] == "completed" and "completion" in result.get("data", {}):
-            data = result["data"]["completion"]
-            if output_schema:
-                return output_schema.model_validate(data)
-            return data
+        fitted = self.fit(candidate)
+        if fitted["status"] == "completed" and "completion" in fitted.get("data", {}):
+            try:
+                result = self._validate(fitted["data"]["completion"], output_schema)
+            except ValueError:
+                self._stats["failed"] += 1
+                raise
+            self._stats["repaired"] += 1
+            return result
 
+        self._stats["failed"] += 1
         raise ParserError(f"Failed to parse LLM output: {text[:200]}")
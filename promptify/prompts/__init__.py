@@ -1,3 +1,5 @@
-from promptify.prompts.builder import PromptBuilder
-
-__all__ = ["PromptBuilder"]
+from promptify.prompts.builder import PromptBuilder
+from promptify.prompts.registry import configure_template_cache, warm_templates
+from promptify.prompts.selector import ExampleSelector
+
+__all__ = ["ExampleSelector", "PromptBuilder", "configure_template_cache", "warm_templates"]
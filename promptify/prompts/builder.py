@@ -2,15 +2,105 @@
 
 from __future__ import annotations
 
+import json
 import os
-from typing import Any, Dict, List, Optional, Tuple, Type
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
-from jinja2 import Environment, FileSystemLoader, Template
+from jinja2 import Environment, Template
 from pydantic import BaseModel
 
-from promptify.core.exceptions import TemplateNotFoundError, TemplateMissingVariableError
+from promptify.core.exceptions import (
+    ContextLengthError,
+    TemplateMissingVariableError,
+    TemplateNotFoundError,
+)
+from promptify.prompts.registry import TEMPLATES_DIR, get_template, is_builtin  # noqa: F401
+from promptify.schemas.aliasing import KeyAliases
+from promptify.schemas.artifacts import get_schema_artifacts
+from promptify.utils.tokens import count_message_tokens, count_tokens
 
-TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+# Mixed-case tags so case-changing filters on a variable break the match.
+_SENTINEL_RE = re.compile(r"\x00(Pq|Qp)(\d+)\x00")
+
+
+class CompiledPrompt:
+    """A prompt pre-rendered around its per-call variables.
+
+    Each message is stored as static text pieces interleaved with variable
+    names, so ``build`` is a handful of string concatenations instead of a
+    template render.
+    """
+
+    def __init__(self, messages: List[Tuple[str, List[str], List[str], bool]]) -> None:
+        self._messages = messages
+        self.variables = frozenset(name for _, _, names, _ in messages for name in names)
+
+    def build(self, cache_control: bool = False, **values: str) -> List[Dict[str, Any]]:
+        """Return messages with ``values`` substituted for the variables.
+
+        With ``cache_control``, the message holding the first variable is
+        split into content blocks and the static block before it (everything
+        up to that point is byte-identical across calls) carries an
+        ``ephemeral`` cache-control marker for providers with explicit prompt
+        caching.
+        """
+        out: List[Dict[str, Any]] = []
+        marked = not cache_control
+        for role, pieces, names, strip in self._messages:
+            if not names:
+                out.append({"role": role, "content": pieces[0]})
+                continue
+            parts = [pieces[0]]
+            for name, piece in zip(names, pieces[1:]):
+                parts.append(values[name])
+                parts.append(piece)
+            if marked:
+                content = "".join(parts)
+                out.append({"role": role, "content": content.strip() if strip else content})
+                continue
+
+            marked = True
+            rest = "".join(parts[1:])
+            if strip:
+                rest = rest.rstrip() if pieces[0] else rest.strip()
+            if pieces[0]:
+                out.append(
+                    {
+                        "role": role,
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": pieces[0],
+                                "cache_control": {"type": "ephemeral"},
+                            },
+                            {"type": "text", "text": rest},
+                        ],
+                    }
+                )
+            else:
+                if out:
+                    prev = out[-1]
+                    prev["content"] = [
+                        {
+                            "type": "text",
+                            "text": prev["content"],
+                            "cache_control": {"type": "ephemeral"},
+                        }
+                    ]
+                out.append({"role": role, "content": rest})
+        return out
+
+
+@dataclass
+class BudgetedPrompt:
+    """Messages fitted to a token budget, with their estimated size."""
+
+    messages: List[Dict[str, Any]]
+    prompt_tokens: int
+    examples_used: int = 0
+    truncated: bool = False
 
 
 class PromptBuilder:
@@ -33,21 +123,19 @@ class PromptBuilder:
             self._load_template(template)
 
     def _load_template(self, template: str) -> None:
-        """Load a Jinja2 template by name or path."""
+        """Load a Jinja2 template by name or path from the shared registry."""
         # Check built-in templates first
         jinja_name = template if template.endswith(".jinja") else f"{template}.jinja"
-        builtin_path = os.path.join(TEMPLATES_DIR, jinja_name)
 
-        if os.path.isfile(builtin_path):
-            self._env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
-            self._jinja_template = self._env.get_template(jinja_name)
+        if is_builtin(jinja_name):
+            self._jinja_template = get_template(jinja_name)
         elif os.path.isfile(template):
             # Custom path
             template_dir, template_file = os.path.split(template)
-            self._env = Environment(loader=FileSystemLoader(template_dir))
-            self._jinja_template = self._env.get_template(template_file)
+            self._jinja_template = get_template(template_file, template_dir or os.curdir)
         else:
             raise TemplateNotFoundError(f"Template not found: {template}")
+        self._env = self._jinja_template.environment
 
     def _render_template(self, **kwargs: Any) -> str:
         """Render the Jinja2 template with given variables."""
@@ -55,22 +143,128 @@ class PromptBuilder:
             raise TemplateNotFoundError("No template loaded")
         return self._jinja_template.render(**kwargs).strip()
 
-    def _build_schema_instruction(self, output_schema: Optional[Type[BaseModel]]) -> str:
+    def _build_schema_instruction(
+        self,
+        output_schema: Optional[Type[BaseModel]],
+        key_aliases: Optional[KeyAliases] = None,
+    ) -> str:
         """Generate output format instructions from a Pydantic schema."""
         if output_schema is None:
             return ""
-        schema = output_schema.model_json_schema()
-        fields = []
-        for name, prop in schema.get("properties", {}).items():
-            field_type = prop.get("type", "any")
-            desc = prop.get("description", "")
-            fields.append(f"  - {name}: {field_type}" + (f" ({desc})" if desc else ""))
-        field_str = "\n".join(fields)
+        if key_aliases is not None:
+            return (
+                f"\n\nRespond with valid JSON matching this schema, using the short keys "
+                f"exactly as shown (the full field name is in parentheses):\n"
+                f"{{\n{key_aliases.schema_hint}\n}}"
+            )
+        field_str = get_schema_artifacts(output_schema).schema_hint
         return (
             f"\n\nRespond with valid JSON matching this schema:\n"
             f"{{\n{field_str}\n}}"
         )
 
+    @staticmethod
+    def _minify_example(output: str, key_aliases: KeyAliases) -> str:
+        try:
+            data = json.loads(output)
+        except (json.JSONDecodeError, ValueError):
+            return output
+        return json.dumps(key_aliases.minify(data))
+
+    def compile(
+        self,
+        instruction: str,
+        dynamic: Sequence[str] = ("text_input",),
+        **build_kwargs: Any,
+    ) -> Optional[CompiledPrompt]:
+        """Pre-render everything except the ``dynamic`` variables.
+
+        The prompt is rendered twice with different placeholder values; if
+        both renders split into the same static pieces, the variables are only
+        interpolated (not branched on or filtered) and the split is safe to
+        reuse. Returns None when the template cannot be split that way.
+        """
+        renders = []
+        for tag in ("Pq", "Qp"):
+            values = {name: f"\x00{tag}{i}\x00" for i, name in enumerate(dynamic)}
+            text_input = values.pop("text_input", "")
+            renders.append(
+                self.build(instruction, text_input=text_input, **build_kwargs, **values)
+            )
+
+        if len(renders[0]) != len(renders[1]):
+            return None
+        compiled: List[Tuple[str, List[str], List[str], bool]] = []
+        for msg_a, msg_b in zip(*renders):
+            split_a = _SENTINEL_RE.split(msg_a["content"])
+            split_b = _SENTINEL_RE.split(msg_b["content"])
+            # re.split yields [piece, tag, index, piece, tag, index, ..., piece]
+            pieces, pieces_b = split_a[::3], split_b[::3]
+            names = [dynamic[int(i)] for i in split_a[2::3]]
+            names_b = [dynamic[int(i)] for i in split_b[2::3]]
+            if (
+                msg_a["role"] != msg_b["role"]
+                or pieces != pieces_b
+                or names != names_b
+                or any("\x00" in piece for piece in pieces)
+            ):
+                return None
+            strip = self._jinja_template is not None and msg_a["role"] == "user"
+            compiled.append((msg_a["role"], pieces, names, strip))
+        return CompiledPrompt(compiled)
+
+    def build_budgeted(
+        self,
+        instruction: str,
+        text_input: str,
+        max_prompt_tokens: int,
+        model: Optional[str] = None,
+        truncate: bool = False,
+        examples: Optional[List[Tuple[str, str]]] = None,
+        **build_kwargs: Any,
+    ) -> BudgetedPrompt:
+        """Build messages that fit in ``max_prompt_tokens`` tokens of ``model``.
+
+        Few-shot examples are dropped first, from the front of the list (with
+        ``ExampleSelector`` ordering, the least similar ones). If the prompt is
+        still too long, ``text_input`` is cut to fit when ``truncate`` is set;
+        otherwise ``ContextLengthError`` is raised.
+
+        Returns
+        -------
+        BudgetedPrompt
+            The messages and their token count.
+        """
+        examples = list(examples or [])
+        while True:
+            messages = self.build(instruction, text_input, examples=examples, **build_kwargs)
+            tokens = count_message_tokens(messages, model)
+            if tokens <= max_prompt_tokens:
+                return BudgetedPrompt(messages, tokens, len(examples))
+            if not examples:
+                break
+            examples.pop(0)
+
+        if not truncate:
+            raise ContextLengthError(
+                f"Prompt needs {tokens} tokens but the budget is {max_prompt_tokens}"
+            )
+        overhead = count_message_tokens(self.build(instruction, "", **build_kwargs), model)
+        if overhead >= max_prompt_tokens:
+            raise ContextLengthError(
+                f"Prompt without input needs {overhead} tokens but the budget is "
+                f"{max_prompt_tokens}"
+            )
+        text = text_input
+        text_tokens = max(count_tokens(text, model), 1)
+        while tokens > max_prompt_tokens and text:
+            keep = (max_prompt_tokens - overhead) / text_tokens
+            text = text[: int(len(text) * min(keep, 0.95))]
+            messages = self.build(instruction, text, **build_kwargs)
+            tokens = count_message_tokens(messages, model)
+            text_tokens = max(count_tokens(text, model), 1)
+        return BudgetedPrompt(messages, tokens, 0, truncated=True)
+
     def build(
         self,
         instruction: str,
@@ -79,10 +273,14 @@ class PromptBuilder:
         labels: Optional[List[str]] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         output_schema: Optional[Type[BaseModel]] = None,
+        key_aliases: Optional[KeyAliases] = None,
         **kwargs: Any,
     ) -> List[Dict[str, str]]:
         """Build OpenAI-format messages.
 
+        With ``key_aliases``, the schema hint advertises short keys and JSON
+        few-shot outputs are rewritten to use them.
+
         Returns
         -------
         list of dict
@@ -103,7 +301,7 @@ class PromptBuilder:
             rendered = self._render_template(**template_vars)
 
             system_content = instruction
-            schema_hint = self._build_schema_instruction(output_schema)
+            schema_hint = self._build_schema_instruction(output_schema, key_aliases)
             if schema_hint:
                 system_content += schema_hint
 
@@ -112,7 +310,7 @@ class PromptBuilder:
         else:
             # No template: instruction-based prompt
             system_content = instruction
-            schema_hint = self._build_schema_instruction(output_schema)
+            schema_hint = self._build_schema_instruction(output_schema, key_aliases)
             if schema_hint:
                 system_content += schema_hint
 
@@ -121,6 +319,8 @@ class PromptBuilder:
             # Inject few-shot examples
             if examples:
                 for ex_input, ex_output in examples:
+                    if key_aliases is not None:
+                        ex_output = self._minify_example(ex_output, key_aliases)
                     messages.append({"role": "user", "content": ex_input})
                     messages.append({"role": "assistant", "content": ex_output})
 
@@ -0,0 +1,117 @@
+"""Process-wide registry of compiled Jinja2 templates.
+
+Every ``PromptBuilder`` used to create its own ``Environment`` and recompile
+its template. The registry keeps one environment per template directory and
+compiles each template once per process. An optional persistent bytecode
+cache (``PROMPTIFY_TEMPLATE_CACHE_DIR`` or ``configure_template_cache``)
+skips compilation across processes too, which speeds up cold starts.
+
+Warm the cache at install or image-build time with::
+
+    PROMPTIFY_TEMPLATE_CACHE_DIR=/var/cache/promptify python -m promptify.prompts.registry
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+CACHE_DIR_ENV = "PROMPTIFY_TEMPLATE_CACHE_DIR"
+
+_lock = threading.Lock()
+_environments: Dict[str, Environment] = {}
+_templates: Dict[Tuple[str, str], Template] = {}
+_bytecode_cache: Optional[BytecodeCache] = None
+_bytecode_cache_configured = False
+
+
+def configure_template_cache(directory: Optional[str]) -> None:
+    """Enable a persistent bytecode cache in ``directory`` (None disables it).
+
+    Clears the registry so subsequent loads use the new setting.
+    """
+    global _bytecode_cache, _bytecode_cache_configured
+    with _lock:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            _bytecode_cache = FileSystemBytecodeCache(directory)
+        else:
+            _bytecode_cache = None
+        _bytecode_cache_configured = True
+        _environments.clear()
+        _templates.clear()
+
+
+def _get_environment(directory: str) -> Environment:
+    global _bytecode_cache, _bytecode_cache_configured
+    env = _environments.get(directory)
+    if env is None:
+        if not _bytecode_cache_configured:
+            cache_dir = os.environ.get(CACHE_DIR_ENV)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                _bytecode_cache = FileSystemBytecodeCache(cache_dir)
+            _bytecode_cache_configured = True
+        env = Environment(
+            loader=FileSystemLoader(directory),
+            bytecode_cache=_bytecode_cache,
+            # Built-in templates ship with the package and never change.
+            auto_reload=directory != TEMPLATES_DIR,
+        )
+        _environments[directory] = env
+    return env
+
+
+def get_template(name: str, directory: str = TEMPLATES_DIR) -> Template:
+    """Return the compiled template ``name`` from ``directory``, compiling once."""
+    directory = os.path.abspath(directory)
+    key = (directory, name)
+    template = _templates.get(key)
+    if template is None:
+        with _lock:
+            template = _templates.get(key)
+            if template is None:
+                template = _get_environment(directory).get_template(name)
+                if directory == TEMPLATES_DIR:
+                    _templates[key] = template
+    return template
+
+
+@lru_cache(maxsize=1)
+def _builtin_names() -> Tuple[str, ...]:
+    return tuple(sorted(f for f in os.listdir(TEMPLATES_DIR) if f.endswith(".jinja")))
+
+
+def is_builtin(name: str) -> bool:
+    """Whether ``name`` (with ``.jinja`` suffix) is a shipped template."""
+    return name in _builtin_names()
+
+
+def builtin_templates() -> List[str]:
+    """Names of the templates shipped with Promptify."""
+    return list(_builtin_names())
+
+
+def warm_templates() -> List[str]:
+    """Compile every built-in template (filling the bytecode cache if enabled)."""
+    names = builtin_templates()
+    for name in names:
+        get_template(name)
+    return names
+
+
+def clear_registry() -> None:
+    """Drop all compiled templates and environments."""
+    with _lock:
+        _environments.clear()
+        _templates.clear()
+
+
+if __name__ == "__main__":
+    compiled = warm_templates()
+    print(f"Compiled {len(compiled)} templates")
@@ -0,0 +1,69 @@
+"""Per-input few-shot example selection."""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+from promptify.utils.index import TfidfIndex
+from promptify.utils.tokens import estimate_tokens
+
+
+class ExampleSelector:
+    """Pick the few-shot examples most similar to each input.
+
+    The example inputs are indexed once; each call scores only the examples
+    sharing a term with the input and keeps the best ``k`` that fit in
+    ``max_tokens`` (input plus output, estimated).
+
+    Parameters
+    ----------
+    examples : list of (input, output) tuples
+        The full example pool.
+    k : int
+        Maximum number of examples per prompt.
+    max_tokens : int or None
+        Token budget for the selected examples. None means no budget.
+
+    Example
+    -------
+    >>> selector = ExampleSelector(pool, k=4, max_tokens=600)
+    >>> selector.select("Patient was given 50mg aspirin")
+    """
+
+    def __init__(
+        self,
+        examples: Sequence[Tuple[str, str]],
+        k: int = 4,
+        max_tokens: Optional[int] = None,
+    ) -> None:
+        self.examples = list(examples)
+        self.k = k
+        self.max_tokens = max_tokens
+        self._index = TfidfIndex([inp for inp, _ in self.examples])
+        self._costs = [estimate_tokens(inp) + estimate_tokens(out) for inp, out in self.examples]
+
+    def select_ids(self, text: str) -> Tuple[int, ...]:
+        """Positions of the selected examples, most similar last."""
+        return self._fit(self._index.query(text, self.k))
+
+    def select(self, text: str) -> List[Tuple[str, str]]:
+        """The selected examples, most similar last (closest to the input)."""
+        return [self.examples[i] for i in self.select_ids(text)]
+
+    def select_many(self, texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+        """``select`` for a batch of inputs, scoring repeated inputs once."""
+        return [
+            [self.examples[i] for i in self._fit(ranked)]
+            for ranked in self._index.query_many(texts, self.k)
+        ]
+
+    def _fit(self, ranked: List[Tuple[int, float]]) -> Tuple[int, ...]:
+        chosen = []
+        budget = self.max_tokens
+        for doc_id, _ in ranked:
+            if budget is not None:
+                if self._costs[doc_id] > budget:
+                    continue
+                budget -= self._costs[doc_id]
+            chosen.append(doc_id)
+        return tuple(reversed(chosen))
@@ -0,0 +1,232 @@
+"""Short-key aliasing for output schemas.
+
+Long descriptive field names are repeated for every object the model emits.
+``KeyAliases`` advertises a minified copy of a schema (``primary_diagnosis``
+becomes ``pd``) and maps the short keys back to the real field names before
+validation, so callers never see the aliases.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+import threading
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+from promptify.schemas.artifacts import make_response_format
+
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+# Rough characters-per-token ratio used to estimate savings.
+_CHARS_PER_TOKEN = 4
+
+
+def _initials(name: str) -> str:
+    words = _WORD_RE.findall(name) or [name]
+    return "".join(w[0] for w in words).lower()
+
+
+def _strip_aliases(node: Any) -> Any:
+    if isinstance(node, dict):
+        return {k: _strip_aliases(v) for k, v in node.items() if k != "x-aliases"}
+    if isinstance(node, list):
+        return [_strip_aliases(v) for v in node]
+    return node
+
+
+class KeyAliases:
+    """Bidirectional short-key mapping for a Pydantic output schema.
+
+    Aliases are derived from the initials of each field name and assigned
+    per object type, so two models may reuse the same short key and keys of
+    free-form ``Dict`` fields are never renamed.
+    """
+
+    def __init__(self, output_schema: Type[BaseModel]) -> None:
+        self.output_schema = output_schema
+        source = output_schema.model_json_schema()
+        # Annotated tree (with "x-aliases" per object) used for expansion;
+        # json_schema is the clean copy advertised to the model.
+        self._tree = self._minify(source)
+        defs = {name: self._minify(node) for name, node in source.get("$defs", {}).items()}
+        if defs:
+            self._tree["$defs"] = defs
+        self.json_schema = _strip_aliases(self._tree)
+        self.response_format = make_response_format(output_schema.__name__, self.json_schema)
+        self.schema_hint = self._render_hint()
+        self._lock = threading.Lock()
+        self._responses = 0
+        self._keys_expanded = 0
+        self._chars_saved = 0
+
+    @staticmethod
+    def _assign(names: List[str]) -> Dict[str, str]:
+        """Map each field name to a unique alias no longer than itself."""
+        mapping: Dict[str, str] = {}
+        used = set()
+        for name in names:
+            if len(_initials(name)) >= len(name):
+                mapping[name] = name
+                used.add(name)
+        for name in names:
+            if name in mapping:
+                continue
+            alias = candidate = _initials(name)
+            suffix = 2
+            while candidate in used or (candidate in names and candidate != name):
+                candidate = f"{alias}{suffix}"
+                suffix += 1
+            if len(candidate) >= len(name):
+                candidate = name
+            mapping[name] = candidate
+            used.add(candidate)
+        return {name: mapping[name] for name in names}
+
+    def _minify(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        node = copy.deepcopy(node)
+        node.pop("$defs", None)
+        props = node.get("properties")
+        if props:
+            mapping = self._assign(list(props))
+            node["properties"] = {
+                mapping[name]: {**prop, "title": name} for name, prop in props.items()
+            }
+            if "required" in node:
+                node["required"] = [mapping[name] for name in node["required"]]
+            node["x-aliases"] = {alias: name for name, alias in mapping.items()}
+        return node
+
+    @property
+    def mapping(self) -> Dict[str, str]:
+        """Field name -> alias for the top-level schema."""
+        return {name: alias for alias, name in self._tree.get("x-aliases", {}).items()}
+
+    def _resolve(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        while "$ref" in node:
+            node = self._tree["$defs"][node["$ref"].rsplit("/", 1)[-1]]
+        return node
+
+    def _expand(self, data: Any, node: Dict[str, Any], counts: List[int]) -> Any:
+        """Expand ``data``, adding keys renamed and characters saved to ``counts``."""
+        node = self._resolve(node)
+        if "anyOf" in node:
+            for option in node["anyOf"]:
+                option = self._resolve(option)
+                if isinstance(data, dict) and option.get("type") == "object":
+                    return self._expand(data, option, counts)
+                if isinstance(data, list) and option.get("type") == "array":
+                    return self._expand(data, option, counts)
+            return data
+        if isinstance(data, list):
+            items = node.get("items", {})
+            return [self._expand(item, items, counts) for item in data]
+        if not isinstance(data, dict):
+            return data
+
+        aliases = node.get("x-aliases")
+        if aliases is None:
+            values = node.get("additionalProperties")
+            if isinstance(values, dict):
+                return {k: self._expand(v, values, counts) for k, v in data.items()}
+            return data
+
+        props = node.get("properties", {})
+        out: Dict[str, Any] = {}
+        for key, value in data.items():
+            name = aliases.get(key, key)
+            if name != key:
+                counts[0] += 1
+                counts[1] += len(name) - len(key)
+            out[name] = self._expand(value, props.get(key, {}), counts)
+        return out
+
+    def _record(self, counts: List[int]) -> None:
+        with self._lock:
+            self._responses += 1
+            self._keys_expanded += counts[0]
+            self._chars_saved += counts[1]
+
+    def expand(self, data: Any) -> Any:
+        """Rename short keys in ``data`` back to the real field names."""
+        counts = [0, 0]
+        expanded = self._expand(data, self._tree, counts)
+        self._record(counts)
+        return expanded
+
+    def validate(self, data: Any) -> BaseModel:
+        """Expand ``data`` and validate it against the output schema.
+
+        Savings are only counted once validation succeeds, so a response
+        that is expanded again after a failed attempt is counted once.
+        """
+        counts = [0, 0]
+        result = self.output_schema.model_validate(self._expand(data, self._tree, counts))
+        self._record(counts)
+        return result
+
+    def minify(self, data: Any) -> Any:
+        """Rename real field names to short keys (e.g. for few-shot outputs)."""
+        return self._minify_data(data, self._tree)
+
+    def _minify_data(self, data: Any, node: Dict[str, Any]) -> Any:
+        node = self._resolve(node)
+        if "anyOf" in node:
+            for option in node["anyOf"]:
+                option = self._resolve(option)
+                if isinstance(data, dict) and option.get("type") == "object":
+                    return self._minify_data(data, option)
+                if isinstance(data, list) and option.get("type") == "array":
+                    return self._minify_data(data, option)
+            return data
+        if isinstance(data, list):
+            return [self._minify_data(item, node.get("items", {})) for item in data]
+        if not isinstance(data, dict):
+            return data
+
+        aliases = node.get("x-aliases")
+        if aliases is None:
+            values = node.get("additionalProperties")
+            if isinstance(values, dict):
+                return {k: self._minify_data(v, values) for k, v in data.items()}
+            return data
+        to_alias = {name: alias for alias, name in aliases.items()}
+        props = node.get("properties", {})
+        return {
+            to_alias.get(k, k): self._minify_data(v, props.get(to_alias.get(k, k), {}))
+            for k, v in data.items()
+        }
+
+    @staticmethod
+    def _field_lines(node: Dict[str, Any]) -> List[str]:
+        lines = []
+        for alias, prop in node.get("properties", {}).items():
+            field_type = prop.get("type", "any")
+            desc = prop.get("description", "")
+            meaning = prop["title"] + (f"; {desc}" if desc else "")
+            lines.append(f"  - {alias}: {field_type} ({meaning})")
+        return lines
+
+    def _render_hint(self) -> str:
+        """Field list for the prompt, naming the real field behind each alias.
+
+        Nested object types get their own section so the model also learns
+        their short keys.
+        """
+        lines = self._field_lines(self.json_schema)
+        for name, node in self.json_schema.get("$defs", {}).items():
+            lines.append(f"  {name} objects:")
+            lines.extend("  " + line for line in self._field_lines(node))
+        return "\n".join(lines)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Savings achieved so far, measured on the responses decoded."""
+        with self._lock:
+            return {
+                "responses": self._responses,
+                "keys_expanded": self._keys_expanded,
+                "chars_saved": self._chars_saved,
+                "est_tokens_saved": self._chars_saved // _CHARS_PER_TOKEN,
+            }
@@ -0,0 +1,61 @@
+"""Per-schema artifacts computed once and shared by every call.
+
+The JSON schema, the ``response_format`` payload, the prompt schema hint and
+a pydantic ``TypeAdapter`` depend only on the output schema class, so they
+are built on first use and memoized per class.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+
+def render_schema_hint(json_schema: Dict[str, Any]) -> str:
+    """Field list used in the prompt's output format instruction."""
+    fields = []
+    for name, prop in json_schema.get("properties", {}).items():
+        field_type = prop.get("type", "any")
+        desc = prop.get("description", "")
+        fields.append(f"  - {name}: {field_type}" + (f" ({desc})" if desc else ""))
+    return "\n".join(fields)
+
+
+def make_response_format(name: str, json_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAI-style ``json_schema`` response format payload."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "schema": json_schema,
+            "strict": False,
+        },
+    }
+
+
+@dataclass(frozen=True)
+class SchemaArtifacts:
+    """Precomputed, read-only artifacts for one output schema class."""
+
+    json_schema: Dict[str, Any]
+    response_format: Dict[str, Any]
+    schema_hint: str
+    adapter: TypeAdapter
+
+
+@lru_cache(maxsize=256)
+def get_schema_artifacts(output_schema: Type[BaseModel]) -> SchemaArtifacts:
+    """Return the memoized artifacts for ``output_schema``.
+
+    The returned dicts are shared between calls and must not be mutated.
+    """
+    json_schema = output_schema.model_json_schema()
+    return SchemaArtifacts(
+        json_schema=json_schema,
+        response_format=make_response_format(output_schema.__name__, json_schema),
+        schema_hint=render_schema_hint(json_schema),
+        adapter=TypeAdapter(output_schema),
+    )
@@ -1,15 +1,21 @@
 from promptify.tasks.base import BaseTask, Task
+from promptify.tasks.cascade import Cascade
 from promptify.tasks.classify import Classify
+from promptify.tasks.composite import Composite
 from promptify.tasks.extract import ExtractRelations, ExtractTable
 from promptify.tasks.generate import GenerateQuestions, GenerateSQL
 from promptify.tasks.ner import NER
 from promptify.tasks.normalize import ExtractTopics, NormalizeText
+from promptify.tasks.pipeline import Pipeline
 from promptify.tasks.qa import QA
 from promptify.tasks.summarize import Summarize
 
 __all__ = [
     "BaseTask",
     "Task",
+    "Cascade",
+    "Composite",
+    "Pipeline",
     "NER",
     "Classify",
     "QA",
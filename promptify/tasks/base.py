@@ -3,27 +3,105 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+import threading
 from abc import ABC
-from typing import Any, Dict, List, Optional, Tuple, Type
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel
 
 from promptify.core.config import ModelConfig
-from promptify.engine.cost import track_cost
-from promptify.engine.llm import LLMEngine
+from promptify.core.exceptions import ConfigurationError, ContextLengthError, ParserError
+from promptify.engine.adaptive import AdaptiveMaxTokens, default_tracker
+from promptify.engine.cost import CostAccumulator, track_cost
+from promptify.engine.llm import LLMEngine, LLMResponse
+from promptify.parser.compact import LineParser
 from promptify.parser.parser import Parser
-from promptify.prompts.builder import PromptBuilder
+from promptify.prompts.builder import CompiledPrompt, PromptBuilder
+from promptify.prompts.selector import ExampleSelector
+from promptify.schemas.aliasing import KeyAliases
+from promptify.utils.rules import RuleSet
+from promptify.utils.tokens import context_window, count_message_tokens
 
 logger = logging.getLogger("promptify")
 
+T = TypeVar("T")
+
+#: Batch dedupe key: a text-to-text callable or rule name(s) from ``promptify.utils.rules``.
+Normalizer = Union[Callable[[str], str], str, Sequence[str]]
+
+# Task keyword arguments passed on to the engine's ``ModelConfig``.
+_MODEL_KWARGS = frozenset(
+    {
+        "temperature",
+        "top_p",
+        "max_tokens",
+        "stop",
+        "presence_penalty",
+        "frequency_penalty",
+        "timeout",
+        "max_retries",
+    }
+)
+
+# Pre-rendered prompts kept per task (one per distinct example selection).
+_COMPILED_CACHE_SIZE = 32
+
 
 class BaseTask(ABC):
     """Abstract base for all NLP tasks.
 
     Subclasses set default output_schema, instruction, and template.
+
+    ``short_keys=True`` advertises a minified schema with short keys to the
+    model and maps them back before validation; ``key_aliases.stats`` reports
+    the completion tokens saved. It is only available for instruction-only
+    prompts, since the built-in templates spell out their JSON keys.
+
+    The prompt is rendered once around ``dynamic_vars`` and reused, so a call
+    only pays for string concatenation. Changes to ``labels`` and
+    ``examples`` and reassigned attributes are picked up automatically; after
+    mutating an example pool or other attributes in place, call
+    ``invalidate_prompt_cache()``.
+
+    ``prompt_cache=True`` keeps that pre-rendered static content in leading,
+    byte-identical message blocks and, for providers that need it
+    (Anthropic, Bedrock, Vertex AI), marks the end of the static prefix with
+    ``cache_control`` so it is served from the provider's prompt cache.
+    Cached prompt tokens are reported as ``cached_tokens`` in
+    ``get_cost_summary()``.
+
+    With ``max_examples`` and/or ``example_budget`` set, ``examples`` is
+    treated as a pool: each call includes only the examples most similar to
+    its input (see ``ExampleSelector``), at most ``max_examples`` of them and
+    at most ``example_budget`` estimated tokens in total.
+
+    ``preflight=True`` (implied by ``max_prompt_tokens``) counts prompt
+    tokens locally with the model's tokenizer before sending. Prompts over
+    budget (``max_prompt_tokens``, else the model's context window) raise
+    ``ContextLengthError`` without a network round-trip, or with
+    ``truncate_input=True`` shed few-shot examples and then input text until
+    they fit. Unless ``max_tokens`` is configured, it is set from the room
+    left in the context window.
     """
 
+    #: Template variables that change per call; everything else is pre-rendered.
+    dynamic_vars: Tuple[str, ...] = ("text_input",)
+
     def __init__(
         self,
         model: str,
@@ -34,23 +112,19 @@ class BaseTask(ABC):
         labels: Optional[List[str]] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         api_key: Optional[str] = None,
+        short_keys: bool = False,
+        prompt_cache: bool = False,
+        max_examples: Optional[int] = None,
+        example_budget: Optional[int] = None,
+        preflight: bool = False,
+        max_prompt_tokens: Optional[int] = None,
+        truncate_input: bool = False,
+        adaptive_max_tokens: Union[bool, AdaptiveMaxTokens] = False,
         **kwargs: Any,
     ) -> None:
-        model_kwargs = {
-            k: v
-            for k, v in kwargs.items()
-            if k
-            in {
-                "temperature",
-                "top_p",
-                "max_tokens",
-                "stop",
-                "presence_penalty",
-                "frequency_penalty",
-                "timeout",
-                "max_retries",
-            }
-        }
+        if short_keys and template is not None:
+            raise ConfigurationError("short_keys requires a task without a template")
+        model_kwargs = {k: v for k, v in kwargs.items() if k in _MODEL_KWARGS}
         self.engine = LLMEngine(ModelConfig(model=model, api_key=api_key, **model_kwargs))
         self.output_schema = output_schema
         self.instruction = instruction
@@ -59,45 +133,299 @@ class BaseTask(ABC):
         self.examples = examples
         self.prompt_builder = PromptBuilder(template=template)
         self.parser = Parser()
+        self.line_parser: Optional[LineParser] = None
+        self.key_aliases = KeyAliases(output_schema) if short_keys else None
         self._extra_kwargs = {
             k: v for k, v in kwargs.items() if k not in model_kwargs
         }
+        self.max_examples = max_examples
+        self.example_budget = example_budget
+        self.preflight = preflight or max_prompt_tokens is not None
+        self.max_prompt_tokens = max_prompt_tokens
+        self.truncate_input = truncate_input
+        self.max_tokens_tracker: Optional[AdaptiveMaxTokens] = (
+            default_tracker if adaptive_max_tokens is True else adaptive_max_tokens or None
+        )
+        self.usage = CostAccumulator()
+        self._dedupe_lock = threading.Lock()
+        self._dedupe_counts = [0, 0]
+        self._selector: Optional[Tuple[Any, Tuple[Any, ...], ExampleSelector]] = None
+        self._compiled: "OrderedDict[Tuple[Any, ...], Optional[CompiledPrompt]]" = OrderedDict()
+        self._cache_markers = prompt_cache and self.engine.uses_cache_markers
+
+    @property
+    def request_schema(self) -> Optional[Type[BaseModel]]:
+        """Schema advertised to the model — None for line-oriented output."""
+        return None if self.line_parser is not None else self.output_schema
+
+    def invalidate_prompt_cache(self) -> None:
+        """Drop the pre-rendered prompt (after in-place edits to task attributes)."""
+        self._compiled.clear()
+        self._selector = None
+
+    @property
+    def _selects_examples(self) -> bool:
+        """Whether ``examples`` is a pool sampled per input."""
+        return bool(self.examples) and (
+            self.max_examples is not None or self.example_budget is not None
+        )
+
+    def _select_examples(self, text: str, **kwargs: Any) -> Optional[List[Tuple[str, str]]]:
+        """Examples to include for this input."""
+        if not self._selects_examples:
+            return self.examples
+        config = (self.max_examples, self.example_budget)
+        if (
+            self._selector is None
+            or self._selector[0] is not self.examples
+            or self._selector[1] != config
+        ):
+            selector = ExampleSelector(
+                self.examples,
+                k=self.max_examples if self.max_examples is not None else len(self.examples),
+                max_tokens=self.example_budget,
+            )
+            self._selector = (self.examples, config, selector)
+        selector = self._selector[2]
+        query = " ".join([text, *(v for v in kwargs.values() if isinstance(v, str))])
+        return selector.select(query)
 
-    def _build_messages(self, text: str, **kwargs: Any) -> List[Dict[str, str]]:
+    def _shortlist_labels(self, text: str, **kwargs: Any) -> Optional[List[str]]:
+        """Labels to show for this input, or None to use all of ``labels``."""
+        return None
+
+    def _compiled_prompt(
+        self, examples: Optional[List[Tuple[str, str]]]
+    ) -> Optional[CompiledPrompt]:
+        # Keyed on values (and on objects held by the key, not their ids, which
+        # can be reused once the object is garbage collected).
+        key = (
+            self.instruction,
+            self.domain,
+            None if self.labels is None else tuple(self.labels),
+            None if examples is None else tuple(tuple(pair) for pair in examples),
+            self.request_schema,
+            self.key_aliases,
+            self.prompt_builder,
+        )
+        if key in self._compiled:
+            self._compiled.move_to_end(key)
+            return self._compiled[key]
+        compiled = self.prompt_builder.compile(
+            instruction=self.instruction,
+            dynamic=self.dynamic_vars,
+            domain=self.domain,
+            labels=self.labels,
+            examples=examples,
+            output_schema=self.request_schema,
+            key_aliases=self.key_aliases,
+            **{k: v for k, v in self._extra_kwargs.items() if k not in self.dynamic_vars},
+        )
+        self._compiled[key] = compiled
+        if len(self._compiled) > _COMPILED_CACHE_SIZE:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def _build_messages(self, text: str, **kwargs: Any) -> List[Dict[str, Any]]:
         """Build prompt messages for this task."""
+        examples = self._select_examples(text, **kwargs)
+        labels = self._shortlist_labels(text, **kwargs)
+        # Per-input examples rarely repeat, so pre-rendering would almost
+        # always miss; it is only worth it for the cache markers.
+        compile_prompt = self._cache_markers or not self._selects_examples
+        if compile_prompt and labels is None and text and all(
+            k in self.dynamic_vars and isinstance(v, str) and v for k, v in kwargs.items()
+        ):
+            compiled = self._compiled_prompt(examples)
+            if compiled is not None and compiled.variables <= {"text_input", *kwargs}:
+                return compiled.build(
+                    cache_control=self._cache_markers, text_input=text, **kwargs
+                )
+
+        builder, instruction, schema = self._prompt_spec(**kwargs)
         merged = {**self._extra_kwargs, **kwargs}
-        return self.prompt_builder.build(
-            instruction=self.instruction,
+        return builder.build(
+            instruction=instruction,
             text_input=text,
             domain=self.domain,
-            labels=self.labels,
-            examples=self.examples,
-            output_schema=self.output_schema,
+            labels=self.labels if labels is None else labels,
+            examples=examples,
+            output_schema=schema,
+            key_aliases=self.key_aliases,
             **merged,
         )
 
-    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
-        """Synchronous execution."""
+    def _prompt_spec(
+        self, **kwargs: Any
+    ) -> Tuple[PromptBuilder, str, Optional[Type[BaseModel]]]:
+        """Prompt builder, instruction and advertised schema for a call with ``kwargs``."""
+        return self.prompt_builder, self.instruction, self.request_schema
+
+    def estimate_prompt_tokens(self, text: str, **kwargs: Any) -> int:
+        """Prompt tokens this input would use, counted locally."""
+        return count_message_tokens(self._build_messages(text, **kwargs), self.engine.config.model)
+
+    def _tracker_key(self, schema: Optional[Type[BaseModel]] = None) -> Tuple[str, str, str]:
+        """Completion-length key; ``schema`` is given for non-default request shapes.
+
+        The model is part of the key, since tasks on different models share
+        the process-wide tracker but produce different completion lengths.
+        """
+        task, model = type(self).__name__, self.engine.config.model
+        if schema is not None:
+            return task, model, schema.__name__
+        if self.request_schema is None or self.output_schema is None:
+            return task, model, "lines"
+        return task, model, self.output_schema.__name__
+
+    def _prepare(self, text: str, **kwargs: Any) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Messages for ``text`` plus per-request engine parameters."""
         messages = self._build_messages(text, **kwargs)
-        response = self.engine.complete(messages, output_schema=self.output_schema)
+        request: Dict[str, Any] = {}
+        if self.preflight:
+            messages, request = self._preflight(messages, text, **kwargs)
+        if self.max_tokens_tracker is not None and not self.engine.config.max_tokens:
+            schema = self._prompt_spec(**kwargs)[2]
+            key = self._tracker_key(None if schema is self.request_schema else schema)
+            cap = self.max_tokens_tracker.limit(key)
+            if cap is not None:
+                request["max_tokens"] = min(cap, request.get("max_tokens", cap))
+        return messages, request
+
+    def _preflight(
+        self, messages: List[Dict[str, Any]], text: str, **kwargs: Any
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Check ``messages`` against the token budget, trimming if allowed."""
+        config = self.engine.config
+        window, max_output = context_window(config.model)
+        budget = self.max_prompt_tokens
+        if window is not None:
+            room = window - (config.max_tokens or 0)
+            budget = room if budget is None else min(budget, room)
+        if budget is None:
+            return messages, {}
+
+        tokens = count_message_tokens(messages, config.model)
+        if tokens > budget:
+            if not self.truncate_input:
+                raise ContextLengthError(
+                    f"Prompt needs {tokens} tokens but the budget for {config.model} "
+                    f"is {budget}"
+                )
+            examples = self._select_examples(text, **kwargs)
+            builder, instruction, schema = self._prompt_spec(**kwargs)
+            fitted = builder.build_budgeted(
+                instruction=instruction,
+                text_input=text,
+                max_prompt_tokens=budget,
+                model=config.model,
+                truncate=True,
+                examples=examples,
+                domain=self.domain,
+                labels=self._shortlist_labels(text, **kwargs) or self.labels,
+                output_schema=schema,
+                key_aliases=self.key_aliases,
+                **{**self._extra_kwargs, **kwargs},
+            )
+            messages, tokens = fitted.messages, fitted.prompt_tokens
+            logger.debug("Prompt fitted to %d tokens (truncated=%s)", tokens, fitted.truncated)
+
+        request: Dict[str, Any] = {}
+        if config.max_tokens is None and window is not None:
+            remaining = window - tokens
+            request["max_tokens"] = min(remaining, max_output) if max_output else remaining
+        return messages, request
+
+    def cost_summary(self) -> Dict[str, Any]:
+        """Cost and token usage of this task's calls (``get_cost_summary`` is global)."""
+        return self.usage.summary()
+
+    def _track(self, response: LLMResponse) -> None:
+        """Record ``response`` usage globally and for this task."""
         track_cost(response.cost, response.usage)
+        self.usage.add(response.cost, response.usage)
+
+    def _record(self, response: LLMResponse, schema: Optional[Type[BaseModel]] = None) -> None:
+        """Record usage and completion length for ``response``.
+
+        ``schema`` is the request schema when it is not the task's own (see
+        ``_prompt_spec``), so its completion lengths are tracked separately.
+        """
+        self._track(response)
+        if self.max_tokens_tracker is not None and "completion_tokens" in response.usage:
+            self.max_tokens_tracker.observe(
+                self._tracker_key(schema), response.usage["completion_tokens"], response.truncated
+            )
+        if response.truncated:
+            logger.debug("Response hit max_tokens; decoding through JSON repair")
+
+    def _finish(self, response: LLMResponse) -> BaseModel:
+        """Record usage for ``response`` and decode it."""
+        self._record(response)
+        return self._decode(response)
+
+    def _finalize(self, text: str, result: BaseModel) -> BaseModel:
+        """Post-process a decoded ``result`` for ``text``; used for fused calls."""
+        return result
+
+    def _decode(self, response: LLMResponse) -> BaseModel:
+        """Turn an engine response into an ``output_schema`` instance."""
+        if self.line_parser is not None:
+            try:
+                return self.line_parser.parse(response.text)
+            except ParserError:
+                # The model ignored the line format; try the reply as JSON.
+                logger.debug("No compact records in response; parsing it as JSON")
         if response.parsed:
             return response.parsed
+        if self.key_aliases is not None:
+            return self.key_aliases.validate(self.parser.parse(response.text))
         return self.parser.parse(response.text, self.output_schema)
 
+    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
+        """Synchronous execution."""
+        messages, request = self._prepare(text, **kwargs)
+        response = self.engine.complete(
+            messages, output_schema=self.request_schema, key_aliases=self.key_aliases, **request
+        )
+        return self._finish(response)
+
     async def acall(self, text: str, **kwargs: Any) -> BaseModel:
         """Async execution."""
-        messages = self._build_messages(text, **kwargs)
-        response = await self.engine.acomplete(messages, output_schema=self.output_schema)
-        track_cost(response.cost, response.usage)
-        if response.parsed:
-            return response.parsed
-        return self.parser.parse(response.text, self.output_schema)
+        messages, request = self._prepare(text, **kwargs)
+        response = await self.engine.acomplete(
+            messages, output_schema=self.request_schema, key_aliases=self.key_aliases, **request
+        )
+        return self._finish(response)
 
     def batch(
-        self, texts: List[str], max_concurrent: int = 5, **kwargs: Any
+        self,
+        texts: List[str],
+        max_concurrent: int = 5,
+        dedupe: bool = False,
+        normalizer: Optional[Normalizer] = None,
+        **kwargs: Any,
     ) -> List[BaseModel]:
-        """Batch processing with async concurrency under the hood."""
+        """Batch processing with async concurrency under the hood.
+
+        With ``dedupe=True``, inputs that are equal after ``normalizer`` (a
+        callable, or rule names from ``promptify.utils.rules`` such as
+        ``"normalize_whitespace"``; default: exact match) are sent once and
+        the first one's result is copied to the others, so repeated inputs
+        get one sample rather than one each. Copies for inputs that differ
+        from the one sent are re-run through ``_finalize`` with their own
+        text, which re-anchors offsets for tasks that align them (``NER``
+        with ``align_spans``); other position-bearing fields still refer to
+        the text that was sent. ``dedupe_stats()`` reports how many requests
+        this saved.
+        """
+        if dedupe:
+            unique, positions = _dedupe(texts, normalizer)
+        else:
+            unique, positions = list(texts), list(range(len(texts)))
+        with self._dedupe_lock:
+            self._dedupe_counts[0] += len(texts)
+            self._dedupe_counts[1] += len(unique)
 
         async def _run() -> List[BaseModel]:
             semaphore = asyncio.Semaphore(max_concurrent)
@@ -106,21 +434,64 @@ class BaseTask(ABC):
                 async with semaphore:
                     return await self.acall(text, **kwargs)
 
-            return await asyncio.gather(*[_process(t) for t in texts])
+            return await asyncio.gather(*[_process(t) for t in unique])
+
+        results = _run_sync(_run)
+        out: List[BaseModel] = []
+        used = [False] * len(results)
+        for text, position in zip(texts, positions):
+            result = results[position]
+            if used[position]:
+                result = result.model_copy(deep=True)
+                if text != unique[position]:
+                    result = self._finalize(text, result)
+            out.append(result)
+            used[position] = True
+        return out
 
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
+    def dedupe_stats(self) -> Dict[str, Any]:
+        """Batch items seen, unique items sent and the share saved by dedupe."""
+        with self._dedupe_lock:
+            items, unique = self._dedupe_counts
+        return {
+            "items": items,
+            "unique": unique,
+            "dedupe_ratio": round(1 - unique / items, 4) if items else 0.0,
+        }
 
-        if loop and loop.is_running():
-            # Already in an async context — create a new thread
-            import concurrent.futures
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                return pool.submit(lambda: asyncio.run(_run())).result()
-        else:
-            return asyncio.run(_run())
+def _dedupe(texts: List[str], normalizer: Optional[Normalizer]) -> Tuple[List[str], List[int]]:
+    """Unique texts (first occurrences) and each text's index into them."""
+    if isinstance(normalizer, (str, list, tuple)):
+        normalizer = RuleSet([normalizer] if isinstance(normalizer, str) else normalizer)
+    seen: Dict[bytes, int] = {}
+    unique: List[str] = []
+    positions: List[int] = []
+    for text in texts:
+        key = hashlib.sha1((normalizer(text) if normalizer else text).encode("utf-8")).digest()
+        index = seen.get(key)
+        if index is None:
+            index = seen[key] = len(unique)
+            unique.append(text)
+        positions.append(index)
+    return unique, positions
+
+
+def _run_sync(coro_factory: Callable[[], Awaitable[T]]) -> T:
+    """Run a coroutine to completion from sync code, even inside a running loop."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop and loop.is_running():
+        # Already in an async context — create a new thread
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(lambda: asyncio.run(coro_factory())).result()
+    else:
+        return asyncio.run(coro_factory())
 
 
 class Task(BaseTask):
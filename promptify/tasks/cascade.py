@@ -0,0 +1,169 @@
+"""Confidence-based model cascade."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel
+
+from promptify.core.exceptions import ConfigurationError
+from promptify.schemas.classify import Classification, MultiLabelResult
+from promptify.schemas.ner import NERResult
+from promptify.tasks.base import BaseTask, _run_sync
+
+ConfidenceFn = Callable[[str, BaseModel], Optional[float]]
+
+
+def default_confidence(text: str, result: BaseModel) -> Optional[float]:
+    """Confidence of ``result`` for the built-in schemas.
+
+    ``Classification`` uses its ``confidence`` (a measured probability with
+    ``Classify(scoring="logprobs")``), ``MultiLabelResult`` its least
+    confident label, and ``NERResult`` the fraction of entities that occur
+    verbatim in the input, which flags hallucinated or mangled spans.
+    """
+    if isinstance(result, Classification):
+        return result.confidence
+    if isinstance(result, MultiLabelResult):
+        scores = [c.confidence for c in result.labels]
+        return min(scores) if scores and None not in scores else None
+    if isinstance(result, NERResult):
+        if not result.entities:
+            return 1.0
+        lowered = text.lower()
+        found = sum(e.text.lower() in lowered for e in result.entities if e.text)
+        return found / len(result.entities)
+    confidence = getattr(result, "confidence", None)
+    return confidence if isinstance(confidence, (int, float)) else None
+
+
+class Cascade:
+    """Run a cheap task first and escalate low-confidence items.
+
+    Each item goes to the first tier; if its confidence is below
+    ``threshold`` (or unknown) it is re-run on the next tier, up to the last
+    tier whose answer is always kept. In ``batch`` every item escalates as
+    soon as its own result comes back, without waiting for the rest of the
+    tier. ``stats()`` reports how many items each tier answered, the
+    escalation rate and each tier's cost.
+
+    Parameters
+    ----------
+    tiers : sequence of BaseTask
+        Tasks ordered from cheapest to strongest, with the same output schema.
+    threshold : float or sequence of float
+        Minimum confidence to accept a tier's answer; one value per
+        non-final tier, or a single value for all.
+    confidence : callable or None
+        ``(text, result) -> float | None``; defaults to
+        ``default_confidence``.
+
+    Example
+    -------
+    >>> labels = ["positive", "negative", "neutral"]
+    >>> clf = Cascade(
+    ...     [Classify(model="gpt-4o-mini", labels=labels, scoring="logprobs"),
+    ...      Classify(model="gpt-4o", labels=labels)],
+    ...     threshold=0.9,
+    ... )
+    >>> results = clf.batch(reviews)
+    >>> clf.stats()["escalation_rate"]
+    0.12
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[BaseTask],
+        threshold: Union[float, Sequence[float]] = 0.8,
+        confidence: Optional[ConfidenceFn] = None,
+    ) -> None:
+        if len(tiers) < 2:
+            raise ConfigurationError("A cascade needs at least two tiers")
+        if len({tier.output_schema for tier in tiers}) != 1:
+            raise ConfigurationError("All cascade tiers must share an output schema")
+        thresholds = (
+            [float(threshold)] * (len(tiers) - 1)
+            if isinstance(threshold, (int, float))
+            else [float(t) for t in threshold]
+        )
+        if len(thresholds) != len(tiers) - 1:
+            raise ConfigurationError("Expected one threshold per non-final tier")
+        self.tiers = list(tiers)
+        self.thresholds = thresholds
+        self.confidence = confidence or default_confidence
+        self._lock = threading.Lock()
+        self._answered = [0] * len(self.tiers)
+
+    def _accept(self, tier: int, text: str, result: BaseModel) -> bool:
+        if tier == len(self.tiers) - 1:
+            accepted = True
+        else:
+            score = self.confidence(text, result)
+            accepted = score is not None and score >= self.thresholds[tier]
+        if accepted:
+            with self._lock:
+                self._answered[tier] += 1
+        return accepted
+
+    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
+        """Run ``text`` through the tiers until one is confident enough."""
+        for tier, task in enumerate(self.tiers):
+            result = task(text, **kwargs)
+            if self._accept(tier, text, result):
+                break
+        return result
+
+    async def acall(self, text: str, **kwargs: Any) -> BaseModel:
+        """Async ``__call__``."""
+        return await self._acall(text, None, **kwargs)
+
+    async def _acall(
+        self, text: str, semaphores: Optional[List[asyncio.Semaphore]], **kwargs: Any
+    ) -> BaseModel:
+        for tier, task in enumerate(self.tiers):
+            if semaphores is None:
+                result = await task.acall(text, **kwargs)
+            else:
+                async with semaphores[tier]:
+                    result = await task.acall(text, **kwargs)
+            if self._accept(tier, text, result):
+                break
+        return result
+
+    def batch(
+        self, texts: List[str], max_concurrent: int = 5, **kwargs: Any
+    ) -> List[BaseModel]:
+        """Process ``texts``, escalating each item as soon as it needs it.
+
+        Every tier gets its own ``max_concurrent`` limit, so escalations to
+        the strong model do not wait behind the cheap tier's queue.
+        """
+
+        async def _run() -> List[BaseModel]:
+            semaphores = [asyncio.Semaphore(max_concurrent) for _ in self.tiers]
+            return await asyncio.gather(*[self._acall(t, semaphores, **kwargs) for t in texts])
+
+        return _run_sync(_run)
+
+    def stats(self) -> Dict[str, Any]:
+        """Items answered per tier, escalation rate and per-tier cost."""
+        with self._lock:
+            answered = list(self._answered)
+        items = sum(answered)
+        return {
+            "items": items,
+            "escalation_rate": round((items - answered[0]) / items, 4) if items else 0.0,
+            "tiers": [
+                {"model": task.engine.config.model, "answered": count, **task.cost_summary()}
+                for task, count in zip(self.tiers, answered)
+            ],
+        }
+
+    def reset_stats(self) -> None:
+        """Zero the per-tier counters and the tiers' cost totals."""
+        with self._lock:
+            self._answered = [0] * len(self.tiers)
+        for task in self.tiers:
+            task.usage.reset()
@@ -2,17 +2,40 @@
 
 from __future__ import annotations
 
+import logging
+import math
+import re
+import string
 from typing import Any, Dict, List, Optional, Tuple, Type
 
 from pydantic import BaseModel
 
+from promptify.core.exceptions import ConfigurationError
+from promptify.engine.llm import LLMResponse
+from promptify.prompts.builder import PromptBuilder
 from promptify.schemas.classify import Classification, MultiLabelResult
 from promptify.tasks.base import BaseTask
+from promptify.utils.index import TfidfIndex
+
+logger = logging.getLogger("promptify")
 
 _DEFAULT_INSTRUCTION = (
     "You are a text classification system. "
     "Classify the given text and return structured JSON."
 )
+_SCORING_INSTRUCTION = (
+    "You are a text classification system. "
+    "Answer with the letter of the best category only."
+)
+_SCORING_CODES = string.ascii_uppercase
+_SCORING_MODES = ("json", "logprobs")
+_LABEL_WORD_SEP_RE = re.compile(r"[_\-/]+")
+
+
+# Request schema of one taxonomy level, so level completions are tracked
+# apart from whole-label classifications.
+class _TaxonomyLevel(Classification):
+    pass
 
 
 class Classify(BaseTask):
@@ -24,6 +47,24 @@ class Classify(BaseTask):
     >>> result = clf("Amazing product!")
     >>> result.label
     'positive'
+
+    ``scoring="logprobs"`` maps each label to a one-letter code, asks for a
+    single output token and picks the label from the returned token
+    logprobs, so ``confidence`` is the model's probability for the label
+    (renormalized over the label codes) and latency is close to the time to
+    first token. Up to 26 labels, single-label only; providers that return
+    no logprobs fall back to the JSON prompt.
+
+    For large label sets, ``max_candidate_labels=N`` indexes the label names
+    (plus ``label_descriptions``) once and shows each prompt only the ``N``
+    labels most similar to the input. With ``taxonomy_separator`` (e.g.
+    ``" > "``), labels are leaf paths of a taxonomy and classification walks
+    it one level per call, each prompt listing only the children of the
+    chosen node (shortlisted to ``N`` when given); ``confidence`` is the
+    product of the per-level confidences.
+
+    >>> clf = Classify(model="gpt-4o-mini", labels=category_paths,
+    ...                taxonomy_separator=" > ", max_candidate_labels=30)
     """
 
     def __init__(
@@ -34,15 +75,32 @@ class Classify(BaseTask):
         domain: Optional[str] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        scoring: str = "json",
+        max_candidate_labels: Optional[int] = None,
+        label_descriptions: Optional[Dict[str, str]] = None,
+        taxonomy_separator: Optional[str] = None,
         **kwargs: Any,
     ) -> None:
+        if scoring not in _SCORING_MODES:
+            raise ConfigurationError(
+                f"Unknown scoring mode {scoring!r}; expected one of {', '.join(_SCORING_MODES)}"
+            )
+        if scoring == "logprobs" and (multi_label or len(labels) > len(_SCORING_CODES)):
+            raise ConfigurationError(
+                f"scoring='logprobs' needs single-label classification with at most "
+                f"{len(_SCORING_CODES)} labels"
+            )
+        if taxonomy_separator is not None and (multi_label or scoring != "json"):
+            raise ConfigurationError(
+                "taxonomy_separator requires single-label classification in JSON mode"
+            )
         self.multi_label = multi_label
 
         # Pick the right template and schema
         if multi_label:
             template = "classify_multilabel"
             schema: Type[BaseModel] = MultiLabelResult
-        elif len(labels) == 2:
+        elif len(labels) == 2 and taxonomy_separator is None:
             template = "classify_binary"
             kwargs["label_0"] = labels[0]
             kwargs["label_1"] = labels[1]
@@ -61,3 +119,205 @@ class Classify(BaseTask):
             examples=examples,
             **kwargs,
         )
+        self.scoring = scoring
+        self._use_logprobs = scoring == "logprobs" and self.engine.supports_logprobs
+        if scoring == "logprobs":
+            self._codes = dict(zip(_SCORING_CODES, labels))
+            self._code_of = {label: code for code, label in self._codes.items()}
+            self.scoring_prompt_builder = PromptBuilder(template="classify_scoring")
+
+        self.max_candidate_labels = max_candidate_labels
+        self.label_descriptions = label_descriptions or {}
+        self.taxonomy_separator = taxonomy_separator
+        self._children: Dict[str, List[str]] = {}
+        nodes = list(labels)
+        if taxonomy_separator is not None:
+            nodes = []
+            for label in labels:
+                parts = label.split(taxonomy_separator)
+                for depth in range(1, len(parts) + 1):
+                    node = taxonomy_separator.join(parts[:depth])
+                    parent = taxonomy_separator.join(parts[: depth - 1])
+                    siblings = self._children.setdefault(parent, [])
+                    if node not in siblings:
+                        siblings.append(node)
+                        nodes.append(node)
+        self._label_index: Optional[TfidfIndex] = None
+        if max_candidate_labels is not None:
+            self._node_ids = {node: i for i, node in enumerate(nodes)}
+            self._label_index = TfidfIndex([self._label_text(node) for node in nodes])
+
+    def _label_text(self, label: str) -> str:
+        """Searchable text for a label: its words plus any description."""
+        words = label
+        if self.taxonomy_separator is not None:
+            words = words.replace(self.taxonomy_separator, " ")
+        words = _LABEL_WORD_SEP_RE.sub(" ", words)
+        description = self.label_descriptions.get(label)
+        return f"{words} {description}" if description else words
+
+    def _rank_labels(self, text: str, candidates: List[str]) -> List[str]:
+        """The ``max_candidate_labels`` candidates most similar to ``text``."""
+        limit = self.max_candidate_labels
+        if self._label_index is None or limit is None or len(candidates) <= limit:
+            return candidates
+        scores = self._label_index.scores(text)
+        ranked = sorted(
+            range(len(candidates)),
+            key=lambda i: -scores.get(self._node_ids[candidates[i]], 0.0),
+        )
+        # Keep the shortlist in label order so prompts are stable.
+        return [candidates[i] for i in sorted(ranked[:limit])]
+
+    def _shortlist_labels(self, text: str, **kwargs: Any) -> Optional[List[str]]:
+        if self.taxonomy_separator is not None:
+            # Taxonomy levels list the children of ``taxonomy_node`` only.
+            return self._rank_labels(text, self._children[kwargs["taxonomy_node"]])
+        if self.labels is None:
+            return None
+        shortlist = self._rank_labels(text, self.labels)
+        return None if len(shortlist) == len(self.labels) else shortlist
+
+    def _select_examples(self, text: str, **kwargs: Any) -> Optional[List[Tuple[str, str]]]:
+        if self.taxonomy_separator is None:
+            return super()._select_examples(text, **kwargs)
+        # Examples under ``taxonomy_node``, labelled with the child they fall in.
+        sep, node = self.taxonomy_separator, kwargs["taxonomy_node"]
+        depth = len(self._children[node][0].split(sep))
+        return [
+            (example, sep.join(label.split(sep)[:depth]))
+            for example, label in self.examples or []
+            if not node or label.startswith(node + sep)
+        ]
+
+    def _prompt_spec(
+        self, **kwargs: Any
+    ) -> Tuple[PromptBuilder, str, Optional[Type[BaseModel]]]:
+        if "taxonomy_node" in kwargs:
+            return self.prompt_builder, self.instruction, _TaxonomyLevel
+        return super()._prompt_spec(**kwargs)
+
+    @staticmethod
+    def _match_child(candidates: List[str], label: str, sep: str) -> Optional[str]:
+        label = label.strip()
+        for candidate in candidates:
+            if candidate == label:
+                return candidate
+        lowered = label.lower()
+        for candidate in candidates:
+            if candidate.lower() == lowered or candidate.split(sep)[-1].lower() == lowered:
+                return candidate
+        return None
+
+    def _descend(
+        self, node: str, confidence: Optional[float], result: Classification
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Next node and running confidence after a level's ``result``."""
+        assert self.taxonomy_separator is not None
+        child = self._match_child(self._children[node], result.label, self.taxonomy_separator)
+        if confidence is not None and result.confidence is not None:
+            confidence *= result.confidence
+        else:
+            confidence = None
+        return child, confidence
+
+    def _level_result(self, response: LLMResponse) -> Classification:
+        self._record(response, _TaxonomyLevel)
+        result = self._decode(response)
+        return Classification(**result.model_dump())
+
+    def _classify_taxonomy(self, text: str, **kwargs: Any) -> Classification:
+        node: str = ""
+        confidence: Optional[float] = 1.0
+        while self._children.get(node):
+            candidates = self._children[node]
+            if len(candidates) == 1:
+                node = candidates[0]
+                continue
+            messages, request = self._prepare(text, taxonomy_node=node, **kwargs)
+            response = self.engine.complete(
+                messages, output_schema=_TaxonomyLevel, key_aliases=self.key_aliases, **request
+            )
+            result = self._level_result(response)
+            child, confidence = self._descend(node, confidence, result)
+            if child is None:
+                return result
+            node = child
+        return Classification(label=node, confidence=confidence)
+
+    async def _aclassify_taxonomy(self, text: str, **kwargs: Any) -> Classification:
+        node: str = ""
+        confidence: Optional[float] = 1.0
+        while self._children.get(node):
+            candidates = self._children[node]
+            if len(candidates) == 1:
+                node = candidates[0]
+                continue
+            messages, request = self._prepare(text, taxonomy_node=node, **kwargs)
+            response = await self.engine.acomplete(
+                messages, output_schema=_TaxonomyLevel, key_aliases=self.key_aliases, **request
+            )
+            result = self._level_result(response)
+            child, confidence = self._descend(node, confidence, result)
+            if child is None:
+                return result
+            node = child
+        return Classification(label=node, confidence=confidence)
+
+    def _scoring_messages(self, text: str) -> List[Dict[str, Any]]:
+        examples = [(ex, self._code_of.get(label, label)) for ex, label in self.examples or []]
+        return self.scoring_prompt_builder.build(
+            instruction=_SCORING_INSTRUCTION,
+            text_input=text,
+            examples=examples,
+            codes=list(self._codes.items()),
+            **self._extra_kwargs,
+        )
+
+    @property
+    def _scoring_params(self) -> Dict[str, Any]:
+        return {
+            "max_tokens": 1,
+            "logprobs": True,
+            "top_logprobs": min(20, len(self._codes) + 2),
+        }
+
+    def _score(self, response: LLMResponse) -> Optional[Classification]:
+        """Pick the label from the first token's logprobs; None if unusable."""
+        self._track(response)
+        if not response.top_logprobs:
+            # Provider ignored the logprobs request: stop asking for them.
+            logger.debug("No logprobs returned, falling back to JSON classification")
+            self._use_logprobs = False
+            return None
+        probs: Dict[str, float] = {}
+        for token, logprob in response.top_logprobs.items():
+            code = token.strip()
+            if code in self._codes:
+                probs[code] = probs.get(code, 0.0) + math.exp(logprob)
+        if not probs:
+            return None
+        best = max(probs, key=probs.__getitem__)
+        return Classification(label=self._codes[best], confidence=probs[best] / sum(probs.values()))
+
+    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
+        if self.taxonomy_separator is not None:
+            return self._classify_taxonomy(text, **kwargs)
+        if self._use_logprobs and not kwargs:
+            response = self.engine.complete(self._scoring_messages(text), **self._scoring_params)
+            result = self._score(response)
+            if result is not None:
+                return result
+        return super().__call__(text, **kwargs)
+
+    async def acall(self, text: str, **kwargs: Any) -> BaseModel:
+        if self.taxonomy_separator is not None:
+            return await self._aclassify_taxonomy(text, **kwargs)
+        if self._use_logprobs and not kwargs:
+            response = await self.engine.acomplete(
+                self._scoring_messages(text), **self._scoring_params
+            )
+            result = self._score(response)
+            if result is not None:
+                return result
+        return await super().acall(text, **kwargs)
@@ -0,0 +1,212 @@
+"""Fused multi-task execution — several tasks in one LLM call."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, create_model
+
+from promptify.core.exceptions import ConfigurationError, ParserError
+from promptify.engine.llm import LLMResponse
+from promptify.schemas.artifacts import get_schema_artifacts
+from promptify.tasks.base import _MODEL_KWARGS, BaseTask
+
+logger = logging.getLogger("promptify")
+
+# Template variables that restate settings already covered by labels etc.
+_SKIPPED_OPTIONS = frozenset({"description", "label_0", "label_1"})
+
+_INSTRUCTION = (
+    "Perform each of the following tasks on the same input text. Return one JSON "
+    "object with one key per task, holding that task's result."
+)
+
+
+def _skeleton(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Example value showing the shape of a JSON schema."""
+    if "$ref" in schema:
+        return _skeleton(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"]
+            return _skeleton(options[0], defs) if options else None
+    if "enum" in schema:
+        return "|".join(str(v) for v in schema["enum"])
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _skeleton(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_skeleton(schema.get("items", {}), defs)]
+    return kind or "any"
+
+
+def _format_hint(schema: Type[BaseModel]) -> str:
+    json_schema = get_schema_artifacts(schema).json_schema
+    return json.dumps(_skeleton(json_schema, json_schema.get("$defs", {})))
+
+
+def _option(value: Any) -> Optional[str]:
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (list, tuple)) and value and all(isinstance(v, str) for v in value):
+        return ", ".join(value)
+    return None
+
+
+class Composite(BaseTask):
+    """Run several tasks on each input with a single LLM call.
+
+    The tasks' instructions, domains, labels and simple options are merged
+    into one prompt, and their output schemas into one schema with a field
+    per task. Each field of the response is validated against its task's
+    schema on its own, so a malformed part only re-runs that task; tasks
+    whose part is missing or invalid fall back to a separate call.
+
+    Task-specific template wording and few-shot examples are not carried
+    over. Tasks with line-oriented output, extra per-call variables
+    (``QA``), a ``gazetteer`` or ``chunk_size`` cannot be fused, since their
+    pre-tagging and chunking run in their own ``__call__``.
+
+    Parameters
+    ----------
+    tasks : sequence of BaseTask
+        Tasks to fuse.
+    names : sequence of str or None
+        Result field for each task; defaults to the lowercased class names.
+    model : str or None
+        Model for the fused call. Defaults to the first task's model; its
+        engine is reused as is unless engine settings such as
+        ``temperature`` or ``max_tokens`` are given.
+
+    Example
+    -------
+    >>> combo = Composite([NER(model="gpt-4o-mini"), Summarize(model="gpt-4o-mini")])
+    >>> result = combo("Patient has chronic hip pain and osteoporosis")
+    >>> result.ner.entities[0].text, result.summarize.summary
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[BaseTask],
+        names: Optional[Sequence[str]] = None,
+        model: Optional[str] = None,
+        instruction: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        if len(tasks) < 2:
+            raise ConfigurationError("A composite task needs at least two tasks")
+        if kwargs.get("short_keys"):
+            raise ConfigurationError("short_keys is not supported for composite tasks")
+        for task in tasks:
+            if task.request_schema is None or task.output_schema is None:
+                raise ConfigurationError(f"{type(task).__name__} has no JSON output schema")
+            if tuple(task.dynamic_vars) != ("text_input",):
+                raise ConfigurationError(
+                    f"{type(task).__name__} needs per-call variables and cannot be fused"
+                )
+            for option in ("gazetteer", "chunk_size"):
+                if getattr(task, option, None) is not None:
+                    raise ConfigurationError(f"{type(task).__name__} with {option} cannot be fused")
+        names = list(names) if names is not None else self._default_names(tasks)
+        if len(names) != len(tasks) or len(set(names)) != len(names):
+            raise ConfigurationError("Expected one unique name per task")
+
+        self.tasks: Dict[str, BaseTask] = dict(zip(names, tasks))
+        result_schema = create_model(
+            "CompositeResult", **{n: (t.output_schema, ...) for n, t in self.tasks.items()}
+        )
+        self._request_schema: Type[BaseModel] = create_model(
+            "CompositeRequest", **{n: (t.request_schema, ...) for n, t in self.tasks.items()}
+        )
+        super().__init__(
+            model=model or tasks[0].engine.config.model,
+            output_schema=result_schema,
+            instruction=instruction or self._merge_instructions(),
+            **kwargs,
+        )
+        # Share the first task's engine unless engine settings were given.
+        if model is None and not any(k in _MODEL_KWARGS or k == "api_key" for k in kwargs):
+            self.engine = tasks[0].engine
+
+    @staticmethod
+    def _default_names(tasks: Sequence[BaseTask]) -> List[str]:
+        names: List[str] = []
+        for task in tasks:
+            base = name = type(task).__name__.lower()
+            suffix = 2
+            while name in names:
+                name, suffix = f"{base}_{suffix}", suffix + 1
+            names.append(name)
+        return names
+
+    def _merge_instructions(self) -> str:
+        sections = [_INSTRUCTION]
+        for name, task in self.tasks.items():
+            lines = [f'### Task "{name}"', task.instruction]
+            if task.domain:
+                lines.append(f"Domain: {task.domain}")
+            if task.labels:
+                lines.append(f"Labels: {', '.join(task.labels)}")
+            for key, value in task._extra_kwargs.items():
+                rendered = _option(value)
+                if rendered is not None and key not in _SKIPPED_OPTIONS:
+                    lines.append(f"{key.replace('_', ' ').capitalize()}: {rendered}")
+            hint = _format_hint(task.request_schema)
+            lines.append(f'Put the result under "{name}" in this format: {hint}')
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+
+    @property
+    def request_schema(self) -> Optional[Type[BaseModel]]:
+        return self._request_schema
+
+    def _split(self, text: str, response: LLMResponse) -> Dict[str, BaseModel]:
+        """Per-task results from a fused response; failed parts are left out."""
+        self._record(response)
+        if response.parsed is not None:
+            data: Any = response.parsed.model_dump()
+        else:
+            try:
+                data = self.parser.parse(response.text)
+            except (ParserError, ValueError):
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        parts: Dict[str, BaseModel] = {}
+        for name, task in self.tasks.items():
+            try:
+                part = task.request_schema.model_validate(data.get(name))
+            except ValueError:
+                logger.debug("Fused output for %r is invalid; running it separately", name)
+                continue
+            if not isinstance(part, task.output_schema):
+                part = task.output_schema.model_validate(part.model_dump())
+            parts[name] = task._finalize(text, part)
+        return parts
+
+    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
+        messages, request = self._prepare(text, **kwargs)
+        response = self.engine.complete(
+            messages, output_schema=self.request_schema, key_aliases=self.key_aliases, **request
+        )
+        parts = self._split(text, response)
+        for name, task in self.tasks.items():
+            if name not in parts:
+                parts[name] = task(text, **kwargs)
+        return self.output_schema(**parts)
+
+    async def acall(self, text: str, **kwargs: Any) -> BaseModel:
+        messages, request = self._prepare(text, **kwargs)
+        response = await self.engine.acomplete(
+            messages, output_schema=self.request_schema, key_aliases=self.key_aliases, **request
+        )
+        parts = self._split(text, response)
+        missing = [name for name in self.tasks if name not in parts]
+        results = await asyncio.gather(
+            *[self.tasks[name].acall(text, **kwargs) for name in missing]
+        )
+        parts.update(zip(missing, results))
+        return self.output_schema(**parts)
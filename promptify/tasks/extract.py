@@ -6,6 +6,12 @@ from typing import Any, List, Optional, Tuple
 
 from pydantic import BaseModel
 
+from promptify.parser.compact import (
+    DELIMITER_NAMES,
+    RelationLineParser,
+    TableLineParser,
+    resolve_output_format,
+)
 from promptify.schemas.extract import ExtractionResult
 from promptify.tasks.base import BaseTask
 
@@ -19,6 +25,9 @@ class ExtractRelations(BaseTask):
     >>> result = extractor("Einstein was born in Ulm in 1879.")
     >>> result.relations[0].subject
     'Einstein'
+
+    ``output_format="tsv"`` or ``"pipe"`` switches to one
+    ``subject<TAB>predicate<TAB>object`` line per relation instead of JSON.
     """
 
     def __init__(
@@ -27,18 +36,28 @@ class ExtractRelations(BaseTask):
         domain: Optional[str] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        output_format: str = "json",
         **kwargs: Any,
     ) -> None:
+        delimiter = resolve_output_format(output_format)
+        if delimiter is not None:
+            kwargs.update(delimiter=delimiter, delimiter_name=DELIMITER_NAMES[delimiter])
         super().__init__(
             model=model,
             output_schema=ExtractionResult,
             instruction=instruction
-            or "Extract semantic relations from the text and return structured JSON.",
+            or (
+                "Extract semantic relations from the text and return structured JSON."
+                if delimiter is None
+                else "Extract semantic relations from the text, one relation per line."
+            ),
             template="relation_extraction",
             domain=domain,
             examples=examples,
             **kwargs,
         )
+        if delimiter is not None:
+            self.line_parser = RelationLineParser(delimiter)
 
 
 class ExtractTable(BaseTask):
@@ -48,6 +67,9 @@ class ExtractTable(BaseTask):
     -------
     >>> extractor = ExtractTable(model="gpt-4o-mini")
     >>> result = extractor("John is 30, lives in NYC. Jane is 25, lives in LA.")
+
+    ``output_format="tsv"`` or ``"pipe"`` switches to a header line plus one
+    delimited line per row instead of JSON.
     """
 
     def __init__(
@@ -55,14 +77,24 @@ class ExtractTable(BaseTask):
         model: str,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        output_format: str = "json",
         **kwargs: Any,
     ) -> None:
+        delimiter = resolve_output_format(output_format)
+        if delimiter is not None:
+            kwargs.update(delimiter=delimiter, delimiter_name=DELIMITER_NAMES[delimiter])
         super().__init__(
             model=model,
             output_schema=ExtractionResult,
             instruction=instruction
-            or "Extract structured tabular data from the text and return JSON.",
+            or (
+                "Extract structured tabular data from the text and return JSON."
+                if delimiter is None
+                else "Extract structured tabular data from the text as delimited lines."
+            ),
             template="tabular_extraction",
             examples=examples,
             **kwargs,
         )
+        if delimiter is not None:
+            self.line_parser = TableLineParser(delimiter)
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Optional, Tuple
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
 from promptify.schemas.generate import GeneratedQuestion, SQLQuery
 from promptify.tasks.base import BaseTask
+from promptify.utils.catalog import SchemaCatalog
+
+_CATALOG_CACHE_SIZE = 8
 
 
 class _QuestionGenResult(BaseModel):
@@ -46,6 +51,20 @@ class GenerateQuestions(BaseTask):
 class GenerateSQL(BaseTask):
     """Convert natural language to SQL queries.
 
+    With ``max_tables`` set, large schemas are pruned per question: the DDL
+    is parsed once into a ``SchemaCatalog`` (cached by content hash) and only
+    the best-matching tables, plus the tables they join to through foreign
+    keys, are sent.
+
+    Parameters
+    ----------
+    max_tables : int or None
+        Prune schemas with more tables than this to the ``max_tables`` most
+        relevant ones (plus foreign-key neighbors). None (the default) always
+        sends the whole schema.
+    foreign_keys : bool
+        Include foreign-key neighbors of the selected tables.
+
     Example
     -------
     >>> gen = GenerateSQL(model="gpt-4o-mini", schema="CREATE TABLE users (id INT, name TEXT)")
@@ -60,8 +79,13 @@ class GenerateSQL(BaseTask):
         schema: Optional[str] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        max_tables: Optional[int] = None,
+        foreign_keys: bool = True,
         **kwargs: Any,
     ) -> None:
+        self.max_tables = max_tables
+        self.foreign_keys = foreign_keys
+        self._catalogs: "OrderedDict[str, SchemaCatalog]" = OrderedDict()
         super().__init__(
             model=model,
             output_schema=SQLQuery,
@@ -72,3 +96,34 @@ class GenerateSQL(BaseTask):
             schema=schema,
             **kwargs,
         )
+
+    def catalog(self, schema: str) -> SchemaCatalog:
+        """Parsed catalog for ``schema``, cached by content hash."""
+        key = hashlib.sha1(schema.encode("utf-8")).hexdigest()
+        if key in self._catalogs:
+            self._catalogs.move_to_end(key)
+            return self._catalogs[key]
+        catalog = self._catalogs[key] = SchemaCatalog(schema)
+        if len(self._catalogs) > _CATALOG_CACHE_SIZE:
+            self._catalogs.popitem(last=False)
+        return catalog
+
+    def _schema_kwargs(self, question: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """``kwargs`` with the schema pruned to what ``question`` needs."""
+        schema = kwargs.get("schema", self._extra_kwargs.get("schema"))
+        if self.max_tables is None or not schema:
+            return kwargs
+        catalog = self.catalog(schema)
+        if len(catalog) <= self.max_tables:
+            return kwargs
+        pruned = catalog.prune(question, self.max_tables, self.foreign_keys)
+        return {**kwargs, "schema": pruned}
+
+    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
+        return super().__call__(text, **self._schema_kwargs(text, kwargs))
+
+    async def acall(self, text: str, **kwargs: Any) -> BaseModel:
+        return await super().acall(text, **self._schema_kwargs(text, kwargs))
+
+    def estimate_prompt_tokens(self, text: str, **kwargs: Any) -> int:
+        return super().estimate_prompt_tokens(text, **self._schema_kwargs(text, kwargs))
@@ -2,15 +2,38 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Optional, Tuple
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
-from promptify.schemas.ner import NERResult
-from promptify.tasks.base import BaseTask
+from pydantic import BaseModel
+
+from promptify.engine.llm import LLMResponse
+from promptify.parser.compact import DELIMITER_NAMES, EntityLineParser, resolve_output_format
+from promptify.schemas.ner import Entity, NERResult
+from promptify.tasks.base import BaseTask, _run_sync
+from promptify.utils.gazetteer import Gazetteer
+from promptify.utils.matcher import PhraseMatcher
+from promptify.utils.text import check_chunking, chunk_spans
 
 _DEFAULT_INSTRUCTION = (
     "You are a Named Entity Recognition (NER) system. "
     "Extract entities from the given text and return structured JSON."
 )
+_COMPACT_INSTRUCTION = (
+    "You are a Named Entity Recognition (NER) system. "
+    "Extract entities from the given text, one entity per line."
+)
+
+
+class _Mention(BaseModel):
+    text: str
+    label: str
+
+
+class _MentionResult(BaseModel):
+    """``NERResult`` without offsets, requested when they are computed locally."""
+
+    entities: List[_Mention]
 
 
 class NER(BaseTask):
@@ -22,6 +45,32 @@ class NER(BaseTask):
     >>> result = ner("Patient has chronic hip pain and osteoporosis")
     >>> result.entities[0].text
     'chronic hip pain'
+
+    Pass ``output_format="tsv"`` (or ``"pipe"``) to have the model emit one
+    ``text<TAB>label`` line per entity instead of JSON, which cuts completion
+    tokens on entity-dense documents. Few-shot example outputs should then use
+    the same line format.
+
+    Set ``chunk_size`` (characters) for long documents: longer inputs are
+    split into overlapping chunks that are processed concurrently (at most
+    ``max_concurrent`` at a time). Entity ``start``/``end`` are remapped to
+    offsets in the full text, located by searching the chunk when the model
+    gives none, and duplicates from the overlap regions are merged.
+
+    With ``align_spans`` (the default) the model is not asked for offsets;
+    ``start``/``end`` are computed locally with ``align_entities``.
+
+    A ``gazetteer`` of known ``(text, label)`` pairs pre-tags mentions
+    locally. When the known mentions cover at least ``gazetteer_coverage`` of
+    the input's content words the model is not called at all; otherwise the
+    known mentions are listed in the prompt (with ``gazetteer_hints``) so the
+    model only returns the others, and both are merged. ``learn_gazetteer``
+    adds the model's entities to the gazetteer as they come in.
+
+    >>> gaz = Gazetteer([("aspirin", "DRUG"), ("ibuprofen", "DRUG")])
+    >>> ner = NER(model="gpt-4o-mini", gazetteer=gaz)
+    >>> ner("Aspirin and ibuprofen").entities[1].text  # no LLM call
+    'ibuprofen'
     """
 
     def __init__(
@@ -31,15 +80,220 @@ class NER(BaseTask):
         labels: Optional[List[str]] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        output_format: str = "json",
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        max_concurrent: int = 5,
+        align_spans: bool = True,
+        gazetteer: Optional[Gazetteer] = None,
+        gazetteer_coverage: float = 1.0,
+        gazetteer_hints: bool = True,
+        learn_gazetteer: bool = False,
         **kwargs: Any,
     ) -> None:
+        self.align_spans = align_spans
+        self.gazetteer = gazetteer
+        self.gazetteer_coverage = gazetteer_coverage
+        self.gazetteer_hints = gazetteer_hints
+        self.learn_gazetteer = learn_gazetteer
+        delimiter = resolve_output_format(output_format)
+        if delimiter is not None:
+            kwargs.update(delimiter=delimiter, delimiter_name=DELIMITER_NAMES[delimiter])
         super().__init__(
             model=model,
             output_schema=NERResult,
-            instruction=instruction or _DEFAULT_INSTRUCTION,
+            instruction=instruction
+            or (_DEFAULT_INSTRUCTION if delimiter is None else _COMPACT_INSTRUCTION),
             template="ner",
             domain=domain,
             labels=labels,
             examples=examples,
             **kwargs,
         )
+        if delimiter is not None:
+            self.line_parser = EntityLineParser(delimiter)
+        if chunk_size is not None:
+            check_chunking(chunk_size, chunk_overlap)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_concurrent = max_concurrent
+
+    @property
+    def request_schema(self) -> Optional[Type[BaseModel]]:
+        schema = super().request_schema
+        return _MentionResult if self.align_spans and schema is NERResult else schema
+
+    def _decode(self, response: LLMResponse) -> BaseModel:
+        result = super()._decode(response)
+        if isinstance(result, _MentionResult):
+            return NERResult.model_validate(result.model_dump())
+        return result
+
+    def _finalize(self, text: str, result: NERResult) -> NERResult:
+        if not self.align_spans:
+            return result
+        return NERResult(entities=align_entities(text, result.entities))
+
+    def _is_long(self, text: str) -> bool:
+        return self.chunk_size is not None and len(text) > self.chunk_size
+
+    def _pretag(self, text: str) -> Tuple[List[Entity], Optional[NERResult]]:
+        """Gazetteer mentions in ``text``, and the final result if they suffice."""
+        if self.gazetteer is None:
+            return [], None
+        known = self.gazetteer.tag(text)
+        if known and self.gazetteer.coverage(text, known) >= self.gazetteer_coverage:
+            return known, NERResult(entities=known)
+        return known, None
+
+    def _hinted(self, known: List[Entity], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if not known or not self.gazetteer_hints:
+            return kwargs
+        hints = list(dict.fromkeys((e.text, e.label) for e in known))
+        return {**kwargs, "known_entities": hints}
+
+    def _with_known(self, result: NERResult, known: List[Entity]) -> NERResult:
+        if self.gazetteer is not None and self.learn_gazetteer:
+            self.gazetteer.learn(result)
+        if not known:
+            return result
+        # The gazetteer tags every occurrence of a known name.
+        spans = {(e.start, e.end) for e in known}
+        names = {(e.text.lower(), e.label) for e in known}
+        extra = [
+            e
+            for e in result.entities
+            if (e.start, e.end) not in spans and (e.text.lower(), e.label) not in names
+        ]
+        entities = sorted(known + extra, key=lambda e: (e.start is None, e.start or 0))
+        return NERResult(entities=entities)
+
+    def __call__(self, text: str, **kwargs: Any) -> NERResult:
+        known, result = self._pretag(text)
+        if result is not None:
+            return result
+        if self._is_long(text):
+            result = _run_sync(lambda: self._acall_chunked(text, **kwargs))
+        else:
+            result = self._finalize(
+                text, super().__call__(text, **self._hinted(known, kwargs))
+            )
+        return self._with_known(result, known)
+
+    async def acall(self, text: str, **kwargs: Any) -> NERResult:
+        known, result = self._pretag(text)
+        if result is not None:
+            return result
+        if self._is_long(text):
+            result = await self._acall_chunked(text, **kwargs)
+        else:
+            result = self._finalize(
+                text, await super().acall(text, **self._hinted(known, kwargs))
+            )
+        return self._with_known(result, known)
+
+    async def _acall_chunked(self, text: str, **kwargs: Any) -> NERResult:
+        spans = chunk_spans(text, self.chunk_size, self.chunk_overlap)
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def _process(start: int, end: int) -> NERResult:
+            async with semaphore:
+                return await BaseTask.acall(self, text[start:end], **kwargs)
+
+        results = await asyncio.gather(*[_process(start, end) for start, end in spans])
+        return merge_chunk_entities(
+            text, [(start, end, result) for (start, end), result in zip(spans, results)]
+        )
+
+
+def _at_boundary(text: str, start: int, end: int) -> bool:
+    """True unless the span cuts a word (``"art"`` inside ``"start"``)."""
+    if start > 0 and text[start - 1].isalnum() and text[start].isalnum():
+        return False
+    return not (end < len(text) and text[end - 1].isalnum() and text[end].isalnum())
+
+
+def align_entities(text: str, entities: Sequence[Entity]) -> List[Entity]:
+    """Set exact ``start``/``end`` character offsets on ``entities`` in ``text``.
+
+    All entity strings are found in a single Aho-Corasick pass over ``text``.
+    Offsets from the model are kept only when they match the text. Matches
+    are case-insensitive, but exact-case and whole-word occurrences are
+    preferred; repeated mentions of the same string map to successive
+    occurrences. Entities that do not occur in ``text`` get no offsets.
+
+    Example
+    -------
+    >>> entities = [Entity(text="aspirin", label="DRUG"), Entity(text="Aspirin", label="DRUG")]
+    >>> [(e.start, e.end) for e in align_entities("Aspirin, then aspirin.", entities)]
+    [(14, 21), (0, 7)]
+    """
+    phrases = sorted({e.text for e in entities if e.text})
+    occurrences = PhraseMatcher(phrases).find_all(text) if phrases else {}
+    phrase_ids = {phrase: i for i, phrase in enumerate(phrases)}
+    candidates: Dict[str, List[Tuple[int, int]]] = {}
+    used: Dict[str, int] = {}
+    aligned: List[Entity] = []
+    for entity in entities:
+        start, end = entity.start, entity.end
+        if start is not None and end is not None and text[start:end] == entity.text:
+            aligned.append(entity)
+            continue
+        spans = candidates.get(entity.text)
+        if spans is None:
+            found = occurrences.get(phrase_ids.get(entity.text, -1), [])
+            whole = [s for s in found if _at_boundary(text, *s)] or found
+            exact = [s for s in whole if text[s[0] : s[1]] == entity.text]
+            spans = candidates[entity.text] = exact or whole
+        if not spans:
+            aligned.append(entity.model_copy(update={"start": None, "end": None}))
+            continue
+        count = used.get(entity.text, 0)
+        used[entity.text] = count + 1
+        start, end = spans[count % len(spans)]
+        aligned.append(entity.model_copy(update={"start": start, "end": end}))
+    return aligned
+
+
+def merge_chunk_entities(
+    text: str, chunks: Sequence[Tuple[int, int, NERResult]]
+) -> NERResult:
+    """Combine per-chunk results into one ``NERResult`` over ``text``.
+
+    ``chunks`` holds ``(start, end, result)`` for each chunk. Offsets are
+    shifted to global positions; overlapping spans with the same label (the
+    same entity seen by two chunks, or cut off at a chunk edge) are merged
+    into their union. Entities that cannot be located are deduplicated by
+    text and label.
+    """
+    located: List[Entity] = []
+    unlocated: Dict[Tuple[str, str], Entity] = {}
+    for chunk_start, chunk_end, result in chunks:
+        for entity in align_entities(text[chunk_start:chunk_end], result.entities):
+            if entity.start is None or entity.end is None:
+                unlocated.setdefault((entity.text.lower(), entity.label), entity)
+                continue
+            located.append(
+                entity.model_copy(
+                    update={"start": chunk_start + entity.start, "end": chunk_start + entity.end}
+                )
+            )
+
+    located.sort(key=lambda e: (e.start, -e.end))
+    merged: List[Entity] = []
+    last_by_label: Dict[str, int] = {}
+    for entity in located:
+        idx = last_by_label.get(entity.label)
+        if idx is not None and merged[idx].end > entity.start:
+            prev = merged[idx]
+            if entity.end > prev.end:
+                merged[idx] = prev.model_copy(
+                    update={"end": entity.end, "text": text[prev.start : entity.end]}
+                )
+            continue
+        last_by_label[entity.label] = len(merged)
+        merged.append(entity)
+
+    seen = {(e.text.lower(), e.label) for e in merged}
+    merged.extend(e for key, e in unlocated.items() if key not in seen)
+    return NERResult(entities=merged)
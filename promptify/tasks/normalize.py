@@ -7,6 +7,7 @@ from typing import Any, List, Optional, Tuple
 from pydantic import BaseModel
 
 from promptify.tasks.base import BaseTask
+from promptify.utils.rules import RuleSet, split_rules
 
 
 class _NormalizationResult(BaseModel):
@@ -16,10 +17,23 @@ class _NormalizationResult(BaseModel):
 class NormalizeText(BaseTask):
     """Normalize text according to specified rules.
 
+    Standard rules (case folding, punctuation and whitespace stripping,
+    unicode normalization, number and date canonicalization; see
+    ``promptify.utils.rules``) run locally with compiled regexes. Rules are
+    applied in order, so the leading run of standard rules runs locally and
+    only the rules from the first one that needs a model onwards are sent to
+    the LLM. When every rule is standard, no request is made at all.
+
+    Parameters
+    ----------
+    local_rules : bool
+        Apply recognized standard rules locally instead of via the model.
+
     Example
     -------
     >>> norm = NormalizeText(model="gpt-4o-mini", rules=["lowercase", "remove punctuation"])
-    >>> result = norm("Hello, World!")
+    >>> norm("Hello, World!").normalized_text
+    'hello world'
     """
 
     def __init__(
@@ -28,8 +42,12 @@ class NormalizeText(BaseTask):
         rules: Optional[List[str]] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        local_rules: bool = True,
         **kwargs: Any,
     ) -> None:
+        local, remaining = split_rules(rules or []) if local_rules else ([], rules)
+        self.local_rules = RuleSet(local)
+        self.model_rules = remaining
         super().__init__(
             model=model,
             output_schema=_NormalizationResult,
@@ -37,10 +55,40 @@ class NormalizeText(BaseTask):
             or "Normalize the text according to the rules and return JSON.",
             template="text_normalization",
             examples=examples,
-            rules=rules,
+            rules=remaining,
             **kwargs,
         )
 
+    @property
+    def is_local(self) -> bool:
+        """True when every rule runs locally and no LLM call is needed."""
+        return not self.model_rules and bool(self.local_rules.names)
+
+    def _local(self, text: str) -> Tuple[str, Optional[_NormalizationResult]]:
+        text = self.local_rules(text)
+        if self.is_local or not text.strip():
+            return text, _NormalizationResult(normalized_text=text)
+        return text, None
+
+    def __call__(self, text: str, **kwargs: Any) -> BaseModel:
+        text, result = self._local(text)
+        return result if result is not None else super().__call__(text, **kwargs)
+
+    async def acall(self, text: str, **kwargs: Any) -> BaseModel:
+        text, result = self._local(text)
+        return result if result is not None else await super().acall(text, **kwargs)
+
+    def batch(
+        self, texts: List[str], max_concurrent: int = 5, **kwargs: Any
+    ) -> List[BaseModel]:
+        """Normalize ``texts``; fully local rule sets skip the event loop."""
+        if self.is_local:
+            return [
+                _NormalizationResult(normalized_text=text)
+                for text in self.local_rules.apply_batch(texts)
+            ]
+        return super().batch(texts, max_concurrent=max_concurrent, **kwargs)
+
 
 class _Topic(BaseModel):
     topic: str
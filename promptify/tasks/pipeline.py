@@ -0,0 +1,203 @@
+"""Task pipelines — DAGs of tasks and functions with streaming handoff."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from promptify.core.exceptions import ConfigurationError, PipelineError
+from promptify.tasks.base import BaseTask, _run_sync
+
+StageFn = Union[BaseTask, Callable[[Any], Any]]
+
+
+@dataclass
+class Stage:
+    """One node of a ``Pipeline``."""
+
+    name: str
+    fn: StageFn
+    after: List[str]
+    inputs: Optional[Callable[[Dict[str, Any]], Any]]
+    max_concurrent: int
+
+    async def run(self, value: Any) -> Any:
+        if isinstance(self.fn, BaseTask):
+            if not isinstance(value, str):
+                raise TypeError(
+                    f"Task stage {self.name!r} needs a str input, got {type(value).__name__}; "
+                    "pass inputs= to select one"
+                )
+            return await self.fn.acall(value)
+        if inspect.iscoroutinefunction(self.fn) or inspect.iscoroutinefunction(
+            getattr(self.fn, "__call__", None)
+        ):
+            return await self.fn(value)
+        # Plain functions run in a worker thread so they do not block the
+        # event loop and the stage's concurrency limit applies to them too.
+        result = await asyncio.to_thread(self.fn, value)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+class _StageTiming:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.waiting = 0.0
+
+
+class Pipeline:
+    """A DAG of tasks and functions run over a stream of items.
+
+    Each stage receives the item (stages without dependencies), its single
+    dependency's output, or whatever ``inputs`` selects from a dict of the
+    item (``"input"``) and the outputs of the stages it depends on. Stages
+    that do not depend on each other run concurrently, and every item moves
+    on to the next stage as soon as its own inputs are ready, with no barrier
+    between stages. Plain (non-async) functions run in worker threads. Each
+    stage has its own concurrency limit. ``stats()`` reports per-stage call
+    counts, run time and time spent waiting for a slot.
+
+    Example
+    -------
+    >>> pipe = (
+    ...     Pipeline()
+    ...     .add("summary", Summarize(model="gpt-4o-mini"))
+    ...     .add("topic", Classify(model="gpt-4o-mini", labels=topics),
+    ...          after="summary", inputs=lambda r: r["summary"].summary)
+    ...     .add("relations", ExtractRelations(model="gpt-4o-mini"))
+    ... )
+    >>> results = pipe.batch(documents)
+    >>> results[0]["topic"].label
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Stage] = {}
+        self._lock = threading.Lock()
+        self._timings: Dict[str, _StageTiming] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: StageFn,
+        after: Union[str, Sequence[str]] = (),
+        inputs: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        max_concurrent: int = 5,
+    ) -> "Pipeline":
+        """Add a stage; ``after`` names stages that must finish first.
+
+        Dependencies must already be added, so the graph is acyclic by
+        construction. Returns the pipeline for chaining.
+        """
+        after = [after] if isinstance(after, str) else list(after)
+        if name in self.stages or name == "input":
+            raise ConfigurationError(f"Duplicate or reserved stage name: {name!r}")
+        unknown = [dep for dep in after if dep not in self.stages]
+        if unknown:
+            raise ConfigurationError(f"Stage {name!r} depends on unknown stages {unknown}")
+        if max_concurrent < 1:
+            raise ConfigurationError("max_concurrent must be at least 1")
+        self.stages[name] = Stage(name, fn, after, inputs, max_concurrent)
+        self._timings[name] = _StageTiming()
+        return self
+
+    def _semaphores(self) -> Dict[str, asyncio.Semaphore]:
+        return {name: asyncio.Semaphore(s.max_concurrent) for name, s in self.stages.items()}
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        item: Any,
+        futures: Dict[str, "asyncio.Future[Any]"],
+        semaphore: asyncio.Semaphore,
+    ) -> Any:
+        outputs = {dep: await futures[dep] for dep in stage.after}
+        if stage.inputs is not None:
+            try:
+                value = stage.inputs({"input": item, **outputs})
+            except Exception as exc:
+                raise PipelineError(f"Selecting inputs for {stage.name!r} failed: {exc}") from exc
+        elif len(stage.after) == 1:
+            value = outputs[stage.after[0]]
+        else:
+            value = item
+        queued = time.perf_counter()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await stage.run(value)
+            except Exception as exc:
+                raise PipelineError(f"Stage {stage.name!r} failed: {exc}") from exc
+            elapsed = time.perf_counter() - started
+        with self._lock:
+            timing = self._timings[stage.name]
+            timing.calls += 1
+            timing.total += elapsed
+            timing.longest = max(timing.longest, elapsed)
+            timing.waiting += started - queued
+        return result
+
+    async def _run_item(
+        self, item: Any, semaphores: Dict[str, asyncio.Semaphore]
+    ) -> Dict[str, Any]:
+        futures: Dict[str, "asyncio.Future[Any]"] = {}
+        # Stages are stored in dependency order, so every dependency's future exists.
+        for name, stage in self.stages.items():
+            futures[name] = asyncio.ensure_future(
+                self._run_stage(stage, item, futures, semaphores[name])
+            )
+        try:
+            results = await asyncio.gather(*futures.values())
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            await asyncio.gather(*futures.values(), return_exceptions=True)
+            raise
+        return dict(zip(futures, results))
+
+    def __call__(self, item: Any) -> Dict[str, Any]:
+        """Run every stage for one item; returns outputs by stage name."""
+        return _run_sync(lambda: self.acall(item))
+
+    async def acall(self, item: Any) -> Dict[str, Any]:
+        """Async ``__call__``."""
+        if not self.stages:
+            raise ConfigurationError("Pipeline has no stages")
+        return await self._run_item(item, self._semaphores())
+
+    def batch(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """Run the pipeline over ``items``, streaming each through the stages."""
+        return _run_sync(lambda: self.abatch(items))
+
+    async def abatch(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """Async ``batch``."""
+        if not self.stages:
+            raise ConfigurationError("Pipeline has no stages")
+        semaphores = self._semaphores()
+        return await asyncio.gather(*[self._run_item(item, semaphores) for item in items])
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Calls, total/mean/max run seconds and slot wait seconds per stage."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": t.calls,
+                    "total_seconds": round(t.total, 6),
+                    "mean_seconds": round(t.total / t.calls, 6) if t.calls else 0.0,
+                    "max_seconds": round(t.longest, 6),
+                    "wait_seconds": round(t.waiting, 6),
+                }
+                for name, t in self._timings.items()
+            }
+
+    def reset_stats(self) -> None:
+        """Zero the per-stage timings."""
+        with self._lock:
+            self._timings = {name: _StageTiming() for name in self.stages}
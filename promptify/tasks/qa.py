@@ -2,17 +2,45 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
 from pydantic import BaseModel
 
+from promptify.prompts.builder import PromptBuilder
 from promptify.schemas.qa import Answer
-from promptify.tasks.base import BaseTask
+from promptify.tasks.base import BaseTask, _run_sync
+from promptify.utils.index import BM25Index
+from promptify.utils.text import chunk_spans
+from promptify.utils.tokens import context_window
 
 _DEFAULT_INSTRUCTION = (
     "You are a question answering system. "
     "Answer the question based on the provided context and return structured JSON."
 )
+_MULTI_INSTRUCTION = (
+    "You are a question answering system. "
+    "Answer each question based on the provided context and return structured JSON."
+)
+
+# Output budget assumed when neither max_tokens nor the model's limit is known.
+_DEFAULT_OUTPUT_TOKENS = 4096
+
+# Passage indexes kept per task, keyed by document hash.
+_INDEX_CACHE_SIZE = 16
+_PASSAGE_SEPARATOR = "\n...\n"
+
+
+# Grouped answers carry their question's number, so a skipped or merged
+# question cannot shift the answers after it.
+class _NumberedAnswer(Answer):
+    question: int
+
+
+class _NumberedAnswerList(BaseModel):
+    answers: List[_NumberedAnswer]
 
 
 class QA(BaseTask):
@@ -24,14 +52,31 @@ class QA(BaseTask):
     >>> answer = qa("Einstein was born in Ulm.", question="Where was Einstein born?")
     >>> answer.answer
     'Ulm'
+
+    Several questions about the same context can be asked in one request
+    with ``ask_many``; the context is sent once per group of questions
+    instead of once per question.
+
+    >>> answers = qa.ask_many(contract, ["Who are the parties?", "When does it end?"])
+
+    With ``retrieval_top_k`` set, contexts longer than ``passage_size``
+    characters are split into passages and indexed with BM25; only the
+    ``retrieval_top_k`` passages that best match the question(s) are sent,
+    in document order. Indexes are cached per document hash, so repeated
+    questions about the same document skip re-indexing.
     """
 
+    dynamic_vars = ("text_input", "question")
+
     def __init__(
         self,
         model: str,
         domain: Optional[str] = None,
         examples: Optional[List[Tuple[str, str]]] = None,
         instruction: Optional[str] = None,
+        retrieval_top_k: Optional[int] = None,
+        passage_size: int = 1000,
+        passage_overlap: int = 100,
         **kwargs: Any,
     ) -> None:
         super().__init__(
@@ -43,10 +88,131 @@ class QA(BaseTask):
             examples=examples,
             **kwargs,
         )
+        self.multi_prompt_builder = PromptBuilder(template="qa_multi")
+        self._output_tokens = (
+            self.engine.config.max_tokens
+            or context_window(model)[1]
+            or _DEFAULT_OUTPUT_TOKENS
+        )
+        self.retrieval_top_k = retrieval_top_k
+        self.passage_size = passage_size
+        self.passage_overlap = passage_overlap
+        self._indexes: "OrderedDict[str, Tuple[List[Tuple[int, int]], BM25Index]]" = OrderedDict()
+
+    def _passage_index(self, text: str) -> Tuple[List[Tuple[int, int]], BM25Index]:
+        """Passage spans and BM25 index for ``text``, cached by content hash."""
+        key = hashlib.sha1(
+            f"{self.passage_size}:{self.passage_overlap}:{text}".encode("utf-8")
+        ).hexdigest()
+        entry = self._indexes.get(key)
+        if entry is not None:
+            self._indexes.move_to_end(key)
+            return entry
+        spans = chunk_spans(text, self.passage_size, self.passage_overlap)
+        entry = (spans, BM25Index([text[start:end] for start, end in spans]))
+        self._indexes[key] = entry
+        if len(self._indexes) > _INDEX_CACHE_SIZE:
+            self._indexes.popitem(last=False)
+        return entry
+
+    def _retrieve(self, text: str, questions: Sequence[str]) -> str:
+        """The passages of ``text`` most relevant to ``questions``, or all of it."""
+        if self.retrieval_top_k is None or len(text) <= self.passage_size:
+            return text
+        spans, index = self._passage_index(text)
+        selected = set()
+        for ranked in index.query_many(questions, self.retrieval_top_k):
+            selected.update(doc_id for doc_id, _ in ranked)
+        return _PASSAGE_SEPARATOR.join(
+            text[spans[i][0] : spans[i][1]].strip() for i in sorted(selected)
+        )
 
     def __call__(self, text: str, question: str = "", **kwargs: Any) -> Answer:  # type: ignore[override]
         """Run QA — pass question as kwarg for template rendering."""
-        return super().__call__(text, question=question, **kwargs)  # type: ignore[return-value]
+        context = self._retrieve(text, [question])
+        return super().__call__(context, question=question, **kwargs)  # type: ignore[return-value]
 
     async def acall(self, text: str, question: str = "", **kwargs: Any) -> Answer:  # type: ignore[override]
-        return await super().acall(text, question=question, **kwargs)  # type: ignore[return-value]
+        context = self._retrieve(text, [question])
+        result = await super().acall(context, question=question, **kwargs)
+        return result  # type: ignore[return-value]
+
+    def _question_groups(
+        self, questions: Sequence[str], max_questions_per_call: int, tokens_per_answer: int
+    ) -> List[List[int]]:
+        """Question indices per request, sized so the answers fit the output budget."""
+        size = max(1, min(max_questions_per_call, self._output_tokens // tokens_per_answer))
+        indices = list(range(len(questions)))
+        return [indices[i : i + size] for i in range(0, len(indices), size)]
+
+    def _prompt_spec(
+        self, **kwargs: Any
+    ) -> Tuple[PromptBuilder, str, Optional[Type[BaseModel]]]:
+        if "questions" in kwargs:
+            return self.multi_prompt_builder, _MULTI_INSTRUCTION, _NumberedAnswerList
+        return super()._prompt_spec(**kwargs)
+
+    async def _ask_group(self, text: str, questions: List[str], **kwargs: Any) -> List[Answer]:
+        context = self._retrieve(text, questions)
+        messages, request = self._prepare(context, questions=questions, **kwargs)
+        response = await self.engine.acomplete(
+            messages, output_schema=_NumberedAnswerList, **request
+        )
+        self._record(response, _NumberedAnswerList)
+        parsed = response.parsed or self.parser.parse(response.text, _NumberedAnswerList)
+        answers: Dict[int, Answer] = {}
+        for item in parsed.answers:
+            if 1 <= item.question <= len(questions) and item.question - 1 not in answers:
+                answers[item.question - 1] = Answer(**item.model_dump(exclude={"question"}))
+        # Answer whatever the model skipped one question at a time.
+        missing = [i for i in range(len(questions)) if i not in answers]
+        if missing:
+            results = await asyncio.gather(
+                *[self.acall(text, question=questions[i], **kwargs) for i in missing]
+            )
+            answers.update(zip(missing, results))
+        return [answers[i] for i in range(len(questions))]
+
+    async def aask_many(
+        self,
+        text: str,
+        questions: Sequence[str],
+        max_questions_per_call: int = 20,
+        tokens_per_answer: int = 150,
+        max_concurrent: int = 5,
+        **kwargs: Any,
+    ) -> List[Answer]:
+        """Answer several questions about ``text``, grouping them into few calls.
+
+        Each request carries the context once with a numbered list of up to
+        ``max_questions_per_call`` questions, fewer when ``tokens_per_answer``
+        times the group size would exceed the model's output budget. Groups
+        run concurrently. Answers are returned in question order. With
+        retrieval enabled, each group gets the union of its questions'
+        top passages.
+        """
+        groups = self._question_groups(questions, max_questions_per_call, tokens_per_answer)
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def _process(group: List[int]) -> List[Answer]:
+            async with semaphore:
+                return await self._ask_group(text, [questions[i] for i in group], **kwargs)
+
+        results = await asyncio.gather(*[_process(group) for group in groups])
+        return [answer for group_answers in results for answer in group_answers]
+
+    def ask_many(
+        self,
+        text: str,
+        questions: Sequence[str],
+        max_questions_per_call: int = 20,
+        tokens_per_answer: int = 150,
+        max_concurrent: int = 5,
+        **kwargs: Any,
+    ) -> List[Answer]:
+        """Synchronous ``aask_many``."""
+        return _run_sync(
+            lambda: self.aask_many(
+                text, questions, max_questions_per_call, tokens_per_answer, max_concurrent, **kwargs
+            )
+        )
@@ -2,16 +2,65 @@
 
 from __future__ import annotations
 
-from typing import Any, Optional
+import asyncio
+from typing import Any, List, Optional, Sequence
 
 from promptify.schemas.summarize import Summary
-from promptify.tasks.base import BaseTask
+from promptify.tasks.base import BaseTask, _run_sync
+from promptify.utils.text import check_chunking, chunk_text
+from promptify.utils.tokens import estimate_tokens
 
 _DEFAULT_INSTRUCTION = (
     "You are a text summarization system. "
     "Summarize the given text and return structured JSON."
 )
 
+# Extra reduce passes allowed when the final summary exceeds max_length.
+_MAX_SHORTEN_ROUNDS = 2
+
+
+def _merge_key_points(summaries: Sequence[Summary]) -> Optional[List[str]]:
+    points: List[str] = []
+    seen = set()
+    for summary in summaries:
+        for point in summary.key_points or []:
+            if point.lower() not in seen:
+                seen.add(point.lower())
+                points.append(point)
+    return points or None
+
+
+def _render_partials(summaries: Sequence[Summary]) -> str:
+    """Text handed to a reduce step: the partial summaries and their key points."""
+    text = "\n\n".join(s.summary for s in summaries)
+    points = _merge_key_points(summaries)
+    if points:
+        text += "\n\nKey points:\n" + "\n".join(f"- {p}" for p in points)
+    return text
+
+
+def _group(summaries: Sequence[Summary], max_chars: int) -> List[List[Summary]]:
+    """Pack consecutive partial summaries into groups of at most ``max_chars``.
+
+    Every group holds at least two summaries (when available), so each level
+    of the reduction shrinks the list.
+    """
+    groups: List[List[Summary]] = []
+    current: List[Summary] = []
+    size = 0
+    for summary in summaries:
+        length = len(summary.summary)
+        if len(current) >= 2 and size + length > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(summary)
+        size += length
+    if len(current) == 1 and groups:
+        groups[-1].extend(current)
+    elif current:
+        groups.append(current)
+    return groups
+
 
 class Summarize(BaseTask):
     """Text summarization.
@@ -22,6 +71,13 @@ class Summarize(BaseTask):
     >>> result = summarizer("Long article text here...")
     >>> result.summary
     'Concise summary...'
+
+    Set ``chunk_size`` (characters) for long documents: longer inputs are
+    summarized map-reduce style. Chunks are summarized concurrently (at most
+    ``max_concurrent`` calls at a time), then the partial summaries are
+    grouped and summarized again, level by level, until one remains. Key
+    points are merged at each level. Wall-clock time grows with the depth of
+    the reduction, not with the number of chunks.
     """
 
     def __init__(
@@ -31,8 +87,13 @@ class Summarize(BaseTask):
         key_points: bool = False,
         domain: Optional[str] = None,
         instruction: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        max_concurrent: int = 5,
         **kwargs: Any,
     ) -> None:
+        if chunk_size is not None:
+            check_chunking(chunk_size, chunk_overlap)
         super().__init__(
             model=model,
             output_schema=Summary,
@@ -43,3 +104,47 @@ class Summarize(BaseTask):
             key_points=key_points,
             **kwargs,
         )
+        self.max_length = max_length
+        self.key_points = key_points
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_concurrent = max_concurrent
+
+    def _is_long(self, text: str) -> bool:
+        return self.chunk_size is not None and len(text) > self.chunk_size
+
+    def __call__(self, text: str, **kwargs: Any) -> Summary:
+        if self._is_long(text):
+            return _run_sync(lambda: self._acall_map_reduce(text, **kwargs))
+        return super().__call__(text, **kwargs)  # type: ignore[return-value]
+
+    async def acall(self, text: str, **kwargs: Any) -> Summary:
+        if self._is_long(text):
+            return await self._acall_map_reduce(text, **kwargs)
+        return await super().acall(text, **kwargs)  # type: ignore[return-value]
+
+    async def _acall_map_reduce(self, text: str, **kwargs: Any) -> Summary:
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def _summarize(part: str) -> Summary:
+            async with semaphore:
+                return await BaseTask.acall(self, part, **kwargs)  # type: ignore[return-value]
+
+        async def _reduce(group: Sequence[Summary]) -> Summary:
+            result = await _summarize(_render_partials(group))
+            if self.key_points and not result.key_points:
+                result.key_points = _merge_key_points(group)
+            return result
+
+        chunks = chunk_text(text, self.chunk_size, self.chunk_overlap)
+        partials = list(await asyncio.gather(*[_summarize(chunk) for chunk in chunks]))
+        while len(partials) > 1:
+            groups = _group(partials, self.chunk_size)
+            partials = list(await asyncio.gather(*[_reduce(group) for group in groups]))
+
+        result = partials[0]
+        for _ in range(_MAX_SHORTEN_ROUNDS):
+            if self.max_length is None or estimate_tokens(result.summary) <= self.max_length:
+                break
+            result = await _reduce([result])
+        return result
@@ -0,0 +1,327 @@
+"""Database catalog parsed from DDL, for schema pruning.
+
+``SchemaCatalog`` splits a DDL script into tables (columns, comments, foreign
+keys) and indexes their names and comments with BM25, so a prompt can carry
+only the tables relevant to a question plus the tables they join to.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from promptify.utils.index import BM25Index
+
+_IDENT = r'(?:"[^"]+"|`[^`]+`|\[[^\]]+\]|[\w$]+)'
+_NAME = rf"({_IDENT}(?:\s*\.\s*{_IDENT})*)"
+_CREATE_TABLE_RE = re.compile(
+    rf"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:\w+\s+)*?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?{_NAME}",
+    re.IGNORECASE,
+)
+_CREATE_VIEW_RE = re.compile(
+    rf"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:\w+\s+)*?VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?{_NAME}",
+    re.IGNORECASE,
+)
+_ALTER_TABLE_RE = re.compile(
+    rf"^\s*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?{_NAME}", re.IGNORECASE
+)
+_CREATE_INDEX_RE = re.compile(
+    rf"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b.*?\bON\s+(?:ONLY\s+)?{_NAME}",
+    re.IGNORECASE | re.DOTALL,
+)
+_COMMENT_ON_RE = re.compile(
+    rf"^\s*COMMENT\s+ON\s+(TABLE|COLUMN)\s+{_NAME}\s+IS\s+'((?:[^']|'')*)'",
+    re.IGNORECASE,
+)
+_REFERENCES_RE = re.compile(rf"\bREFERENCES\s+{_NAME}", re.IGNORECASE)
+_INLINE_COMMENT_RE = re.compile(r"\bCOMMENT\s*=?\s*'((?:[^']|'')*)'", re.IGNORECASE)
+_LINE_COMMENT_RE = re.compile(r"--([^\n]*)")
+_LEADING_COMMENTS_RE = re.compile(r"^(?:\s*--[^\n]*(?:\n|$))+")
+_CONSTRAINT_WORDS = frozenset(
+    "constraint primary foreign unique key index check exclude fulltext spatial period".split()
+)
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+@dataclass
+class Column:
+    """A column of a catalog table."""
+
+    name: str
+    type: str = ""
+    comment: str = ""
+
+
+@dataclass
+class Table:
+    """A table (or view) with the DDL statements that define it."""
+
+    name: str
+    columns: List[Column] = field(default_factory=list)
+    comment: str = ""
+    references: Set[str] = field(default_factory=set)
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def ddl(self) -> str:
+        return "\n".join(f"{statement};" for statement in self.statements)
+
+
+def _unquote(name: str) -> str:
+    parts = re.findall(_IDENT, name)
+    return ".".join(part.strip('"`[]') for part in parts)
+
+
+def _code_chars(text: str) -> Iterator[Tuple[int, str]]:
+    """``(index, char)`` for characters outside quotes and ``--`` comments."""
+    i, quote = 0, ""
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "'\"`":
+            quote = char
+        elif text.startswith("--", i):
+            end = text.find("\n", i)
+            i = len(text) if end == -1 else end
+            continue
+        else:
+            yield i, char
+        i += 1
+
+
+def _split_statements(ddl: str) -> List[str]:
+    """Split a DDL script on ``;`` outside quotes and comments."""
+    statements, start = [], 0
+    for i, char in _code_chars(ddl):
+        if char == ";":
+            statements.append(ddl[start:i].strip())
+            start = i + 1
+    statements.append(ddl[start:].strip())
+    return [s for s in statements if s]
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Split a table body on commas outside parentheses, quotes and comments.
+
+    Items keep their surrounding whitespace, so a comment on the line of the
+    preceding comma can be told apart from comment lines above an item.
+    """
+    items, depth, start = [], 0, 0
+    for i, char in _code_chars(body):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(body[start:i])
+            start = i + 1
+    items.append(body[start:])
+    return [item for item in items if item.strip()]
+
+
+def _body(statement: str, start: int) -> Tuple[str, int]:
+    """Text inside the first parenthesized group after ``start``, and its end."""
+    depth, open_at = 0, -1
+    for i, char in _code_chars(statement):
+        if i < start:
+            continue
+        if char == "(":
+            if depth == 0:
+                open_at = i
+            depth += 1
+        elif char == ")" and depth:
+            depth -= 1
+            if depth == 0:
+                return statement[open_at + 1 : i], i + 1
+    if open_at == -1:
+        return "", start
+    return statement[open_at + 1 :], len(statement)
+
+
+def _comment(text: str) -> str:
+    found = _INLINE_COMMENT_RE.findall(text) + _LINE_COMMENT_RE.findall(text)
+    return " ".join(c.replace("''", "'").strip() for c in found if c.strip())
+
+
+def _words(text: str) -> str:
+    """Identifier-aware terms: ``orderItems`` and ``order_items`` -> ``order item``."""
+    out = []
+    for word in _WORD_RE.findall(text):
+        word = word.lower()
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        out.append(word)
+    return " ".join(out)
+
+
+class SchemaCatalog:
+    """Tables parsed from a DDL script, searchable by question.
+
+    Understands ``CREATE TABLE`` / ``CREATE VIEW`` statements with inline or
+    table-level ``REFERENCES``, ``COMMENT`` clauses and ``--`` comments, plus
+    ``ALTER TABLE``, ``CREATE INDEX`` and ``COMMENT ON`` statements, which are
+    attached to their table. Other statements are not indexed, but ``prune``
+    keeps them.
+
+    Example
+    -------
+    >>> catalog = SchemaCatalog(ddl)
+    >>> [t.name for t in catalog.relevant("revenue per customer", max_tables=2)]
+    ['customers', 'orders']
+    """
+
+    def __init__(self, ddl: str) -> None:
+        self.tables: Dict[str, Table] = {}
+        self._short: Dict[str, str] = {}
+        # Every statement in script order, with the table it belongs to (None
+        # for statements not tied to a table, such as ``CREATE TYPE``).
+        self._statements: List[Tuple[str, Optional[str]]] = []
+        for statement in _split_statements(ddl):
+            self._statements.append((statement, self._add(statement)))
+        for table in self.tables.values():
+            table.references = {
+                key for key in map(self._resolve, table.references) if key and key != table.name
+            }
+        self._names = list(self.tables)
+        self._index = BM25Index([self._document(self.tables[name]) for name in self._names])
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def _resolve(self, name: str) -> Optional[str]:
+        key = _unquote(name).lower()
+        if key in self.tables:
+            return key
+        return self._short.get(key.rsplit(".", 1)[-1])
+
+    def _table(self, name: str) -> Table:
+        key = _unquote(name).lower()
+        if key not in self.tables:
+            self.tables[key] = Table(name=key)
+            self._short.setdefault(key.rsplit(".", 1)[-1], key)
+        return self.tables[key]
+
+    def _add(self, statement: str) -> Optional[str]:
+        """Parse ``statement``; returns the key of the table it belongs to, if any."""
+        # Comment lines above a statement describe it but hide its keyword.
+        code = _LEADING_COMMENTS_RE.sub("", statement)
+        match = _CREATE_TABLE_RE.match(code)
+        if match:
+            table = self._table(match.group(1))
+            table.statements.append(statement)
+            body, end = _body(code, match.end())
+            previous: Optional[Column] = None
+            for i, item in enumerate(_split_top_level(body)):
+                # A comment after the comma (or the opening parenthesis)
+                # describes what precedes it.
+                first, newline, rest = item.partition("\n")
+                if newline and first.lstrip().startswith("--"):
+                    trailing = _comment(first)
+                    if previous is not None:
+                        previous.comment = " ".join(filter(None, [previous.comment, trailing]))
+                    elif i == 0:
+                        table.comment = " ".join(filter(None, [table.comment, trailing]))
+                    item = rest
+                comment = _comment(item)
+                item = _LEADING_COMMENTS_RE.sub("", item).strip()
+                table.references.update(_REFERENCES_RE.findall(item))
+                previous = None
+                if not item or item.split(None, 1)[0].lower() in _CONSTRAINT_WORDS:
+                    continue
+                parts = re.match(rf"({_IDENT})\s*([\w$]*)", item)
+                if parts:
+                    previous = Column(_unquote(parts.group(1)), parts.group(2), comment)
+                    table.columns.append(previous)
+            head = statement[: len(statement) - len(code) + match.start(1)] + code[end:]
+            table.comment = " ".join(filter(None, [table.comment, _comment(head)]))
+            return table.name
+
+        match = _CREATE_VIEW_RE.match(code)
+        if match:
+            table = self._table(match.group(1))
+            table.statements.append(statement)
+            table.comment = " ".join(filter(None, [table.comment, _comment(statement)]))
+            return table.name
+
+        match = _COMMENT_ON_RE.match(code)
+        if match:
+            kind, name, text = match.group(1).upper(), _unquote(match.group(2)), match.group(3)
+            if kind == "COLUMN":
+                name, _, column = name.rpartition(".")
+            key = self._resolve(name)
+            if key is None:
+                return None
+            table = self.tables[key]
+            table.statements.append(statement)
+            text = text.replace("''", "'")
+            if kind == "TABLE":
+                table.comment = " ".join(filter(None, [table.comment, text]))
+            else:
+                for col in table.columns:
+                    if col.name.lower() == column.lower():
+                        col.comment = " ".join(filter(None, [col.comment, text]))
+            return key
+
+        match = _ALTER_TABLE_RE.match(code) or _CREATE_INDEX_RE.match(code)
+        if match:
+            key = self._resolve(match.group(1))
+            if key is not None:
+                table = self.tables[key]
+                table.statements.append(statement)
+                table.references.update(_REFERENCES_RE.findall(code))
+            return key
+        return None
+
+    @staticmethod
+    def _document(table: Table) -> str:
+        # The table name is repeated so a name match outranks a column match.
+        name = _words(table.name)
+        columns = " ".join(f"{_words(c.name)} {_words(c.comment)}" for c in table.columns)
+        return f"{name} {name} {_words(table.comment)} {columns}"
+
+    def neighbors(self, name: str) -> Set[str]:
+        """Tables ``name`` references or is referenced by."""
+        key = self._resolve(name)
+        if key is None:
+            return set()
+        incoming = {other for other, t in self.tables.items() if key in t.references}
+        return self.tables[key].references | incoming
+
+    def relevant(
+        self, question: str, max_tables: int = 10, foreign_keys: bool = True
+    ) -> List[Table]:
+        """Tables relevant to ``question``, in catalog order.
+
+        The ``max_tables`` best BM25 matches are kept, plus (with
+        ``foreign_keys``) the tables they reference and any other matching
+        table that references them, so join paths stay complete. When no
+        table matches, every table is returned.
+        """
+        scores = self._index.scores(_words(question))
+        if not scores:
+            return list(self.tables.values())
+        top = heapq.nlargest(max_tables, scores, key=lambda i: (scores[i], -i))
+        selected = {self._names[i] for i in top}
+        if foreign_keys:
+            matched = [self._names[i] for i in scores]
+            for key in list(selected):
+                selected |= self.tables[key].references
+                selected.update(other for other in matched if key in self.tables[other].references)
+        return [table for key, table in self.tables.items() if key in selected]
+
+    def prune(self, question: str, max_tables: int = 10, foreign_keys: bool = True) -> str:
+        """DDL for the tables ``relevant`` to ``question``, in script order.
+
+        Statements not tied to a table (types, sequences, functions ...) are
+        always kept, since the kept tables may depend on them.
+        """
+        keep = {table.name for table in self.relevant(question, max_tables, foreign_keys)}
+        return "\n\n".join(
+            f"{statement};" for statement, key in self._statements if key is None or key in keep
+        )
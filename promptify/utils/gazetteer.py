@@ -0,0 +1,174 @@
+"""Compact gazetteer of known entity names.
+
+A ``Gazetteer`` maps entity phrases to labels. Phrases are stored as 64-bit
+hashes of their case-folded tokens in sorted ``array`` columns (about ten
+bytes per entry), so millions of names fit in tens of megabytes; recent
+additions sit in a small dict until they are merged in. Lookup slides token
+windows of the known phrase lengths over the text.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from promptify.schemas.ner import Entity, NERResult
+from promptify.utils.index import STOPWORDS
+from promptify.utils.matcher import fold_case
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+_AMBIGUOUS = 0xFFFF
+_MIN_MERGE = 1 << 16
+
+
+def _key(tokens: Sequence[str]) -> int:
+    digest = hashlib.blake2b("\x1f".join(tokens).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Gazetteer:
+    """Known ``(text, label)`` pairs, matched case-insensitively by token.
+
+    A phrase seen with two different labels is ambiguous and never tagged.
+    Hash collisions are possible in principle but negligible (64-bit keys).
+
+    Parameters
+    ----------
+    entries : iterable of (str, str)
+        Initial ``(text, label)`` pairs.
+
+    Example
+    -------
+    >>> gaz = Gazetteer([("aspirin", "DRUG"), ("type 2 diabetes", "CONDITION")])
+    >>> [(e.text, e.label) for e in gaz.tag("Aspirin for Type 2 diabetes")]
+    [('Aspirin', 'DRUG'), ('Type 2 diabetes', 'CONDITION')]
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()) -> None:
+        self.labels: List[str] = []
+        self._label_ids: Dict[str, int] = {}
+        self._keys = array("Q")
+        self._values = array("H")
+        self._pending: Dict[int, int] = {}
+        self._lengths: Set[int] = set()
+        self.update(entries)
+
+    def __len__(self) -> int:
+        self.compact()
+        return len(self._keys)
+
+    def _label_id(self, label: str) -> int:
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            if len(self.labels) >= _AMBIGUOUS:
+                raise ValueError("Too many distinct labels")
+            label_id = self._label_ids[label] = len(self.labels)
+            self.labels.append(label)
+        return label_id
+
+    def _lookup(self, key: int) -> Optional[int]:
+        value = self._pending.get(key)
+        if value is not None:
+            return value
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._values[i]
+        return None
+
+    def add(self, text: str, label: str) -> None:
+        """Add one phrase."""
+        tokens = [fold_case(t) for t in _TOKEN_RE.findall(text)]
+        if not tokens:
+            return
+        key, label_id = _key(tokens), self._label_id(label)
+        current = self._lookup(key)
+        if current is not None and current != label_id:
+            label_id = _AMBIGUOUS
+        self._pending[key] = label_id
+        self._lengths.add(len(tokens))
+        if len(self._pending) >= max(_MIN_MERGE, len(self._keys) // 8):
+            self.compact()
+
+    def update(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Add ``(text, label)`` pairs."""
+        for text, label in entries:
+            self.add(text, label)
+
+    def learn(self, result: NERResult) -> None:
+        """Add the entities of a past ``NERResult``."""
+        self.update((e.text, e.label) for e in result.entities if e.text and e.label)
+
+    def compact(self) -> None:
+        """Merge recent additions into the sorted arrays."""
+        if not self._pending:
+            return
+        keys, values = array("Q"), array("H")
+        old_keys, old_values = self._keys, self._values
+        i = 0
+        for key in sorted(self._pending):
+            while i < len(old_keys) and old_keys[i] < key:
+                keys.append(old_keys[i])
+                values.append(old_values[i])
+                i += 1
+            if i < len(old_keys) and old_keys[i] == key:
+                i += 1
+            keys.append(key)
+            values.append(self._pending[key])
+        keys.extend(old_keys[i:])
+        values.extend(old_values[i:])
+        self._keys, self._values, self._pending = keys, values, {}
+
+    def get(self, text: str) -> Optional[str]:
+        """Label of ``text``, or None if unknown or ambiguous."""
+        tokens = [fold_case(t) for t in _TOKEN_RE.findall(text)]
+        label_id = self._lookup(_key(tokens)) if tokens else None
+        return None if label_id is None or label_id == _AMBIGUOUS else self.labels[label_id]
+
+    def tag(self, text: str) -> List[Entity]:
+        """Known mentions in ``text`` with offsets, longest match first."""
+        matches = list(_TOKEN_RE.finditer(text))
+        tokens = [fold_case(m.group()) for m in matches]
+        lengths = sorted(self._lengths, reverse=True)
+        entities: List[Entity] = []
+        i = 0
+        while i < len(tokens):
+            for n in lengths:
+                if i + n > len(tokens):
+                    continue
+                label_id = self._lookup(_key(tokens[i : i + n]))
+                if label_id is not None and label_id != _AMBIGUOUS:
+                    start, end = matches[i].start(), matches[i + n - 1].end()
+                    label = self.labels[label_id]
+                    entities.append(Entity(text=text[start:end], label=label, start=start, end=end))
+                    i += n
+                    break
+            else:
+                i += 1
+        return entities
+
+    @staticmethod
+    def coverage(text: str, entities: Sequence[Entity]) -> float:
+        """Share of the content words of ``text`` inside ``entities``' spans.
+
+        Stopwords and punctuation are not counted, so a list of known names
+        joined by "and" or commas has full coverage.
+        """
+        spans = sorted(
+            (e.start, e.end) for e in entities if e.start is not None and e.end is not None
+        )
+        starts = [start for start, _ in spans]
+        # Furthest end among the spans starting at or before each position.
+        reach = list(accumulate((end for _, end in spans), max))
+        words = [m for m in _WORD_RE.finditer(text) if m.group().lower() not in STOPWORDS]
+        if not words:
+            return 1.0
+        covered = 0
+        for word in words:
+            i = bisect_right(starts, word.start())
+            covered += i > 0 and reach[i - 1] >= word.end()
+        return covered / len(words)
@@ -0,0 +1,175 @@
+"""Lightweight local similarity indexes.
+
+Sparse TF-IDF (word unigrams and bigrams) and BM25 (unigrams) indexes, kept
+in plain dicts with inverted indexes so a query only touches documents
+sharing a term with it. Built once, queried many times; no third-party
+dependencies.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, without common English stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _features(text: str) -> Counter:
+    tokens = tokenize(text)
+    feats = Counter(tokens)
+    feats.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return feats
+
+
+class _SparseIndex(ABC):
+    """Shared top-k search over a subclass's ``scores``."""
+
+    size: int
+
+    @abstractmethod
+    def scores(self, text: str) -> Dict[int, float]:
+        """Scores of the documents sharing a term with ``text``."""
+
+    def query(self, text: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top ``k`` ``(doc_id, score)`` pairs, best first.
+
+        Documents with no overlap score 0 and fill the remaining slots in
+        index order, so ``k`` results are returned whenever ``k <= size``.
+        """
+        totals = self.scores(text)
+        k = min(k, self.size)
+        ranked = heapq.nlargest(k, totals.items(), key=lambda item: (item[1], -item[0]))
+        if len(ranked) < k:
+            ranked.extend((i, 0.0) for i in self._fill(totals, k - len(ranked)))
+        return ranked
+
+    def query_many(self, texts: Iterable[str], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """``query`` for each text, scoring repeated texts once."""
+        seen: Dict[str, List[Tuple[int, float]]] = {}
+        out = []
+        for text in texts:
+            if text not in seen:
+                seen[text] = self.query(text, k)
+            out.append(seen[text])
+        return out
+
+    def _fill(self, exclude: Dict[int, float], n: int) -> List[int]:
+        out = []
+        for doc_id in range(self.size):
+            if len(out) == n:
+                break
+            if doc_id not in exclude:
+                out.append(doc_id)
+        return out
+
+
+class TfidfIndex(_SparseIndex):
+    """Cosine-similarity search over a fixed list of documents.
+
+    Parameters
+    ----------
+    documents : sequence of str
+        Texts to index; results refer to them by position.
+
+    Example
+    -------
+    >>> index = TfidfIndex(["aspirin for headache", "insulin for diabetes"])
+    >>> index.query("headache treatment", k=1)[0][0]
+    0
+    """
+
+    def __init__(self, documents: Sequence[str]) -> None:
+        self.size = len(documents)
+        counts = [_features(doc) for doc in documents]
+        df: Counter = Counter()
+        for feats in counts:
+            df.update(feats.keys())
+        # Smoothed idf, as in scikit-learn's TfidfVectorizer.
+        self._idf: Dict[str, float] = {
+            term: math.log((1 + self.size) / (1 + n)) + 1.0 for term, n in df.items()
+        }
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc_id, feats in enumerate(counts):
+            for term, weight in self._weigh(feats).items():
+                self._postings.setdefault(term, []).append((doc_id, weight))
+
+    def _weigh(self, feats: Counter) -> Dict[str, float]:
+        """L2-normalized tf-idf weights for the terms known to the index."""
+        weights = {
+            term: (1.0 + math.log(tf)) * self._idf[term]
+            for term, tf in feats.items()
+            if term in self._idf
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()} if norm else {}
+
+    def scores(self, text: str) -> Dict[int, float]:
+        """Cosine similarity of ``text`` to every document sharing a term with it."""
+        totals: Dict[int, float] = {}
+        for term, q_weight in self._weigh(_features(text)).items():
+            for doc_id, d_weight in self._postings[term]:
+                totals[doc_id] = totals.get(doc_id, 0.0) + q_weight * d_weight
+        return totals
+
+
+class BM25Index(_SparseIndex):
+    """Okapi BM25 ranking over a fixed list of passages.
+
+    Better suited than cosine TF-IDF to retrieving passages of varying
+    length for a short query.
+
+    Parameters
+    ----------
+    documents : sequence of str
+        Passages to index; results refer to them by position.
+    k1 : float
+        Term-frequency saturation.
+    b : float
+        Document-length normalization.
+
+    Example
+    -------
+    >>> index = BM25Index(["The lease ends in May.", "Rent is due monthly."])
+    >>> index.query("when does the lease end", k=1)[0][0]
+    0
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75) -> None:
+        self.size = len(documents)
+        counts = [Counter(tokenize(doc)) for doc in documents]
+        lengths = [sum(c.values()) for c in counts]
+        avg_length = (sum(lengths) / self.size) if self.size else 0.0
+        df: Counter = Counter()
+        for tf in counts:
+            df.update(tf.keys())
+        idf = {
+            term: math.log(1 + (self.size - n + 0.5) / (n + 0.5)) for term, n in df.items()
+        }
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc_id, tf in enumerate(counts):
+            norm = k1 * (1 - b + b * lengths[doc_id] / avg_length) if avg_length else k1
+            for term, freq in tf.items():
+                weight = idf[term] * freq * (k1 + 1) / (freq + norm)
+                self._postings.setdefault(term, []).append((doc_id, weight))
+
+    def scores(self, text: str) -> Dict[int, float]:
+        """BM25 score of ``text`` against every passage sharing a term with it."""
+        totals: Dict[int, float] = {}
+        for term in set(tokenize(text)):
+            for doc_id, weight in self._postings.get(term, ()):
+                totals[doc_id] = totals.get(doc_id, 0.0) + weight
+        return totals
@@ -0,0 +1,107 @@
+"""Multi-pattern string matching (Aho-Corasick).
+
+``PhraseMatcher`` finds every occurrence of many phrases in one pass over the
+text, in time linear in the text length plus the number of matches, however
+many phrases there are.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+def fold_case(text: str) -> str:
+    """Lowercase ``text`` without changing its length, so offsets stay valid.
+
+    ``str.lower`` expands a few characters (``"İ"`` becomes two code points);
+    those are left as they are.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over a fixed list of phrases.
+
+    Parameters
+    ----------
+    phrases : sequence of str
+        Phrases to find; matches refer to them by position. Empty phrases
+        are ignored.
+    case_sensitive : bool
+        Match exact case only.
+
+    Example
+    -------
+    >>> matcher = PhraseMatcher(["he", "she", "hers"])
+    >>> list(matcher.finditer("ushers"))
+    [(1, 4, 1), (2, 4, 0), (2, 6, 2)]
+    """
+
+    def __init__(self, phrases: Sequence[str], case_sensitive: bool = False) -> None:
+        self.phrases = list(phrases)
+        self.case_sensitive = case_sensitive
+        # Node 0 is the root; each node has transitions, a failure link and
+        # the ids of the phrases ending there (including via failure links).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        lengths = []
+        for phrase_id, phrase in enumerate(self.phrases):
+            key = phrase if case_sensitive else fold_case(phrase)
+            lengths.append(len(key))
+            if not key:
+                continue
+            node = 0
+            for char in key:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (phrase_id,)
+        self._lengths = lengths
+        self._link()
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(start, end, phrase_id)`` for every match, overlaps included.
+
+        Matches are yielded in order of their end offset.
+        """
+        haystack = text if self.case_sensitive else fold_case(text)
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        node = 0
+        for i, char in enumerate(haystack):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for phrase_id in out[node]:
+                yield i + 1 - lengths[phrase_id], i + 1, phrase_id
+
+    def find_all(self, text: str) -> Dict[int, List[Tuple[int, int]]]:
+        """Spans of each phrase found in ``text``, in text order."""
+        found: Dict[int, List[Tuple[int, int]]] = {}
+        for start, end, phrase_id in self.finditer(text):
+            found.setdefault(phrase_id, []).append((start, end))
+        for spans in found.values():
+            spans.sort()
+        return found
@@ -0,0 +1,200 @@
+"""Deterministic text normalization rules.
+
+Standard normalization rules ("lowercase", "remove punctuation", ...) do not
+need a model. ``resolve_rule`` recognizes the usual phrasings of each rule
+and ``RuleSet`` applies the recognized ones with precompiled regexes.
+"""
+
+from __future__ import annotations
+
+import re
+import string
+import unicodedata
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+_PUNCT_RE = re.compile(f"[{re.escape(string.punctuation)}‘’“”–—…]")
+_SPACE_RE = re.compile(r"\s+")
+_DIGITS_RE = re.compile(r"\d+")
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_THOUSANDS_RE = re.compile(r"(?<![\d.])\d{1,3}(?:,\d{3})+(?![\d,])")
+
+_UNITS = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen",
+    "eighteen", "nineteen",
+]
+_TENS = ["twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_NUMBER_WORDS: Dict[str, int] = {word: i for i, word in enumerate(_UNITS)}
+_NUMBER_WORDS.update({word: 20 + 10 * i for i, word in enumerate(_TENS)})
+_NUMBER_WORD_RE = re.compile(
+    r"\b(?:(" + "|".join(_TENS) + r")[\s-](" + "|".join(_UNITS[1:10]) + r")|("
+    + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r"))\b",
+    re.IGNORECASE,
+)
+
+_MONTHS = {
+    name: i
+    for i, names in enumerate(
+        [
+            ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+            ("may",), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+            ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"),
+            ("december", "dec"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+_MONTH_ALT = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_ISO_DATE_RE = re.compile(r"\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b")
+_NUMERIC_DATE_RE = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b")
+_DAY_MONTH_RE = re.compile(
+    rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_ALT})\.?,?\s+(\d{{4}})\b", re.IGNORECASE
+)
+_MONTH_DAY_RE = re.compile(
+    rf"\b({_MONTH_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE
+)
+
+
+def _iso(year: int, month: int, day: int) -> Optional[str]:
+    if 1 <= month <= 12 and 1 <= day <= 31:
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    return None
+
+
+def _numeric_date(match: "re.Match[str]") -> str:
+    first, second, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    # Month first (US order) unless that cannot be a valid date.
+    month, day = (second, first) if first > 12 else (first, second)
+    return _iso(year, month, day) or match.group(0)
+
+
+def canonicalize_dates(text: str) -> str:
+    """Rewrite common date formats as ISO 8601 ``YYYY-MM-DD``.
+
+    Numeric ``a/b/yyyy`` dates are read month-first unless the first number
+    is over 12.
+    """
+    text = _ISO_DATE_RE.sub(
+        lambda m: _iso(int(m.group(1)), int(m.group(2)), int(m.group(3))) or m.group(0), text
+    )
+    text = _NUMERIC_DATE_RE.sub(_numeric_date, text)
+    text = _DAY_MONTH_RE.sub(
+        lambda m: _iso(int(m.group(3)), _MONTHS[m.group(2).lower()], int(m.group(1)))
+        or m.group(0),
+        text,
+    )
+    return _MONTH_DAY_RE.sub(
+        lambda m: _iso(int(m.group(3)), _MONTHS[m.group(1).lower()], int(m.group(2)))
+        or m.group(0),
+        text,
+    )
+
+
+def _number_word(match: "re.Match[str]") -> str:
+    if match.group(1):
+        return str(_NUMBER_WORDS[match.group(1).lower()] + _NUMBER_WORDS[match.group(2).lower()])
+    return str(_NUMBER_WORDS[match.group(3).lower()])
+
+
+def canonicalize_numbers(text: str) -> str:
+    """Drop thousands separators and spell number words (up to 99) as digits."""
+    text = _THOUSANDS_RE.sub(lambda m: m.group(0).replace(",", ""), text)
+    return _NUMBER_WORD_RE.sub(_number_word, text)
+
+
+def strip_accents(text: str) -> str:
+    """Remove combining diacritics (``café`` -> ``cafe``)."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+RULES: Dict[str, Callable[[str], str]] = {
+    "lowercase": str.lower,
+    "uppercase": str.upper,
+    "casefold": str.casefold,
+    "remove_punctuation": lambda text: _PUNCT_RE.sub("", text),
+    "normalize_whitespace": lambda text: _SPACE_RE.sub(" ", text).strip(),
+    "unicode_nfc": lambda text: unicodedata.normalize("NFC", text),
+    "unicode_nfkc": lambda text: unicodedata.normalize("NFKC", text),
+    "strip_accents": strip_accents,
+    "remove_digits": lambda text: _DIGITS_RE.sub("", text),
+    "remove_urls": lambda text: _URL_RE.sub("", text),
+    "remove_emails": lambda text: _EMAIL_RE.sub("", text),
+    "canonicalize_numbers": canonicalize_numbers,
+    "canonicalize_dates": canonicalize_dates,
+}
+
+# Phrasings recognized for each rule, after lowercasing and whitespace cleanup.
+_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "lowercase": ("lowercase", "lower case", "lower-case", "to lowercase", "convert to lowercase",
+                  "make lowercase", "lowercase text", "convert to lower case"),
+    "uppercase": ("uppercase", "upper case", "to uppercase", "convert to uppercase"),
+    "casefold": ("casefold", "case fold", "case folding", "case-fold"),
+    "remove_punctuation": ("remove punctuation", "strip punctuation", "no punctuation",
+                           "delete punctuation", "remove all punctuation"),
+    "normalize_whitespace": ("normalize whitespace", "collapse whitespace", "strip whitespace",
+                             "trim whitespace", "remove extra spaces", "remove extra whitespace",
+                             "remove redundant whitespace"),
+    "unicode_nfc": ("nfc", "unicode nfc"),
+    "unicode_nfkc": ("unicode normalization", "normalize unicode", "nfkc", "unicode nfkc"),
+    "strip_accents": ("remove accents", "strip accents", "remove diacritics",
+                      "strip diacritics"),
+    "remove_digits": ("remove digits", "remove numbers", "strip digits"),
+    "remove_urls": ("remove urls", "strip urls", "remove links"),
+    "remove_emails": ("remove emails", "remove email addresses", "strip emails"),
+    "canonicalize_numbers": ("canonicalize numbers", "normalize numbers",
+                             "convert number words to digits", "numbers as digits"),
+    "canonicalize_dates": ("canonicalize dates", "normalize dates", "iso dates",
+                           "convert dates to iso", "convert dates to iso 8601",
+                           "dates in iso format", "format dates as yyyy-mm-dd"),
+}
+_ALIAS_TO_RULE = {alias: rule for rule, aliases in _ALIASES.items() for alias in aliases}
+_ALIAS_TO_RULE.update({rule: rule for rule in RULES})
+
+
+def resolve_rule(rule: str) -> Optional[str]:
+    """Canonical name of a deterministic rule, or None if it needs a model."""
+    key = _SPACE_RE.sub(" ", rule.strip().lower().rstrip("."))
+    return _ALIAS_TO_RULE.get(key) or _ALIAS_TO_RULE.get(key.replace("_", " "))
+
+
+class RuleSet:
+    """An ordered list of deterministic rules applied as one function.
+
+    Example
+    -------
+    >>> RuleSet(["lowercase", "remove punctuation"])("Hello, World!")
+    'hello world'
+    """
+
+    def __init__(self, rules: Sequence[str]) -> None:
+        names = [resolve_rule(rule) for rule in rules]
+        unknown = [rule for rule, name in zip(rules, names) if name is None]
+        if unknown:
+            raise ValueError(f"Not deterministic rules: {unknown}")
+        self.names: List[str] = [name for name in names if name is not None]
+        self._steps = [RULES[name] for name in self.names]
+
+    def __call__(self, text: str) -> str:
+        for step in self._steps:
+            text = step(text)
+        return text
+
+    def apply_batch(self, texts: Sequence[str]) -> List[str]:
+        """Apply the rules to every text."""
+        return [self(text) for text in texts]
+
+
+def split_rules(rules: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """Split ``rules`` into a leading run of deterministic rules and the rest.
+
+    Rules are order-sensitive, so only the prefix before the first rule that
+    needs a model can run locally; everything from there on goes to the
+    model.
+    """
+    for i, rule in enumerate(rules):
+        if resolve_rule(rule) is None:
+            return list(rules[:i]), list(rules[i:])
+    return list(rules), []
@@ -3,25 +3,53 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import List, Tuple
 
+from promptify.core.exceptions import ConfigurationError
 
-def chunk_text(text: str, max_chars: int = 4000, overlap: int = 200) -> List[str]:
-    """Split text into overlapping chunks."""
+
+def check_chunking(max_chars: int, overlap: int) -> None:
+    """Raise ``ConfigurationError`` unless ``0 <= overlap < max_chars``."""
+    if not 0 <= overlap < max_chars:
+        raise ConfigurationError(
+            f"Chunk overlap must be at least 0 and less than the chunk size "
+            f"(got overlap={overlap}, size={max_chars})"
+        )
+
+
+def chunk_spans(text: str, max_chars: int = 4000, overlap: int = 200) -> List[Tuple[int, int]]:
+    """Split text into overlapping ``(start, end)`` character spans.
+
+    Chunks end at a sentence boundary where one falls in their second half;
+    consecutive chunks share ``overlap`` characters.
+    """
+    check_chunking(max_chars, overlap)
     if len(text) <= max_chars:
-        return [text]
-    chunks = []
+        return [(0, len(text))]
+    spans = []
     start = 0
     while start < len(text):
         end = start + max_chars
         if end < len(text):
-            # Try to break at sentence boundary
+            # Try to break at sentence boundary, keeping the chunk longer than
+            # the overlap so the next one starts further on
             last_period = text.rfind(".", start, end)
-            if last_period > start + max_chars // 2:
+            if last_period > start + max(max_chars // 2, overlap):
                 end = last_period + 1
-        chunks.append(text[start:end].strip())
+        else:
+            end = len(text)
+        spans.append((start, end))
+        if end == len(text):
+            break
         start = end - overlap
-    return chunks
+    return spans
+
+
+def chunk_text(text: str, max_chars: int = 4000, overlap: int = 200) -> List[str]:
+    """Split text into overlapping chunks."""
+    if len(text) <= max_chars:
+        return [text]
+    return [text[start:end].strip() for start, end in chunk_spans(text, max_chars, overlap)]
 
 
 def normalize_whitespace(text: str) -> str:
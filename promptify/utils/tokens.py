@@ -0,0 +1,77 @@
+"""Token counting and model context windows.
+
+Tokenizers are resolved once per model through LiteLLM (tiktoken for OpenAI
+models, Hugging Face tokenizers where LiteLLM ships them) and cached; unknown
+models fall back to a characters-per-token estimate.
+"""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("promptify")
+
+# Rough characters-per-token ratio for English text with BPE tokenizers.
+CHARS_PER_TOKEN = 4
+
+# Per-message framing overhead of the chat format (OpenAI's accounting).
+_TOKENS_PER_MESSAGE = 4
+_TOKENS_PER_REPLY = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text`` without loading a tokenizer."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@lru_cache(maxsize=32)
+def get_token_counter(model: Optional[str] = None) -> Callable[[str], int]:
+    """Return a cached ``text -> token count`` function for ``model``."""
+    if model is None:
+        return estimate_tokens
+    try:
+        from litellm.utils import _select_tokenizer
+
+        selected = _select_tokenizer(model)
+    except Exception:
+        logger.debug("No tokenizer for %s, estimating token counts", model)
+        return estimate_tokens
+
+    tokenizer = selected["tokenizer"]
+    if selected["type"] == "openai_tokenizer":
+        return lambda text: len(tokenizer.encode(text, disallowed_special=()))
+    return lambda text: len(tokenizer.encode(text).ids)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens in ``text`` for ``model``."""
+    return get_token_counter(model)(text)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content)
+    return content or ""
+
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Prompt tokens for a chat message list, including per-message framing."""
+    counter = get_token_counter(model)
+    total = _TOKENS_PER_REPLY
+    for message in messages:
+        total += _TOKENS_PER_MESSAGE + counter(_content_text(message.get("content")))
+    return total
+
+
+@lru_cache(maxsize=32)
+def context_window(model: str) -> Tuple[Optional[int], Optional[int]]:
+    """``(max_input_tokens, max_output_tokens)`` for ``model``; None if unknown."""
+    try:
+        import litellm
+
+        info = litellm.get_model_info(model)
+    except Exception:
+        return None, None
+    return info.get("max_input_tokens"), info.get("max_output_tokens")
@@ -4,12 +4,13 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Type
 from unittest.mock import MagicMock
 
 import pytest
 from pydantic import BaseModel
 
+from promptify.core.config import ModelConfig
 from promptify.engine.llm import LLMEngine, LLMResponse
 from promptify.schemas.classify import Classification
 from promptify.schemas.ner import Entity, NERResult
@@ -44,6 +45,37 @@ class MockLLMEngine(LLMEngine):
         return self.complete(messages, output_schema, **kwargs)
 
 
+class RecordingEngine(MockLLMEngine):
+    """Mock engine that records every request.
+
+    ``prompts`` holds the last message of each request and ``calls`` its
+    messages and keyword arguments. With ``respond``, the response text is
+    computed from the prompt instead of fixed. ``model`` gives the engine a
+    config, for tasks that read it.
+    """
+
+    def __init__(
+        self,
+        response_text: str = "",
+        respond: Optional[Callable[[str], str]] = None,
+        model: Optional[str] = None,
+    ):
+        super().__init__(response_text=response_text)
+        if model is not None:
+            self.config = ModelConfig(model=model)
+        self.respond = respond
+        self.prompts: List[str] = []
+        self.calls: List[Dict[str, Any]] = []
+
+    def complete(self, messages, output_schema=None, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        self.calls.append({"messages": messages, **kwargs})
+        if self.respond is not None:
+            self._response_text = self.respond(prompt)
+        return super().complete(messages, output_schema=output_schema, **kwargs)
+
+
 @pytest.fixture
 def mock_ner_response():
     """Pre-built NER response."""
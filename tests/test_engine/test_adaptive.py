@@ -0,0 +1,112 @@
+"""Tests for adaptive max_tokens."""
+
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+
+from promptify.core.config import ModelConfig
+from promptify.engine.adaptive import AdaptiveMaxTokens, P2Quantile
+from promptify.engine.llm import LLMResponse
+from promptify.tasks.ner import NER
+from tests.conftest import MockLLMEngine
+
+KEY = ("NER", "NERResult")
+
+
+class TestP2Quantile:
+    def test_small_samples_are_exact(self):
+        sketch = P2Quantile(0.5)
+        assert sketch.value() is None
+        for x in (5, 1, 3):
+            sketch.add(x)
+        assert sketch.value() == 3
+
+    @pytest.mark.parametrize("p", [0.5, 0.9, 0.99])
+    def test_tracks_skewed_distribution(self, p):
+        rng = random.Random(7)
+        values = [rng.expovariate(1 / 200) for _ in range(5000)]
+        sketch = P2Quantile(p)
+        for x in values:
+            sketch.add(x)
+        exact = sorted(values)[int(p * len(values))]
+        assert sketch.value() == pytest.approx(exact, rel=0.1)
+
+    def test_rejects_invalid_p(self):
+        with pytest.raises(ValueError):
+            P2Quantile(1.0)
+
+
+class TestAdaptiveMaxTokens:
+    def test_uncapped_during_warmup(self):
+        tracker = AdaptiveMaxTokens(warmup=5)
+        for _ in range(4):
+            tracker.observe(KEY, 100)
+        assert tracker.limit(KEY) is None
+        tracker.observe(KEY, 100)
+        assert tracker.limit(KEY) == 125
+
+    def test_min_tokens_floor(self):
+        tracker = AdaptiveMaxTokens(warmup=1, min_tokens=64)
+        tracker.observe(KEY, 3)
+        assert tracker.limit(KEY) == 64
+
+    def test_frequent_truncation_raises_cap(self):
+        tracker = AdaptiveMaxTokens(warmup=5, window=10, max_truncation_rate=0.2)
+        for _ in range(10):
+            tracker.observe(KEY, 100)
+        cap = tracker.limit(KEY)
+        for _ in range(3):
+            tracker.observe(KEY, cap, truncated=True)
+        assert tracker.limit(KEY) > cap
+        assert tracker.stats()["NER/NERResult"]["truncations"] == 3
+
+
+class TruncatingEngine(MockLLMEngine):
+    def __init__(self, response_text: str, finish_reason: str = "stop") -> None:
+        super().__init__(response_text=response_text)
+        self.config = ModelConfig(model="gpt-4o-mini")
+        self.finish_reason = finish_reason
+        self.requested = []
+
+    def complete(self, messages, output_schema=None, **kwargs):
+        self.requested.append(kwargs.get("max_tokens"))
+        return LLMResponse(
+            text=self._response_text,
+            usage={"prompt_tokens": 10, "completion_tokens": 40, "total_tokens": 50},
+            finish_reason=self.finish_reason,
+        )
+
+
+class TestTaskIntegration:
+    def test_task_caps_after_warmup(self):
+        tracker = AdaptiveMaxTokens(warmup=3, min_tokens=1)
+        ner = NER(model="gpt-4o-mini", adaptive_max_tokens=tracker)
+        ner.engine = TruncatingEngine(json.dumps({"entities": []}))
+        for _ in range(4):
+            ner("Aspirin")
+        assert ner.engine.requested == [None, None, None, 50]
+
+    def test_models_tracked_separately(self):
+        tracker = AdaptiveMaxTokens(warmup=3, min_tokens=1)
+        mini = NER(model="gpt-4o-mini", adaptive_max_tokens=tracker)
+        mini.engine = TruncatingEngine(json.dumps({"entities": []}))
+        for _ in range(3):
+            mini("Aspirin")
+        other = NER(model="gpt-4o", adaptive_max_tokens=tracker)
+        other.engine = TruncatingEngine(json.dumps({"entities": []}))
+        other.engine.config = ModelConfig(model="gpt-4o")
+        other("Aspirin")
+        assert other.engine.requested == [None]
+        assert set(tracker.stats()) == {"NER/gpt-4o-mini/NERResult", "NER/gpt-4o/NERResult"}
+
+    def test_truncated_response_is_repaired(self):
+        full = json.dumps({"entities": [{"text": "Aspirin", "label": "DRUG"}, {"text": "Ibu"}]})
+        ner = NER(model="gpt-4o-mini", adaptive_max_tokens=AdaptiveMaxTokens())
+        ner.engine = TruncatingEngine(full[:-20], finish_reason="length")
+        result = ner("Aspirin and ibuprofen")
+        assert result.entities[0].text == "Aspirin"
+        stats = ner.max_tokens_tracker.stats()
+        assert stats["NER/gpt-4o-mini/NERResult"]["truncations"] == 1
@@ -53,6 +53,41 @@ class TestLLMEngine:
         assert params["response_format"]["type"] == "json_schema"
         assert params["response_format"]["json_schema"]["name"] == "SampleOutput"
 
+    def test_schema_artifacts_memoized(self):
+        from promptify.schemas.artifacts import get_schema_artifacts
+
+        engine = LLMEngine(ModelConfig(model="gpt-4o-mini"))
+        messages = [{"role": "user", "content": "hi"}]
+        first = engine._build_params(messages, output_schema=SampleOutput)
+        second = engine._build_params(messages, output_schema=SampleOutput)
+        assert first["response_format"] is second["response_format"]
+        assert get_schema_artifacts(SampleOutput) is get_schema_artifacts(SampleOutput)
+        assert "answer: string" in get_schema_artifacts(SampleOutput).schema_hint
+
+    def test_build_params_with_key_aliases(self):
+        from promptify.schemas.aliasing import KeyAliases
+
+        class LongNames(BaseModel):
+            final_answer_text: str
+
+        engine = LLMEngine(ModelConfig(model="gpt-4o-mini"))
+        aliases = KeyAliases(LongNames)
+        params = engine._build_params(
+            messages=[{"role": "user", "content": "hi"}],
+            output_schema=LongNames,
+            key_aliases=aliases,
+        )
+        schema = params["response_format"]["json_schema"]["schema"]
+        assert list(schema["properties"]) == ["fat"]
+        assert schema["required"] == ["fat"]
+
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = '{"fat": "42"}'
+        mock_response.model = "gpt-4o-mini"
+        result = engine._parse_response(mock_response, LongNames, aliases)
+        assert result.parsed.final_answer_text == "42"
+
     def test_build_params_with_api_key(self):
         config = ModelConfig(model="gpt-4o", api_key="sk-test123")
         engine = LLMEngine(config)
@@ -78,6 +113,48 @@ class TestLLMEngine:
         assert result.parsed.answer == "yes"
         assert result.usage["total_tokens"] == 15
 
+    def test_parse_response_cached_tokens(self):
+        engine = LLMEngine(ModelConfig(model="gpt-4o-mini"))
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "ok"
+        mock_response.usage.prompt_tokens = 1200
+        mock_response.usage.completion_tokens = 5
+        mock_response.usage.total_tokens = 1205
+        mock_response.usage.prompt_tokens_details.cached_tokens = 1024
+
+        result = engine._parse_response(mock_response)
+        assert result.usage["cached_tokens"] == 1024
+        assert result.finish_reason == "" and not result.truncated
+
+        mock_response.choices[0].finish_reason = "length"
+        assert engine._parse_response(mock_response).truncated
+
+    def test_parse_response_top_logprobs(self):
+        engine = LLMEngine(ModelConfig(model="gpt-4o-mini"))
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "B"
+        mock_response.choices[0].logprobs = {
+            "content": [
+                {
+                    "token": "B",
+                    "logprob": -0.1,
+                    "top_logprobs": [
+                        {"token": "B", "logprob": -0.1},
+                        {"token": "A", "logprob": -2.5},
+                    ],
+                }
+            ]
+        }
+        result = engine._parse_response(mock_response)
+        assert result.top_logprobs == {"B": -0.1, "A": -2.5}
+
+    def test_uses_cache_markers(self):
+        anthropic = ModelConfig(model="anthropic/claude-3-5-sonnet-20240620")
+        assert LLMEngine(anthropic).uses_cache_markers
+        assert not LLMEngine(ModelConfig(model="gpt-4o-mini")).uses_cache_markers
+
     def test_map_exception_auth(self):
         config = ModelConfig(model="gpt-4o-mini")
         engine = LLMEngine(config)
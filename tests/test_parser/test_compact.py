@@ -0,0 +1,83 @@
+"""Tests for compact line-oriented output parsers."""
+
+from __future__ import annotations
+
+import pytest
+
+from promptify.core.exceptions import ConfigurationError, ParserError
+from promptify.parser.compact import (
+    EntityLineParser,
+    LineParser,
+    RelationLineParser,
+    TableLineParser,
+    resolve_output_format,
+)
+from promptify.schemas.extract import ExtractionResult
+from promptify.schemas.ner import NERResult
+
+
+class TestCompactParsers:
+    def test_resolve_output_format(self):
+        assert resolve_output_format("json") is None
+        assert resolve_output_format("tsv") == "\t"
+        assert resolve_output_format("pipe") == "|"
+        with pytest.raises(ConfigurationError):
+            resolve_output_format("xml")
+
+    def test_entities_tsv(self):
+        text = "chronic hip pain\tCONDITION\nosteoporosis\tCONDITION\n"
+        result = EntityLineParser("\t").parse(text)
+        assert isinstance(result, NERResult)
+        assert [e.text for e in result.entities] == ["chronic hip pain", "osteoporosis"]
+        assert result.entities[0].label == "CONDITION"
+
+    def test_entities_skip_noise_and_truncated_line(self):
+        text = "```\ntext\tlabel\nJohn\tPERSON\n\nGoogle\tORG\nNY"
+        result = EntityLineParser("\t").parse(text)
+        labels = [(e.text, e.label) for e in result.entities]
+        assert labels == [("John", "PERSON"), ("Google", "ORG")]
+
+    def test_entities_with_offsets(self):
+        result = EntityLineParser("|").parse("John | PERSON | 0 | 4")
+        assert result.entities[0].start == 0
+        assert result.entities[0].end == 4
+
+    def test_streaming_feed(self):
+        parser = EntityLineParser("\t")
+        assert parser.feed("John\tPER") == []
+        completed = parser.feed("SON\nMary\t")
+        assert [e.text for e in completed] == ["John"]
+        parser.feed("PERSON")
+        result = parser.close()
+        assert [e.text for e in result.entities] == ["John", "Mary"]
+
+    def test_relations_pipe(self):
+        text = "Einstein | born in | Ulm\nEinstein | born in\n"
+        result = RelationLineParser("|").parse(text)
+        assert isinstance(result, ExtractionResult)
+        assert len(result.relations) == 1
+        assert result.relations[0].object == "Ulm"
+
+    def test_table_markdown_pipe(self):
+        text = "| name | age |\n|---|---|\n| John | 30 |\n| Jane | 25 |"
+        result = TableLineParser("|").parse(text)
+        assert [row.data for row in result.rows] == [
+            {"name": "John", "age": "30"},
+            {"name": "Jane", "age": "25"},
+        ]
+
+    def test_json_reply_is_not_an_empty_result(self):
+        with pytest.raises(ParserError):
+            EntityLineParser("\t").parse('{"entities": [{"text": "John", "label": "PERSON"}]}')
+        with pytest.raises(ParserError):
+            TableLineParser("|").parse("Sorry, I cannot help with that.")
+        assert EntityLineParser("\t").parse("text\tlabel\n").entities == []
+        assert EntityLineParser("\t").parse("").entities == []
+
+    def test_incomplete_subclass_rejected(self):
+        class RecordOnly(LineParser):
+            def _record(self, fields):
+                return fields
+
+        with pytest.raises(TypeError):
+            RecordOnly()
@@ -155,3 +155,40 @@ class TestParser:
         text = 'Some text {"a": 1} more text [2, 3]'
         objects = self.parser.extract_complete_objects(text)
         assert len(objects) >= 1
+
+    # --- payload extraction fast path ---
+
+    def test_extract_payload_fenced(self):
+        text = 'Here is the result:\n```json\n{"a": 1}\n```'
+        assert self.parser.extract_payload(text) == '{"a": 1}'
+
+    def test_extract_payload_none(self):
+        assert self.parser.extract_payload("no structure here") is None
+
+    def test_parse_fenced_json(self):
+        result = self.parser.parse('```json\n{"answer": "yes"}\n```')
+        assert result == {"answer": "yes"}
+        assert self.parser.stats["extracted"] == 1
+        assert self.parser.stats["repaired"] == 0
+
+    def test_parse_chatty_prefix_and_suffix(self):
+        result = self.parser.parse('Sure! Here you go: [1, 2, 3] Let me know if...')
+        assert result == [1, 2, 3]
+        assert self.parser.stats["extracted"] == 1
+
+    def test_parse_truncated_after_prefix(self):
+        result = self.parser.parse('Result: {"a": 1, "b": {"c": 2}, "d": 3')
+        assert result == {"a": 1, "b": {"c": 2}, "d": 3}
+        assert self.parser.stats["repaired"] == 1
+
+    def test_parse_stats(self):
+        self.parser.parse('{"a": 1}')
+        self.parser.parse("{'a': 1}")
+        with pytest.raises(ParserError):
+            self.parser.parse("complete garbage xyz")
+        stats = self.parser.stats
+        assert stats["direct"] == 1
+        assert stats["literal"] == 1
+        assert stats["failed"] == 1
+        self.parser.reset_stats()
+        assert sum(self.parser.stats.values()) == 0
@@ -5,7 +5,7 @@ from __future__ import annotations
 import pytest
 from pydantic import BaseModel
 
-from promptify.core.exceptions import TemplateNotFoundError
+from promptify.core.exceptions import ContextLengthError, TemplateNotFoundError
 from promptify.prompts.builder import PromptBuilder
 
 
@@ -103,3 +103,91 @@ class TestPromptBuilder:
         )
         assert "Einstein" in messages[1]["content"]
         assert "Ulm" in messages[1]["content"]
+
+    # --- compiled prompts ---
+
+    @pytest.mark.parametrize(
+        "template,build_kwargs",
+        [
+            ("ner", {"domain": "medical", "labels": ["DRUG"], "examples": [("a", "b")]}),
+            ("classify_binary", {"label_0": "spam", "label_1": "ham"}),
+            ("summarize", {"max_length": 50, "key_points": True}),
+            (None, {"domain": "legal", "examples": [("in", "out")]}),
+        ],
+    )
+    def test_compile_matches_full_build(self, template, build_kwargs):
+        builder = PromptBuilder(template=template)
+        compiled = builder.compile("Do the task.", output_schema=SampleSchema, **build_kwargs)
+        assert compiled is not None
+        text = "  Aspirin {{ not jinja }} 50mg  "
+        expected = builder.build(
+            "Do the task.", text_input=text, output_schema=SampleSchema, **build_kwargs
+        )
+        assert compiled.build(text_input=text) == expected
+
+    def test_compile_multiple_variables(self):
+        builder = PromptBuilder(template="qa")
+        compiled = builder.compile("Answer.", dynamic=("text_input", "question"))
+        assert compiled.variables == {"text_input", "question"}
+        assert compiled.build(text_input="Ctx", question="Q?") == builder.build(
+            "Answer.", text_input="Ctx", question="Q?"
+        )
+
+    def test_compile_rejects_filtered_variable(self, tmp_path):
+        path = tmp_path / "upper.jinja"
+        path.write_text("Input: {{ text_input|upper }}")
+        assert PromptBuilder(template=str(path)).compile("x") is None
+
+    @pytest.mark.parametrize("template", ["ner", None])
+    def test_compile_cache_control_marks_static_prefix(self, template):
+        builder = PromptBuilder(template=template)
+        compiled = builder.compile("Do the task.", domain="medical", examples=[("a", "b")])
+        plain = compiled.build(text_input="Aspirin 50mg")
+        marked = compiled.build(cache_control=True, text_input="Aspirin 50mg")
+
+        blocks = [
+            block
+            for msg in marked
+            if isinstance(msg["content"], list)
+            for block in msg["content"]
+        ]
+        assert sum("cache_control" in block for block in blocks) == 1
+        flattened = [
+            msg["content"]
+            if isinstance(msg["content"], str)
+            else "".join(block["text"] for block in msg["content"])
+            for msg in marked
+        ]
+        assert flattened == [msg["content"] for msg in plain]
+        assert "Aspirin" not in next(b["text"] for b in blocks if "cache_control" in b)
+
+    # --- token budgets ---
+
+    def test_build_budgeted_within_budget(self):
+        builder = PromptBuilder()
+        result = builder.build_budgeted(
+            "Answer.", "What is 2+2?", max_prompt_tokens=1000, model="gpt-4o-mini",
+            examples=[("1+1?", "2")],
+        )
+        assert result.examples_used == 1 and not result.truncated
+        assert result.messages == builder.build("Answer.", "What is 2+2?", examples=[("1+1?", "2")])
+
+    def test_build_budgeted_drops_first_examples(self):
+        examples = [("far " * 50, "x"), ("near " * 50, "y")]
+        result = PromptBuilder().build_budgeted(
+            "Answer.", "q", max_prompt_tokens=80, model="gpt-4o-mini", examples=examples
+        )
+        assert result.examples_used == 1
+        assert result.messages[1]["content"] == "near " * 50
+        assert result.prompt_tokens <= 80
+
+    def test_build_budgeted_truncates_or_raises(self):
+        builder = PromptBuilder(template="summarize")
+        text = "The quarterly report shows growth. " * 300
+        with pytest.raises(ContextLengthError):
+            builder.build_budgeted("Summarize.", text, max_prompt_tokens=200, model="gpt-4o-mini")
+        result = builder.build_budgeted(
+            "Summarize.", text, max_prompt_tokens=200, model="gpt-4o-mini", truncate=True
+        )
+        assert result.truncated and result.prompt_tokens <= 200
+        assert "quarterly report" in result.messages[1]["content"]
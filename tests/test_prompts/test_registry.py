@@ -0,0 +1,36 @@
+"""Tests for the shared template registry."""
+
+from __future__ import annotations
+
+import os
+
+from promptify.prompts import registry
+from promptify.prompts.builder import PromptBuilder
+
+
+class TestTemplateRegistry:
+    def teardown_method(self):
+        registry.configure_template_cache(None)
+
+    def test_builtin_compiled_once(self):
+        first = PromptBuilder(template="ner")
+        second = PromptBuilder(template="ner.jinja")
+        assert first._jinja_template is second._jinja_template
+
+    def test_builtin_templates_listed(self):
+        names = registry.builtin_templates()
+        assert "ner.jinja" in names
+        assert "qa.jinja" in names
+
+    def test_bytecode_cache_written(self, tmp_path):
+        registry.configure_template_cache(str(tmp_path))
+        compiled = registry.warm_templates()
+        assert len(compiled) == len(registry.builtin_templates())
+        assert len(os.listdir(tmp_path)) == len(compiled)
+
+    def test_custom_template_path(self, tmp_path):
+        path = tmp_path / "custom.jinja"
+        path.write_text("Say hi to {{ text_input }}")
+        builder = PromptBuilder(template=str(path))
+        messages = builder.build(instruction="Greet.", text_input="Ada")
+        assert messages[1]["content"] == "Say hi to Ada"
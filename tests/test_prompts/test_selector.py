@@ -0,0 +1,101 @@
+"""Tests for few-shot example selection."""
+
+from __future__ import annotations
+
+import json
+
+from promptify.prompts.selector import ExampleSelector
+from promptify.tasks.ner import NER
+from promptify.utils.index import BM25Index, TfidfIndex
+from tests.conftest import MockLLMEngine
+
+POOL = [
+    ("Aspirin 81mg daily for heart health", '{"entities": [{"text": "Aspirin", "label": "DRUG"}]}'),
+    ("Metformin for type 2 diabetes", '{"entities": [{"text": "Metformin", "label": "DRUG"}]}'),
+    ("The court dismissed the appeal", '{"entities": []}'),
+    ("Insulin dose adjusted for diabetes", '{"entities": [{"text": "Insulin", "label": "DRUG"}]}'),
+    ("Stock prices fell sharply on Monday", '{"entities": []}'),
+]
+
+
+class TestTfidfIndex:
+    def test_query_ranks_by_similarity(self):
+        index = TfidfIndex([inp for inp, _ in POOL])
+        ranked = index.query("patient with diabetes on metformin", k=2)
+        assert [doc_id for doc_id, _ in ranked] == [1, 3]
+        assert ranked[0][1] > ranked[1][1] > 0
+
+    def test_query_fills_with_zero_scores(self):
+        index = TfidfIndex(["alpha", "beta", "gamma"])
+        assert index.query("beta", k=3) == [(1, 1.0), (0, 0.0), (2, 0.0)]
+        assert index.query("unrelated", k=2) == [(0, 0.0), (1, 0.0)]
+
+    def test_query_many_matches_query(self):
+        index = TfidfIndex([inp for inp, _ in POOL])
+        texts = ["diabetes", "court appeal", "diabetes"]
+        assert index.query_many(texts, k=2) == [index.query(t, k=2) for t in texts]
+
+
+class TestBM25Index:
+    def test_ranks_matching_passage_first(self):
+        index = BM25Index(
+            [
+                "The tenant pays rent monthly.",
+                "The lease terminates on May 31, 2025 unless renewed.",
+                "Pets are not allowed.",
+            ]
+        )
+        assert index.query("When does the lease terminate?", k=1)[0][0] == 1
+
+    def test_shorter_passage_wins_on_equal_matches(self):
+        index = BM25Index(["deposit " + "filler " * 30, "deposit refund"])
+        assert [doc_id for doc_id, _ in index.query("deposit", k=2)] == [1, 0]
+
+
+class TestExampleSelector:
+    def test_select_top_k_most_similar_last(self):
+        selector = ExampleSelector(POOL, k=2)
+        assert selector.select("insulin and diabetes") == [POOL[1], POOL[3]]
+
+    def test_token_budget(self):
+        selector = ExampleSelector(POOL, k=3, max_tokens=25)
+        selected = selector.select("diabetes medication")
+        assert 0 < len(selected) < 3
+        assert selected[-1] in (POOL[1], POOL[3])
+
+    def test_select_many(self):
+        selector = ExampleSelector(POOL, k=1)
+        assert selector.select_many(["court", "stock prices"]) == [[POOL[2]], [POOL[4]]]
+
+
+class TestTaskExampleSelection:
+    def test_prompt_includes_only_selected_examples(self):
+        ner = NER(model="gpt-4o-mini", examples=POOL, max_examples=1)
+        ner.engine = MockLLMEngine(response_text=json.dumps({"entities": []}))
+
+        prompt = ner._build_messages("The judge dismissed the appeal")[1]["content"]
+        assert "court dismissed" in prompt
+        assert "Aspirin" not in prompt and "Metformin" not in prompt
+
+        prompt = ner._build_messages("Metformin 500mg")[1]["content"]
+        assert "Metformin for type 2" in prompt and "court" not in prompt
+
+    def test_selection_matches_full_build(self):
+        ner = NER(model="gpt-4o-mini", examples=POOL, max_examples=2, domain="medical")
+        text = "Insulin for diabetes"
+        expected = ner.prompt_builder.build(
+            instruction=ner.instruction,
+            text_input=text,
+            domain="medical",
+            labels=ner.labels,
+            examples=ExampleSelector(POOL, k=2).select(text),
+            output_schema=ner.output_schema,
+            **ner._extra_kwargs,
+        )
+        assert ner._build_messages(text) == expected
+
+    def test_selected_examples_skip_compilation(self):
+        ner = NER(model="gpt-4o-mini", examples=POOL, max_examples=1)
+        ner._build_messages("The judge dismissed the appeal")
+        ner._build_messages("Metformin 500mg")
+        assert not ner._compiled
@@ -0,0 +1,82 @@
+"""Tests for the model cascade."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from promptify.core.config import ModelConfig
+from promptify.core.exceptions import ConfigurationError
+from promptify.engine.llm import LLMResponse
+from promptify.schemas.ner import Entity, NERResult
+from promptify.tasks.cascade import Cascade, default_confidence
+from promptify.tasks.classify import Classify
+from promptify.tasks.ner import NER
+from tests.conftest import MockLLMEngine
+
+LABELS = ["positive", "negative", "neutral"]
+
+
+class TierEngine(MockLLMEngine):
+    """Answers with a confidence looked up from the input text."""
+
+    def __init__(self, model: str, confidences, cost: float):
+        super().__init__()
+        self.config = ModelConfig(model=model)
+        self.confidences = confidences
+        self.cost = cost
+        self.inputs = []
+
+    def complete(self, messages, output_schema=None, **kwargs):
+        text = messages[-1]["content"].rsplit("Input: ", 1)[1].split("\n", 1)[0]
+        self.inputs.append(text)
+        payload = {"label": "positive", "confidence": self.confidences.get(text, 1.0)}
+        return LLMResponse(
+            text=json.dumps(payload),
+            usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            cost=self.cost,
+        )
+
+
+def _cascade(**kwargs):
+    cheap = Classify(model="gpt-4o-mini", labels=LABELS)
+    strong = Classify(model="gpt-4o", labels=LABELS)
+    cheap.engine = TierEngine("gpt-4o-mini", {"hard": 0.4, "tricky": 0.6}, cost=0.001)
+    strong.engine = TierEngine("gpt-4o", {}, cost=0.01)
+    return Cascade([cheap, strong], **kwargs)
+
+
+class TestCascade:
+    def test_escalates_low_confidence_only(self):
+        cascade = _cascade(threshold=0.8)
+        assert cascade("easy").confidence == 1.0
+        assert cascade("hard").confidence == 1.0
+        assert cascade.tiers[1].engine.inputs == ["hard"]
+
+    def test_batch_stats(self):
+        cascade = _cascade(threshold=0.5)
+        results = cascade.batch(["easy", "hard", "tricky", "fine"])
+        assert len(results) == 4
+        stats = cascade.stats()
+        assert stats["items"] == 4
+        assert stats["escalation_rate"] == 0.25
+        cheap, strong = stats["tiers"]
+        assert (cheap["model"], cheap["answered"], cheap["call_count"]) == ("gpt-4o-mini", 3, 4)
+        assert (strong["answered"], strong["call_count"]) == (1, 1)
+        assert strong["total_cost"] == pytest.approx(0.01)
+
+        cascade.reset_stats()
+        assert cascade.stats()["items"] == 0
+        assert cascade.stats()["tiers"][0]["call_count"] == 0
+
+    def test_rejects_mismatched_schemas(self):
+        with pytest.raises(ConfigurationError):
+            Cascade([Classify(model="gpt-4o-mini", labels=LABELS), NER(model="gpt-4o")])
+
+    def test_ner_confidence_counts_grounded_entities(self):
+        result = NERResult(
+            entities=[Entity(text="Aspirin", label="DRUG"), Entity(text="Tylenol", label="DRUG")]
+        )
+        assert default_confidence("Took aspirin daily.", result) == 0.5
+        assert default_confidence("anything", NERResult(entities=[])) == 1.0
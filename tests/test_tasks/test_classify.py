@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import ast
 import json
+import math
 
 import pytest
 
+from promptify.core.exceptions import ConfigurationError, ContextLengthError
+from promptify.engine.adaptive import AdaptiveMaxTokens
 from promptify.schemas.classify import Classification, MultiLabelResult
 from promptify.tasks.classify import Classify
-from tests.conftest import MockLLMEngine
+from tests.conftest import MockLLMEngine, RecordingEngine
 
 
 class TestClassify:
@@ -54,3 +58,133 @@ class TestClassify:
 
         result = await clf.acall("Great!")
         assert isinstance(result, Classification)
+
+    def test_prompt_cache_keyed_on_label_values(self):
+        clf = Classify(model="gpt-4o-mini", labels=["L0", "L1", "L9"])
+        assert "L2" not in clf._build_messages("text")[-1]["content"]
+        # Same list object (and id) with new contents must not hit the old prompt.
+        clf.labels[2] = "L2"
+        assert "L2" in clf._build_messages("text")[-1]["content"]
+
+
+class LogprobEngine(RecordingEngine):
+    def __init__(self, top_logprobs=None, response_text=""):
+        super().__init__(response_text=response_text)
+        self.top_logprobs = top_logprobs
+
+    def complete(self, messages, output_schema=None, **kwargs):
+        response = super().complete(messages, output_schema=output_schema, **kwargs)
+        if kwargs.get("logprobs"):
+            response.top_logprobs = self.top_logprobs
+            response.text = "A"
+        return response
+
+
+class TestLogprobScoring:
+    LABELS = ["positive", "negative", "neutral"]
+
+    def test_label_and_probability_from_logprobs(self):
+        clf = Classify(model="gpt-4o-mini", labels=self.LABELS, scoring="logprobs")
+        clf.engine = LogprobEngine(
+            {"B": math.log(0.6), " B": math.log(0.1), "A": math.log(0.2), "The": math.log(0.1)}
+        )
+        result = clf("Terrible service.")
+        assert result.label == "negative"
+        assert result.confidence == pytest.approx(0.7 / 0.9)
+        assert clf.engine.calls[0]["max_tokens"] == 1
+
+    def test_scoring_prompt_lists_codes(self):
+        clf = Classify(
+            model="gpt-4o-mini",
+            labels=self.LABELS,
+            scoring="logprobs",
+            examples=[("Loved it", "positive")],
+        )
+        prompt = clf._scoring_messages("Fine.")[1]["content"]
+        assert "A: positive\nB: negative\nC: neutral" in prompt
+        assert "Input: Loved it\nAnswer: A" in prompt
+
+    def test_falls_back_to_json_without_logprobs(self):
+        clf = Classify(model="gpt-4o-mini", labels=self.LABELS, scoring="logprobs")
+        clf.engine = LogprobEngine(None, json.dumps({"label": "neutral", "confidence": 0.8}))
+        assert clf("It was ok.").label == "neutral"
+        assert clf("Meh.").label == "neutral"
+        assert [bool(c.get("logprobs")) for c in clf.engine.calls] == [True, False, False]
+
+    def test_rejects_multilabel(self):
+        with pytest.raises(ConfigurationError):
+            Classify(model="gpt-4o-mini", labels=self.LABELS, multi_label=True, scoring="logprobs")
+
+
+def _listed_labels(prompt):
+    return ast.literal_eval(prompt.split("categories:\n", 1)[1].split("\n", 1)[0])
+
+
+def _echo_label(prompt):
+    """Picks the listed label sharing most words with the input."""
+    text = set(prompt.rsplit("Input: ", 1)[1].lower().split())
+    best = max(_listed_labels(prompt), key=lambda label: len(text & set(label.lower().split())))
+    return json.dumps({"label": best.split(" > ")[-1], "confidence": 0.9})
+
+
+class TestLabelShortlisting:
+    LABELS = [f"category {i}" for i in range(200)] + ["running shoes", "laptop computers"]
+
+    def test_prompt_lists_only_top_candidates(self):
+        clf = Classify(model="gpt-4o-mini", labels=self.LABELS, max_candidate_labels=5)
+        clf.engine = RecordingEngine(respond=_echo_label)
+        result = clf("Lightweight running shoes for marathons")
+        assert result.label == "running shoes"
+        listed = _listed_labels(clf.engine.prompts[0])
+        assert len(listed) == 5
+        assert "running shoes" in listed
+
+    def test_descriptions_are_indexed(self):
+        clf = Classify(
+            model="gpt-4o-mini",
+            labels=["A1", "B2", "C3", "D4"],
+            max_candidate_labels=1,
+            label_descriptions={"C3": "kitchen appliances such as blenders"},
+        )
+        assert clf._shortlist_labels("discounted kitchen blender") == ["C3"]
+
+    def test_taxonomy_traversal(self):
+        labels = [
+            "Electronics > Computers > Laptops",
+            "Electronics > Computers > Desktops",
+            "Electronics > Phones",
+            "Sports > Footwear > Running",
+            "Sports > Footwear > Hiking",
+        ]
+        clf = Classify(model="gpt-4o-mini", labels=labels, taxonomy_separator=" > ")
+        clf.engine = RecordingEngine(respond=_echo_label)
+        result = clf("Trail hiking boots, sports footwear")
+        assert result.label == "Sports > Footwear > Hiking"
+        assert result.confidence == pytest.approx(0.9 * 0.9)
+        # Root choice, then Running vs Hiking; "Footwear" is the only child of Sports.
+        assert [_listed_labels(prompt) for prompt in clf.engine.prompts] == [
+            ["Electronics", "Sports"],
+            ["Sports > Footwear > Running", "Sports > Footwear > Hiking"],
+        ]
+
+    def test_taxonomy_levels_are_prepared(self):
+        labels = ["Sports > Running", "Sports > Hiking", "Electronics > Phones"]
+        tracker = AdaptiveMaxTokens()
+        clf = Classify(
+            model="gpt-4o-mini",
+            labels=labels,
+            taxonomy_separator=" > ",
+            adaptive_max_tokens=tracker,
+        )
+        clf.engine = RecordingEngine(respond=_echo_label, model="gpt-4o-mini")
+        clf("Trail hiking boots, sports footwear")
+        assert len(clf.engine.prompts) == 2
+        assert set(tracker.stats()) == {"Classify/gpt-4o-mini/_TaxonomyLevel"}
+
+        clf = Classify(
+            model="gpt-4o-mini", labels=labels, taxonomy_separator=" > ", max_prompt_tokens=50
+        )
+        clf.engine = RecordingEngine(respond=_echo_label, model="gpt-4o-mini")
+        with pytest.raises(ContextLengthError):
+            clf("word " * 200)
+        assert clf.engine.prompts == []
@@ -0,0 +1,138 @@
+"""Tests for Composite (fused multi-task) execution."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from promptify.core.config import ModelConfig
+from promptify.core.exceptions import ConfigurationError
+from promptify.schemas.classify import Classification
+from promptify.schemas.ner import NERResult
+from promptify.schemas.summarize import Summary
+from promptify.tasks.classify import Classify
+from promptify.tasks.composite import Composite
+from promptify.tasks.ner import NER
+from promptify.tasks.qa import QA
+from promptify.tasks.summarize import Summarize
+from promptify.utils.gazetteer import Gazetteer
+from tests.conftest import MockLLMEngine
+
+TEXT = "Patient has chronic hip pain and osteoporosis."
+
+FUSED = {
+    "ner": {"entities": [{"text": "osteoporosis", "label": "CONDITION"}]},
+    "classify": {"label": "routine", "confidence": 0.8},
+    "summarize": {"summary": "Hip pain and osteoporosis."},
+}
+
+
+class RoutingEngine(MockLLMEngine):
+    """Answers fused prompts with ``fused`` and single-task prompts per schema."""
+
+    def __init__(self, fused):
+        super().__init__()
+        self.config = ModelConfig(model="gpt-4o-mini")
+        self.fused = fused
+        self.calls = []
+        self.prompts = []
+
+    def complete(self, messages, output_schema=None, **kwargs):
+        name = output_schema.__name__ if output_schema else None
+        self.calls.append(name)
+        self.prompts.append(messages[-1]["content"])
+        if name == "CompositeRequest":
+            self._response_text = self.fused
+        else:
+            self._response_text = json.dumps(
+                {"Classification": FUSED["classify"], "Summary": FUSED["summarize"]}.get(
+                    name, FUSED["ner"]
+                )
+            )
+        return super().complete(messages, output_schema=output_schema, **kwargs)
+
+
+def _tasks():
+    return [
+        NER(model="gpt-4o-mini", domain="medical"),
+        Classify(model="gpt-4o-mini", labels=["urgent", "routine"]),
+        Summarize(model="gpt-4o-mini", max_length=50),
+    ]
+
+
+def _composite(fused):
+    tasks = _tasks()
+    engine = RoutingEngine(fused)
+    for task in tasks:
+        task.engine = engine
+    combo = Composite(tasks)
+    combo.engine = engine
+    return combo, engine
+
+
+class TestComposite:
+    def test_one_call_split_into_task_results(self):
+        combo, engine = _composite(json.dumps(FUSED))
+        result = combo(TEXT)
+        assert engine.calls == ["CompositeRequest"]
+        assert isinstance(result.ner, NERResult)
+        assert (result.ner.entities[0].start, result.ner.entities[0].end) == (33, 45)
+        assert isinstance(result.classify, Classification)
+        assert isinstance(result.summarize, Summary)
+        assert result.classify.label == "routine"
+
+    def test_merged_prompt(self):
+        combo, _ = _composite(json.dumps(FUSED))
+        system = combo._build_messages(TEXT)[0]["content"]
+        assert '### Task "ner"' in system
+        assert "Domain: medical" in system
+        assert "Labels: urgent, routine" in system
+        assert "Max length: 50" in system
+        assert '{"entities": [{"text": "string", "label": "string"}]}' in system
+
+    def test_invalid_part_falls_back_to_its_task(self):
+        broken = {**FUSED, "classify": {"confidence": "high"}}
+        combo, engine = _composite(json.dumps(broken))
+        result = combo(TEXT)
+        assert engine.calls == ["CompositeRequest", "Classification"]
+        assert result.classify.label == "routine"
+        assert result.ner.entities[0].text == "osteoporosis"
+
+    @pytest.mark.asyncio
+    async def test_unparseable_output_runs_tasks_separately(self):
+        combo, engine = _composite("not json at all")
+        result = await combo.acall(TEXT)
+        assert engine.calls[0] == "CompositeRequest"
+        assert sorted(engine.calls[1:]) == ["Classification", "Summary", "_MentionResult"]
+        assert result.summarize.summary == "Hip pain and osteoporosis."
+
+    def test_fallback_keeps_call_kwargs(self):
+        broken = {**FUSED, "classify": {"confidence": "high"}}
+        combo, engine = _composite(json.dumps(broken))
+        combo(TEXT, description="Triage note from the ER.")
+        assert engine.calls == ["CompositeRequest", "Classification"]
+        assert "Triage note from the ER." in engine.prompts[1]
+
+    def test_rejects_tasks_that_cannot_be_fused(self):
+        with pytest.raises(ConfigurationError):
+            Composite([NER(model="gpt-4o-mini"), QA(model="gpt-4o-mini")])
+        with pytest.raises(ConfigurationError):
+            Composite([NER(model="gpt-4o-mini"), NER(model="gpt-4o-mini", output_format="tsv")])
+        with pytest.raises(ConfigurationError):
+            ner = NER(model="gpt-4o-mini", gazetteer=Gazetteer())
+            Composite([ner, Summarize(model="gpt-4o-mini")])
+        with pytest.raises(ConfigurationError):
+            Composite([NER(model="gpt-4o-mini"), Summarize(model="gpt-4o-mini", chunk_size=2000)])
+
+    def test_engine_settings_build_own_engine(self):
+        tasks = _tasks()
+        assert Composite(tasks).engine is tasks[0].engine
+        combo = Composite(tasks, temperature=0.0, max_tokens=256)
+        assert combo.engine is not tasks[0].engine
+        assert combo.engine.config.model == tasks[0].engine.config.model
+        assert (combo.engine.config.temperature, combo.engine.config.max_tokens) == (0.0, 256)
+
+    def test_default_names_are_unique(self):
+        combo = Composite([NER(model="gpt-4o-mini"), NER(model="gpt-4o-mini")])
+        assert list(combo.tasks) == ["ner", "ner_2"]
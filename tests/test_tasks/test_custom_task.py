@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import json
-from typing import List
+from typing import Dict, List
 
 import pytest
 from pydantic import BaseModel
 
+from promptify.core.exceptions import ContextLengthError
+from promptify.schemas.aliasing import KeyAliases
 from promptify.tasks.base import Task
-from tests.conftest import MockLLMEngine
+from promptify.utils.tokens import context_window, count_message_tokens
+from tests.conftest import MockLLMEngine, RecordingEngine
 
 
 class MovieReview(BaseModel):
@@ -92,3 +95,156 @@ class TestCustomTask:
         results = task.batch(["text1", "text2"], max_concurrent=2)
         assert len(results) == 2
         assert all(isinstance(r, MovieReview) for r in results)
+
+
+class PatientFinding(BaseModel):
+    finding_name: str
+    body_location: str
+
+
+class PatientReport(BaseModel):
+    primary_diagnosis: str
+    clinical_findings: List[PatientFinding]
+
+
+class TestShortKeys:
+    def test_short_keys_round_trip(self):
+        response = json.dumps({
+            "pd": "fracture",
+            "cf": [{"fn": "swelling", "bl": "left wrist"}],
+        })
+        task = Task(
+            model="gpt-4o",
+            output_schema=PatientReport,
+            instruction="Summarize the report.",
+            short_keys=True,
+        )
+        task.engine = MockLLMEngine(response_text=response)
+
+        system = task._build_messages("text")[0]["content"]
+        assert "- pd: string (primary_diagnosis)" in system
+        assert "- fn: string (finding_name)" in system
+
+        result = task("Patient fell on left wrist.")
+        assert isinstance(result, PatientReport)
+        assert result.primary_diagnosis == "fracture"
+        assert result.clinical_findings[0].body_location == "left wrist"
+        assert task.key_aliases.stats["keys_expanded"] == 4
+        assert task.key_aliases.stats["chars_saved"] > 0
+
+    def test_short_keys_minify_examples(self):
+        examples = [("x", json.dumps({"primary_diagnosis": "flu", "clinical_findings": []}))]
+        task = Task(
+            model="gpt-4o",
+            output_schema=PatientReport,
+            instruction="Summarize the report.",
+            examples=examples,
+            short_keys=True,
+        )
+        messages = task._build_messages("text")
+        assert json.loads(messages[2]["content"]) == {"pd": "flu", "cf": []}
+
+    def test_short_keys_dict_values_round_trip(self):
+        class FindingsBySite(BaseModel):
+            findings_by_site: Dict[str, PatientFinding]
+
+        aliases = KeyAliases(FindingsBySite)
+        finding = {"finding_name": "swelling", "body_location": "left"}
+        data = {"findings_by_site": {"wrist": finding}}
+        short = aliases.minify(data)
+        assert short == {"fbs": {"wrist": {"fn": "swelling", "bl": "left"}}}
+        assert aliases.expand(short) == data
+
+    def test_short_keys_counted_once_per_response(self):
+        aliases = KeyAliases(PatientReport)
+        with pytest.raises(ValueError):
+            aliases.validate({"pd": "fracture"})
+        aliases.validate({"pd": "fracture", "cf": []})
+        assert aliases.stats["responses"] == 1
+        assert aliases.stats["keys_expanded"] == 2
+
+    def test_short_keys_rejects_template(self):
+        from promptify.core.exceptions import ConfigurationError
+
+        with pytest.raises(ConfigurationError):
+            Task(
+                model="gpt-4o",
+                output_schema=PatientReport,
+                instruction="x",
+                template="ner",
+                short_keys=True,
+            )
+
+
+class TestPreflight:
+    RESPONSE = json.dumps({"sentiment": "ok", "rating": 5, "key_themes": []})
+
+    def _task(self, **kwargs):
+        task = Task(model="gpt-4o-mini", output_schema=MovieReview, instruction="Rate.", **kwargs)
+        task.engine = RecordingEngine(self.RESPONSE, model="gpt-4o-mini")
+        return task
+
+    def test_rejects_over_budget_locally(self):
+        task = self._task(max_prompt_tokens=50)
+        with pytest.raises(ContextLengthError):
+            task("word " * 200)
+        assert task.engine.calls == []
+
+    def test_truncates_examples_then_input(self):
+        examples = [("example review " * 20, self.RESPONSE)] * 3
+        task = self._task(max_prompt_tokens=120, truncate_input=True, examples=examples)
+        task("short review")
+        assert len(task.engine.calls[-1]["messages"]) < 2 + 2 * len(examples)
+
+        task("long review text " * 200)
+        messages = task.engine.calls[-1]["messages"]
+        assert count_message_tokens(messages, "gpt-4o-mini") <= 120
+        assert "long review" in messages[-1]["content"]
+        assert len(messages[-1]["content"]) < len("long review text " * 200)
+
+    def test_sets_max_tokens_from_remaining_window(self):
+        task = self._task(preflight=True)
+        task("A fine film.")
+        window, max_output = context_window("gpt-4o-mini")
+        sent = task.engine.calls[-1]["max_tokens"]
+        assert sent == min(window - task.estimate_prompt_tokens("A fine film."), max_output)
+
+    def test_no_preflight_by_default(self):
+        task = self._task()
+        task("A fine film.")
+        assert "max_tokens" not in task.engine.calls[-1]
+
+
+class TestBatchDedupe:
+    RESPONSE = json.dumps({"sentiment": "ok", "rating": 5, "key_themes": []})
+
+    def _task(self):
+        task = Task(model="gpt-4o-mini", output_schema=MovieReview, instruction="Rate.")
+        task.engine = RecordingEngine(self.RESPONSE, model="gpt-4o-mini")
+        return task
+
+    def test_exact_duplicates_sent_once(self):
+        task = self._task()
+        results = task.batch(["Great", "Bad", "Great", "great"], dedupe=True)
+        assert len(task.engine.calls) == 3
+        assert len(results) == 4
+        assert results[0] == results[2]
+        assert results[0] is not results[2]
+        assert task.dedupe_stats() == {"items": 4, "unique": 3, "dedupe_ratio": 0.25}
+
+    def test_normalizer_rules_and_callables(self):
+        task = self._task()
+        texts = ["RT  Great film", "rt great film "]
+        task.batch(texts, dedupe=True, normalizer=["lowercase", "collapse whitespace"])
+        assert len(task.engine.calls) == 1
+        sent = task.engine.calls[0]["messages"][-1]["content"]
+        assert "RT  Great film" in sent
+
+        task.batch(["a1", "a2"], dedupe=True, normalizer=lambda t: t.rstrip("0123456789"))
+        assert len(task.engine.calls) == 2
+
+    def test_dedupe_is_opt_in(self):
+        task = self._task()
+        task.batch(["Same", "Same"])
+        assert len(task.engine.calls) == 2
+        assert task.dedupe_stats()["dedupe_ratio"] == 0.0
@@ -0,0 +1,140 @@
+"""Tests for GenerateSQL and schema catalogs."""
+
+from __future__ import annotations
+
+import json
+
+from promptify.tasks.generate import GenerateSQL
+from promptify.utils.catalog import SchemaCatalog
+from tests.conftest import RecordingEngine
+
+DDL = """
+-- Registered shoppers
+CREATE TABLE customers (
+    id INT PRIMARY KEY,
+    full_name TEXT, -- customer's display name
+    email TEXT
+);
+CREATE TABLE orders (
+    id INT PRIMARY KEY,
+    customer_id INT REFERENCES customers(id),
+    placed_at TIMESTAMP,
+    total_amount DECIMAL(10, 2) COMMENT 'order revenue in USD'
+);
+CREATE TABLE "public"."orderItems" (
+    order_id INT,
+    product_id INT,
+    quantity INT,
+    CONSTRAINT fk_order FOREIGN KEY (order_id) REFERENCES orders (id)
+);
+CREATE TABLE products (id INT PRIMARY KEY, title TEXT, price DECIMAL(10, 2));
+CREATE TABLE warehouses (id INT PRIMARY KEY, city TEXT);
+CREATE TABLE shipments (id INT, warehouse_id INT, shipped_on DATE);
+ALTER TABLE shipments ADD FOREIGN KEY (warehouse_id) REFERENCES warehouses (id);
+COMMENT ON TABLE products IS 'Items in the catalog; price in USD';
+"""
+
+
+SQL_RESPONSE = json.dumps({"query": "SELECT 1"})
+
+
+class TestSchemaCatalog:
+    def test_parses_tables_and_columns(self):
+        catalog = SchemaCatalog(DDL)
+        assert list(catalog.tables) == [
+            "customers", "orders", "public.orderitems", "products", "warehouses", "shipments"
+        ]
+        orders = catalog.tables["orders"]
+        assert [c.name for c in orders.columns] == [
+            "id", "customer_id", "placed_at", "total_amount"
+        ]
+        assert orders.columns[-1].comment == "order revenue in USD"
+        assert catalog.tables["customers"].comment == "Registered shoppers"
+        assert catalog.tables["products"].comment == "Items in the catalog; price in USD"
+
+    def test_column_after_comment_line(self):
+        catalog = SchemaCatalog(
+            "CREATE TABLE public.customers (\n"
+            "    id INT, -- customer id\n"
+            "    -- shown on invoices\n"
+            "    full_name TEXT\n"
+            ");"
+        )
+        columns = catalog.tables["public.customers"].columns
+        assert [c.name for c in columns] == ["id", "full_name"]
+        assert [c.comment for c in columns] == ["customer id", "shown on invoices"]
+
+    def test_foreign_keys(self):
+        catalog = SchemaCatalog(DDL)
+        assert catalog.tables["orders"].references == {"customers"}
+        assert catalog.tables["public.orderitems"].references == {"orders"}
+        assert catalog.tables["shipments"].references == {"warehouses"}
+        assert catalog.neighbors("orders") == {"customers", "public.orderitems"}
+
+    def test_relevant_adds_join_targets(self):
+        catalog = SchemaCatalog(DDL)
+        names = [t.name for t in catalog.relevant("total revenue", max_tables=1)]
+        assert names == ["customers", "orders"]
+        # orderItems also matches "order" and references orders.
+        names = [t.name for t in catalog.relevant("order revenue", max_tables=1)]
+        assert names == ["customers", "orders", "public.orderitems"]
+        names = [t.name for t in catalog.relevant("which cities ship most", max_tables=1)]
+        assert names == ["warehouses"]
+
+    def test_prune_keeps_original_ddl(self):
+        catalog = SchemaCatalog(DDL)
+        pruned = catalog.prune("shipments per warehouse", max_tables=2)
+        assert "ALTER TABLE shipments ADD FOREIGN KEY" in pruned
+        assert "CREATE TABLE warehouses" in pruned
+        assert "customers" not in pruned
+
+    def test_prune_keeps_statements_outside_tables(self):
+        ddl = (
+            "CREATE TYPE order_status AS ENUM ('open', 'shipped');\n"
+            "CREATE TABLE orders (id INT, status order_status);\n"
+            "CREATE TABLE warehouses (id INT, city TEXT);"
+        )
+        pruned = SchemaCatalog(ddl).prune("open orders by status", max_tables=1)
+        assert pruned.startswith("CREATE TYPE order_status")
+        assert "CREATE TABLE orders" in pruned
+        assert "warehouses" not in pruned
+
+    def test_unmatched_question_keeps_everything(self):
+        catalog = SchemaCatalog(DDL)
+        assert len(catalog.relevant("hello there", max_tables=1)) == len(catalog)
+
+
+class TestGenerateSQL:
+    def test_prunes_large_schema(self):
+        gen = GenerateSQL(model="gpt-4o-mini", schema=DDL, max_tables=2)
+        gen.engine = RecordingEngine(SQL_RESPONSE)
+        gen("List products cheaper than 10 dollars by price")
+        prompt = gen.engine.prompts[0]
+        assert "CREATE TABLE products" in prompt
+        assert "CREATE TABLE warehouses" not in prompt
+
+    def test_catalog_cached_by_hash(self):
+        gen = GenerateSQL(model="gpt-4o-mini", schema=DDL, max_tables=2)
+        gen.engine = RecordingEngine(SQL_RESPONSE)
+        gen.batch(["orders per customer", "products by price"])
+        assert len(gen._catalogs) == 1
+        assert gen.catalog(DDL) is gen.catalog(str(DDL))
+
+    def test_pruning_is_opt_in(self):
+        gen = GenerateSQL(model="gpt-4o-mini", schema=DDL)
+        gen.engine = RecordingEngine(SQL_RESPONSE)
+        gen("List products by price")
+        assert "CREATE TABLE warehouses" in gen.engine.prompts[0]
+
+    def test_small_schema_sent_whole(self):
+        gen = GenerateSQL(model="gpt-4o-mini", schema=DDL, max_tables=10)
+        gen.engine = RecordingEngine(SQL_RESPONSE)
+        gen("orders per customer")
+        assert "CREATE TABLE warehouses" in gen.engine.prompts[0]
+
+    def test_per_call_schema(self):
+        gen = GenerateSQL(model="gpt-4o-mini", max_tables=1)
+        gen.engine = RecordingEngine(SQL_RESPONSE)
+        gen("warehouse cities", schema=DDL)
+        assert "CREATE TABLE warehouses" in gen.engine.prompts[0]
+        assert "CREATE TABLE orders" not in gen.engine.prompts[0]
@@ -6,9 +6,11 @@ import json
 
 import pytest
 
+from promptify.core.exceptions import ConfigurationError
 from promptify.schemas.ner import Entity, NERResult
 from promptify.tasks.ner import NER
-from tests.conftest import MockLLMEngine
+from promptify.utils.text import chunk_spans
+from tests.conftest import MockLLMEngine, RecordingEngine
 
 
 class TestNER:
@@ -65,3 +67,231 @@ class TestNER:
         results = ner.batch(["text1", "text2", "text3"], max_concurrent=2)
         assert len(results) == 3
         assert all(isinstance(r, NERResult) for r in results)
+
+    def test_ner_compact_output(self):
+        ner = NER(model="gpt-4o-mini", output_format="tsv")
+        ner.engine = MockLLMEngine(
+            response_text="chronic hip pain\tCONDITION\nosteoporosis\tCONDITION"
+        )
+
+        messages = ner._build_messages("The patient has chronic hip pain")
+        assert "one entity per line" in messages[1]["content"]
+        assert "Respond with valid JSON" not in messages[0]["content"]
+
+        result = ner("The patient has chronic hip pain and osteoporosis")
+        assert isinstance(result, NERResult)
+        assert [e.text for e in result.entities] == ["chronic hip pain", "osteoporosis"]
+
+    def test_ner_compact_output_json_reply(self, mock_ner_response):
+        ner = NER(model="gpt-4o-mini", output_format="tsv")
+        ner.engine = MockLLMEngine(response_text=mock_ner_response)
+        result = ner("The patient has chronic hip pain and osteoporosis")
+        assert [e.text for e in result.entities] == ["chronic hip pain", "osteoporosis"]
+
+
+DRUGS = ("Aspirin", "Ibuprofen", "Metformin")
+
+
+def _drug_entities(prompt):
+    """One DRUG entity per drug name mentioned in the prompt."""
+    entities = [
+        {"text": drug, "label": "DRUG"} for drug in DRUGS for _ in range(prompt.count(drug))
+    ]
+    return json.dumps({"entities": entities})
+
+
+class TestLongDocumentNER:
+    TEXT = (
+        "Aspirin was started on admission. " + "Vitals were stable overnight. " * 10
+        + "Ibuprofen was held. " + "No acute events. " * 10 + "Metformin continued."
+    )
+
+    def test_chunks_remaps_and_dedupes(self):
+        ner = NER(model="gpt-4o-mini", chunk_size=150, chunk_overlap=40)
+        ner.engine = RecordingEngine(respond=_drug_entities)
+        result = ner(self.TEXT)
+
+        assert len(ner.engine.prompts) > 2
+        assert [e.text for e in result.entities] == ["Aspirin", "Ibuprofen", "Metformin"]
+        for entity in result.entities:
+            assert self.TEXT[entity.start : entity.end] == entity.text
+
+    @pytest.mark.asyncio
+    async def test_chunked_async(self):
+        ner = NER(model="gpt-4o-mini", chunk_size=150, chunk_overlap=40)
+        ner.engine = RecordingEngine(respond=_drug_entities)
+        result = await ner.acall(self.TEXT)
+        assert len(result.entities) == 3
+
+    def test_short_text_single_call(self):
+        ner = NER(model="gpt-4o-mini", chunk_size=10_000)
+        ner.engine = RecordingEngine(respond=_drug_entities)
+        ner(self.TEXT)
+        assert len(ner.engine.prompts) == 1
+
+    def test_rejects_overlap_not_below_chunk_size(self):
+        with pytest.raises(ConfigurationError):
+            chunk_spans("a" * 1000, 200, 200)
+        with pytest.raises(ConfigurationError):
+            NER(model="gpt-4o-mini", chunk_size=200)
+
+    def test_large_overlap_always_advances(self):
+        spans = chunk_spans(self.TEXT, 100, 90)
+        assert all(b[0] > a[0] for a, b in zip(spans, spans[1:]))
+        assert spans[-1][1] == len(self.TEXT)
+
+
+class TestMergeChunkEntities:
+    def test_merges_overlapping_same_label_spans(self):
+        from promptify.tasks.ner import merge_chunk_entities
+
+        text = "chronic hip pain and osteoporosis"
+        first = NERResult(entities=[Entity(text="chronic hip", label="CONDITION")])
+        second = NERResult(
+            entities=[
+                Entity(text="hip pain", label="CONDITION"),
+                Entity(text="osteoporosis", label="CONDITION"),
+                Entity(text="unknown", label="CONDITION"),
+            ]
+        )
+        merged = merge_chunk_entities(text, [(0, 12, first), (8, len(text), second)])
+        assert [(e.text, e.start, e.end) for e in merged.entities] == [
+            ("chronic hip pain", 0, 16),
+            ("osteoporosis", 21, 33),
+            ("unknown", None, None),
+        ]
+
+
+class TestSpanAlignment:
+    def test_phrase_matcher_finds_overlaps(self):
+        from promptify.utils.matcher import PhraseMatcher
+
+        matcher = PhraseMatcher(["he", "she", "hers", "HIS"])
+        assert list(matcher.finditer("ushers his")) == [
+            (1, 4, 1), (2, 4, 0), (2, 6, 2), (7, 10, 3)
+        ]
+        assert PhraseMatcher(["His"], case_sensitive=True).find_all("his His") == {0: [(4, 7)]}
+
+    def test_repeated_and_case_insensitive_mentions(self):
+        from promptify.tasks.ner import align_entities
+
+        text = "Aspirin helps. Take aspirin daily; ASPIRIN again."
+        entities = [
+            Entity(text="aspirin", label="DRUG"),
+            Entity(text="Aspirin", label="DRUG"),
+            Entity(text="aspirin", label="DRUG"),
+            Entity(text="Aspirin", label="DRUG"),
+        ]
+        spans = [(e.start, e.end) for e in align_entities(text, entities)]
+        assert spans == [(20, 27), (0, 7), (20, 27), (0, 7)]
+        missing = align_entities(text, [Entity(text="aspirin x", label="DRUG")])
+        assert missing[0].start is None
+
+        mixed = align_entities("See ASPIRIN", [Entity(text="aspirin", label="DRUG")])
+        assert (mixed[0].start, mixed[0].end) == (4, 11)
+
+    def test_prefers_whole_words_and_checks_model_offsets(self):
+        from promptify.tasks.ner import align_entities
+
+        text = "Start the art class"
+        entities = [
+            Entity(text="art", label="SUBJECT"),
+            Entity(text="class", label="SUBJECT", start=0, end=5),
+        ]
+        aligned = align_entities(text, entities)
+        assert (aligned[0].start, aligned[0].end) == (10, 13)
+        assert (aligned[1].start, aligned[1].end) == (14, 19)
+
+    def test_ner_fills_offsets_without_asking(self):
+        response = json.dumps(
+            {"entities": [{"text": "osteoporosis", "label": "CONDITION"}]}
+        )
+        ner = NER(model="gpt-4o-mini")
+        ner.engine = MockLLMEngine(response_text=response)
+        assert "start" not in json.dumps(ner.request_schema.model_json_schema())
+        result = ner("Hip pain and osteoporosis")
+        assert isinstance(result, NERResult)
+        assert (result.entities[0].start, result.entities[0].end) == (13, 25)
+
+        ner = NER(model="gpt-4o-mini", align_spans=False)
+        ner.engine = MockLLMEngine(response_text=response)
+        assert ner.request_schema is NERResult
+        assert ner("Hip pain and osteoporosis").entities[0].start is None
+
+    def test_near_duplicate_offsets_realigned(self):
+        response = json.dumps(
+            {"entities": [{"text": "osteoporosis", "label": "CONDITION"}]}
+        )
+        ner = NER(model="gpt-4o-mini")
+        ner.engine = RecordingEngine(response)
+        texts = ["Hip pain and osteoporosis", "Hip  pain  and  osteoporosis"]
+        results = ner.batch(texts, dedupe=True, normalizer="collapse whitespace")
+        assert len(ner.engine.prompts) == 1
+        for text, result in zip(texts, results):
+            entity = result.entities[0]
+            assert text[entity.start : entity.end] == "osteoporosis"
+
+
+class TestGazetteer:
+    def test_tag_longest_match_and_ambiguity(self):
+        from promptify.utils.gazetteer import Gazetteer
+
+        gaz = Gazetteer([("diabetes", "CONDITION"), ("type 2 diabetes", "CONDITION")])
+        gaz.update([("cold", "CONDITION"), ("cold", "TEMPERATURE")])
+        tagged = gaz.tag("Type 2 Diabetes, a cold and diabetes.")
+        assert [(e.text, e.start, e.end) for e in tagged] == [
+            ("Type 2 Diabetes", 0, 15),
+            ("diabetes", 28, 36),
+        ]
+        assert gaz.get("COLD") is None
+        assert gaz.get("Diabetes") == "CONDITION"
+
+    def test_compact_keeps_entries(self):
+        from promptify.utils.gazetteer import Gazetteer
+
+        gaz = Gazetteer((f"drug {i}", "DRUG") for i in range(1000))
+        gaz.compact()
+        gaz.add("drug 5000", "DRUG")
+        assert len(gaz) == 1001
+        assert gaz.get("Drug 999") == "DRUG"
+        assert gaz.get("drug 5000") == "DRUG"
+        assert gaz.get("drug 1000") is None
+
+    def test_coverage(self):
+        from promptify.utils.gazetteer import Gazetteer
+
+        gaz = Gazetteer([("aspirin", "DRUG")])
+        text = "aspirin and headache"
+        assert Gazetteer.coverage(text, gaz.tag(text)) == 0.5
+        assert Gazetteer.coverage("aspirin, aspirin", gaz.tag("aspirin, aspirin")) == 1.0
+
+    def test_full_coverage_skips_the_model(self):
+        from promptify.utils.gazetteer import Gazetteer
+
+        ner = NER(model="gpt-4o-mini", gazetteer=Gazetteer([("aspirin", "DRUG")]))
+        ner.engine = RecordingEngine("")
+        result = ner("Aspirin and aspirin")
+        assert [(e.text, e.start) for e in result.entities] == [("Aspirin", 0), ("aspirin", 12)]
+        assert ner.engine.prompts == []
+
+    def test_partial_coverage_sends_hints_and_merges(self):
+        from promptify.utils.gazetteer import Gazetteer
+
+        response = json.dumps(
+            {
+                "entities": [
+                    {"text": "headache", "label": "CONDITION"},
+                    {"text": "aspirin", "label": "DRUG"},
+                ]
+            }
+        )
+        gaz = Gazetteer([("aspirin", "DRUG")])
+        ner = NER(model="gpt-4o-mini", gazetteer=gaz, learn_gazetteer=True)
+        ner.engine = RecordingEngine(response)
+        result = ner("Aspirin for a headache")
+        assert "- Aspirin (DRUG)" in ner.engine.prompts[0]
+        assert [(e.text, e.label, e.start) for e in result.entities] == [
+            ("Aspirin", "DRUG", 0),
+            ("headache", "CONDITION", 14),
+        ]
+        assert gaz.get("headache") == "CONDITION"
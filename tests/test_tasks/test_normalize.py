@@ -0,0 +1,94 @@
+"""Tests for NormalizeText and the local rule engine."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from promptify.tasks.normalize import NormalizeText
+from promptify.utils.rules import RuleSet, canonicalize_dates, resolve_rule, split_rules
+from tests.conftest import RecordingEngine
+
+
+def _echo_upper(prompt):
+    """Echoes the input back uppercased."""
+    text = prompt.rsplit("Input: ", 1)[1].rsplit("\nOutput:", 1)[0]
+    return json.dumps({"normalized_text": text.upper()})
+
+
+class TestRules:
+    def test_resolve_phrasings(self):
+        assert resolve_rule("Lowercase") == "lowercase"
+        assert resolve_rule("convert to lower case.") == "lowercase"
+        assert resolve_rule("remove_punctuation") == "remove_punctuation"
+        assert resolve_rule("expand abbreviations") is None
+
+    def test_rule_set(self):
+        rules = RuleSet(["lowercase", "remove punctuation", "collapse whitespace"])
+        assert rules("  Hello,   World! ") == "hello world"
+        assert rules.apply_batch(["A.", "B!"]) == ["a", "b"]
+
+    def test_rejects_model_rules(self):
+        with pytest.raises(ValueError):
+            RuleSet(["expand abbreviations"])
+
+    def test_unicode_and_accents(self):
+        assert RuleSet(["nfkc"])("ﬁne ①") == "fine 1"
+        # NFC composes characters but keeps compatibility forms.
+        assert RuleSet(["nfc"])("ﬁne ² cafe\u0301") == "ﬁne ² café"
+        assert RuleSet(["remove accents"])("café naïve") == "cafe naive"
+
+    def test_numbers(self):
+        rules = RuleSet(["normalize numbers"])
+        assert rules("Twenty-one items cost 1,250,000 dollars") == "21 items cost 1250000 dollars"
+        assert rules("version 1.234,5") == "version 1.234,5"
+
+    def test_dates(self):
+        assert canonicalize_dates("on 03/14/2024") == "on 2024-03-14"
+        assert canonicalize_dates("on 14/03/2024") == "on 2024-03-14"
+        assert canonicalize_dates("March 5th, 2024 and 6 Jan 2023") == "2024-03-05 and 2023-01-06"
+        assert canonicalize_dates("2024/7/4") == "2024-07-04"
+        assert canonicalize_dates("13/13/2024") == "13/13/2024"
+
+    def test_split_rules_keeps_order(self):
+        local, remaining = split_rules(["lowercase", "expand abbreviations", "strip accents"])
+        assert local == ["lowercase"]
+        assert remaining == ["expand abbreviations", "strip accents"]
+
+
+class TestNormalizeText:
+    def test_local_rules_skip_the_model(self):
+        norm = NormalizeText(model="gpt-4o-mini", rules=["lowercase", "remove punctuation"])
+        norm.engine = RecordingEngine(respond=_echo_upper)
+        assert norm.is_local
+        assert norm("Hello, World!").normalized_text == "hello world"
+        results = norm.batch(["A, B", "C!"])
+        assert [r.normalized_text for r in results] == ["a b", "c"]
+        assert norm.engine.prompts == []
+
+    def test_model_gets_remaining_rules(self):
+        norm = NormalizeText(
+            model="gpt-4o-mini", rules=["remove punctuation", "expand abbreviations"]
+        )
+        norm.engine = RecordingEngine(respond=_echo_upper)
+        assert not norm.is_local
+        result = norm("Dr. Smith, St. Louis")
+        assert result.normalized_text == "DR SMITH ST LOUIS"
+        prompt = norm.engine.prompts[0]
+        assert "- expand abbreviations" in prompt
+        assert "- remove punctuation" not in prompt
+
+    def test_empty_after_local_rules(self):
+        norm = NormalizeText(
+            model="gpt-4o-mini", rules=["remove punctuation", "expand abbreviations"]
+        )
+        norm.engine = RecordingEngine(respond=_echo_upper)
+        assert norm("?!").normalized_text == ""
+        assert norm.engine.prompts == []
+
+    def test_local_rules_disabled(self):
+        norm = NormalizeText(model="gpt-4o-mini", rules=["lowercase"], local_rules=False)
+        norm.engine = RecordingEngine(respond=_echo_upper)
+        norm.batch(["Hello"])
+        assert "- lowercase" in norm.engine.prompts[0]
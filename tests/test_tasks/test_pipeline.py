@@ -0,0 +1,107 @@
+"""Tests for Pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from promptify.core.exceptions import ConfigurationError, PipelineError
+from promptify.schemas.classify import Classification
+from promptify.tasks.classify import Classify
+from promptify.tasks.pipeline import Pipeline
+from promptify.tasks.summarize import Summarize
+from tests.conftest import MockLLMEngine
+
+
+class TestPipeline:
+    def test_dag_with_tasks_and_functions(self):
+        summarize = Summarize(model="gpt-4o-mini")
+        summarize.engine = MockLLMEngine(response_text=json.dumps({"summary": "Short."}))
+        classify = Classify(model="gpt-4o-mini", labels=["a", "b"])
+        classify.engine = MockLLMEngine(response_text=json.dumps({"label": "a"}))
+        pipe = (
+            Pipeline()
+            .add("summary", summarize)
+            .add("length", len)
+            .add("label", classify, after="summary", inputs=lambda r: r["summary"].summary)
+            .add("report", lambda r: f"{r['label'].label}:{r['length']}",
+                 after=["label", "length"], inputs=lambda r: r)
+        )
+        result = pipe("Some long document.")
+        assert isinstance(result["label"], Classification)
+        assert result["length"] == 19
+        assert result["report"] == "a:19"
+        assert pipe.stats()["label"]["calls"] == 1
+
+    def test_items_stream_without_stage_barrier(self):
+        events = []
+
+        async def first(item):
+            await asyncio.sleep(0.05 if item == "slow" else 0)
+            events.append(("first", item))
+            return item
+
+        async def second(item):
+            events.append(("second", item))
+            return item.upper()
+
+        pipe = Pipeline().add("first", first).add("second", second, after="first")
+        results = pipe.batch(["slow", "fast"])
+        assert [r["second"] for r in results] == ["SLOW", "FAST"]
+        # "fast" reaches the second stage before "slow" leaves the first.
+        assert events.index(("second", "fast")) < events.index(("first", "slow"))
+
+    def test_independent_stages_run_concurrently_with_limits(self):
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        def tracked(name):
+            async def run(item):
+                active[name] += 1
+                peak[name] = max(peak[name], active[name])
+                await asyncio.sleep(0.01)
+                active[name] -= 1
+                return item
+
+            return run
+
+        pipe = Pipeline().add("a", tracked("a"), max_concurrent=2).add("b", tracked("b"))
+        pipe.batch(list(range(10)))
+        assert peak == {"a": 2, "b": 5}
+        stats = pipe.stats()
+        assert stats["a"]["calls"] == 10
+        assert stats["a"]["wait_seconds"] > 0
+        pipe.reset_stats()
+        assert pipe.stats()["a"]["calls"] == 0
+
+    def test_sync_stages_run_concurrently(self):
+        def slow(item):
+            time.sleep(0.1)
+            return item
+
+        pipe = Pipeline().add("a", slow).add("b", slow)
+        start = time.perf_counter()
+        pipe.batch(list(range(5)))
+        # Serial execution would take 1.0 s; both stages run 5 items at once.
+        assert time.perf_counter() - start < 0.5
+        assert pipe.stats()["a"]["calls"] == 5
+
+    def test_stage_failure_raises_pipeline_error(self):
+        def boom(item):
+            raise RuntimeError("bad item")
+
+        pipe = Pipeline().add("boom", boom).add("after", str, after="boom")
+        with pytest.raises(PipelineError, match="'boom' failed"):
+            pipe("x")
+
+    def test_invalid_graph(self):
+        pipe = Pipeline().add("a", str)
+        with pytest.raises(ConfigurationError):
+            pipe.add("a", str)
+        with pytest.raises(ConfigurationError):
+            pipe.add("b", str, after="missing")
+        with pytest.raises(ConfigurationError):
+            Pipeline()("x")
@@ -6,9 +6,11 @@ import json
 
 import pytest
 
+from promptify.core.exceptions import ContextLengthError
+from promptify.engine.adaptive import AdaptiveMaxTokens
 from promptify.schemas.qa import Answer
 from promptify.tasks.qa import QA
-from tests.conftest import MockLLMEngine
+from tests.conftest import MockLLMEngine, RecordingEngine
 
 
 class TestQA:
@@ -42,3 +44,114 @@ class TestQA:
 
         result = await qa.acall("The answer is 42.", question="What is the answer?")
         assert result.answer == "42"
+
+    def test_qa_compiled_prompt_matches_full_build(self):
+        qa = QA(model="gpt-4o-mini", domain="legal")
+        messages = qa._build_messages("The lease ends in May.", question="When?")
+        assert len(qa._compiled) == 1 and None not in qa._compiled.values()
+        assert messages == qa.prompt_builder.build(
+            instruction=qa.instruction,
+            text_input="The lease ends in May.",
+            domain="legal",
+            output_schema=qa.output_schema,
+            question="When?",
+        )
+
+
+def _group_engine(skip=()):
+    """Answers every numbered question in the prompt with its number."""
+
+    def respond(prompt):
+        if "Questions:" not in prompt:
+            return json.dumps({"answer": "single"})
+        lines = prompt.split("Questions:\n", 1)[1].splitlines()
+        numbers = [int(line.split(".", 1)[0]) for line in lines if line[:1].isdigit()]
+        answers = [{"question": n, "answer": str(n)} for n in numbers if n not in skip]
+        return json.dumps({"answers": answers})
+
+    return RecordingEngine(respond=respond, model="gpt-4o-mini")
+
+
+class TestAskMany:
+    CONTEXT = "The lease between Acme and Bob ends in May. " * 50
+    QUESTIONS = [f"Question {i}?" for i in range(7)]
+
+    def test_one_call_for_all_questions(self):
+        qa = QA(model="gpt-4o-mini")
+        qa.engine = _group_engine()
+        answers = qa.ask_many(self.CONTEXT, self.QUESTIONS)
+        assert [a.answer for a in answers] == [str(i) for i in range(1, 8)]
+        assert len(qa.engine.prompts) == 1
+        assert qa.engine.prompts[0].count("The lease") == 50
+
+    def test_groups_by_output_budget(self):
+        qa = QA(model="gpt-4o-mini", max_tokens=300)
+        qa.engine = _group_engine()
+        answers = qa.ask_many(self.CONTEXT, self.QUESTIONS, tokens_per_answer=100)
+        assert len(qa.engine.prompts) == 3
+        assert [a.answer for a in answers] == ["1", "2", "3", "1", "2", "3", "1"]
+
+    def test_missing_answers_asked_individually(self):
+        qa = QA(model="gpt-4o-mini")
+        qa.engine = _group_engine(skip=[2])
+        answers = qa.ask_many(self.CONTEXT, self.QUESTIONS[:3])
+        assert [a.answer for a in answers] == ["1", "single", "3"]
+
+    def test_grouped_calls_are_preflighted(self):
+        qa = QA(model="gpt-4o-mini", max_prompt_tokens=100)
+        qa.engine = _group_engine()
+        with pytest.raises(ContextLengthError):
+            qa.ask_many(self.CONTEXT, self.QUESTIONS)
+        assert qa.engine.prompts == []
+
+    def test_grouped_completions_tracked_separately(self):
+        tracker = AdaptiveMaxTokens()
+        qa = QA(model="gpt-4o-mini", adaptive_max_tokens=tracker)
+        qa.engine = _group_engine()
+        qa.ask_many(self.CONTEXT, self.QUESTIONS)
+        qa(self.CONTEXT, question="When?")
+        assert set(tracker.stats()) == {
+            "QA/gpt-4o-mini/_NumberedAnswerList",
+            "QA/gpt-4o-mini/Answer",
+        }
+
+
+class TestRetrieval:
+    CONTRACT = (
+        "This agreement is made between Acme Corp and Bob Smith. "
+        + "Boilerplate clause about notices and governing law. " * 40
+        + "The lease terminates on May 31, 2025. "
+        + "Boilerplate clause about severability and waivers. " * 40
+        + "Monthly rent is 1200 dollars."
+    )
+
+    def test_sends_only_relevant_passages(self):
+        qa = QA(model="gpt-4o-mini", retrieval_top_k=1, passage_size=300, passage_overlap=0)
+        qa.engine = _group_engine()
+        qa(self.CONTRACT, question="When does the lease terminate?")
+        prompt = qa.engine.prompts[-1]
+        assert "May 31, 2025" in prompt
+        assert "Acme Corp" not in prompt
+        assert len(prompt) < len(self.CONTRACT) // 4
+
+    def test_index_cached_per_document(self):
+        qa = QA(model="gpt-4o-mini", retrieval_top_k=2, passage_size=300, passage_overlap=0)
+        qa.engine = _group_engine()
+        qa(self.CONTRACT, question="Who are the parties?")
+        qa(self.CONTRACT, question="What is the monthly rent?")
+        assert len(qa._indexes) == 1
+        qa("A different document. " * 30, question="What?")
+        assert len(qa._indexes) == 2
+
+    def test_ask_many_uses_union_of_passages(self):
+        qa = QA(model="gpt-4o-mini", retrieval_top_k=1, passage_size=300, passage_overlap=0)
+        qa.engine = _group_engine()
+        qa.ask_many(self.CONTRACT, ["When does the lease terminate?", "What is the monthly rent?"])
+        prompt = qa.engine.prompts[-1]
+        assert "May 31" in prompt and "1200 dollars" in prompt and "Acme" not in prompt
+
+    def test_short_context_sent_whole(self):
+        qa = QA(model="gpt-4o-mini", retrieval_top_k=1)
+        qa.engine = _group_engine()
+        qa("Einstein was born in Ulm.", question="Where?")
+        assert "Einstein was born in Ulm." in qa.engine.prompts[-1]
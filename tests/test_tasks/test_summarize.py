@@ -0,0 +1,57 @@
+"""Tests for Summarize task."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from promptify.core.exceptions import ConfigurationError
+from promptify.schemas.summarize import Summary
+from promptify.tasks.summarize import Summarize, _group
+from tests.conftest import MockLLMEngine, RecordingEngine
+
+
+def _passage(prompt):
+    return prompt.split("Passage: ", 1)[1].rsplit("\nOutput:", 1)[0]
+
+
+def _first_sentence(prompt):
+    """Summarizes a passage as its first sentence."""
+    first = _passage(prompt).split(".")[0].strip() + "."
+    return json.dumps({"summary": first, "key_points": [first]})
+
+
+class TestSummarize:
+    def test_summarize_short_text(self):
+        summarizer = Summarize(model="gpt-4o-mini")
+        summarizer.engine = MockLLMEngine(response_text=json.dumps({"summary": "Short."}))
+        assert summarizer("A short article.").summary == "Short."
+
+    def test_map_reduce_long_text(self):
+        text = " ".join(f"Section {i} covers topic {i} in detail." for i in range(60))
+        summarizer = Summarize(
+            model="gpt-4o-mini", key_points=True, chunk_size=300, chunk_overlap=0
+        )
+        summarizer.engine = RecordingEngine(respond=_first_sentence)
+        result = summarizer(text)
+
+        assert isinstance(result, Summary)
+        assert result.summary == "Section 0 covers topic 0 in detail."
+        passages = [_passage(prompt) for prompt in summarizer.engine.prompts]
+        map_calls = len([p for p in passages if "Key points" not in p])
+        assert map_calls > 1
+        assert len(passages) > map_calls
+        assert all(len(p) < 1000 for p in passages)
+
+    def test_group_always_shrinks(self):
+        partials = [Summary(summary="x" * 500) for _ in range(5)]
+        groups = _group(partials, max_chars=100)
+        assert [len(g) for g in groups] == [2, 3]
+        assert len(_group(partials[:1], max_chars=100)) == 1
+
+    def test_rejects_overlap_not_below_chunk_size(self):
+        with pytest.raises(ConfigurationError):
+            Summarize(model="gpt-4o-mini", chunk_size=200)
+        with pytest.raises(ConfigurationError):
+            Summarize(model="gpt-4o-mini", chunk_size=300, chunk_overlap=-1)